@@ -0,0 +1,276 @@
+"""API HTTP somente leitura com os acumulados consolidados.
+
+Serve o último estado publicado pelo app ou, rodando isolada, o estado
+compartilhado gravado pelo processo coletor e, na falta dele, o último snapshot
+em disco. Nunca dispara coleta nas fontes externas.
+
+Rotas:
+    GET /acumulados           consolidado por município
+    GET /fontes/<FONTE>       registros de uma fonte (CEMADEN, SATDES, ANA, INMET)
+    GET /status               status das fontes
+    GET /estacoes/proximas    estações por proximidade: ``lat``, ``lon`` e
+                              ``k`` (vizinhos, padrão 5) ou ``raio_km``
+    GET /saude                versão e horário do estado servido
+
+Parâmetros: ``municipio`` e ``fonte`` (filtros, aceitam vários separados por
+vírgula) e ``formato=csv`` ou ``formato=arrow`` (Arrow IPC, se o ``pyarrow``
+estiver instalado). Respostas trazem ETag e aceitam gzip.
+
+Escuta em ``API_HOST`` (padrão ``127.0.0.1``) e ``API_PORT``, lidos do ambiente.
+
+Uso isolado:
+    python -m app.api --porta 8502
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from app.config.settings import API_GZIP_MIN_BYTES, API_HOST, API_PORT, SNAPSHOT_DIR
+from app.services.estado import EstadoPublicado, carregar_estado_armazenado, obter_estado
+from app.services.estado_compartilhado import LeitorEstadoCompartilhado
+from app.services.json_rapido import serializar_json
+from app.services.normalizacao import normalizar_municipio, remover_acentos
+from app.services.proximidade import indice_do_estado
+from app.services.tabelas import ARROW_DISPONIVEL, TIPO_MIDIA_ARROW, ipc_stream, registros
+
+
+MAX_RESPOSTAS_EM_CACHE = 256
+MAX_VIZINHOS = 100
+
+_leitor_compartilhado = LeitorEstadoCompartilhado()
+
+
+def estado_atual() -> EstadoPublicado | None:
+    """Estado em memória do processo; sem ele, o compartilhado e, por fim, o último snapshot."""
+    return obter_estado() or _leitor_compartilhado.obter() or carregar_estado_armazenado(SNAPSHOT_DIR)
+
+
+def _valores(parametros: dict[str, list[str]], nome: str) -> list[str]:
+    return [
+        valor.strip()
+        for bruto in parametros.get(nome, [])
+        for valor in bruto.split(",")
+        if valor.strip()
+    ]
+
+
+def _chave_municipio(valor: str) -> str:
+    return remover_acentos(normalizar_municipio(valor))
+
+
+def filtrar(df: pd.DataFrame, municipios: list[str], fontes: list[str]) -> pd.DataFrame:
+    if df.empty:
+        return df
+
+    if municipios:
+        chaves = {_chave_municipio(municipio) for municipio in municipios}
+        df = df[df["Município"].map(_chave_municipio).isin(chaves)]
+
+    if fontes:
+        fontes = {fonte.upper() for fonte in fontes}
+        df = df[df["Instituição"].isin(fontes) | df["Fonte"].isin(fontes)]
+
+    return df
+
+
+def consultar_proximas(estado: EstadoPublicado, parametros: dict) -> pd.DataFrame:
+    """Estações perto de ``lat``/``lon``; levanta ``ValueError`` para parâmetros inválidos."""
+    latitude = float(parametros["lat"][0])
+    longitude = float(parametros["lon"][0])
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("Coordenada fora do intervalo válido.")
+
+    indice = indice_do_estado(estado)
+    if parametros.get("raio_km"):
+        raio = float(parametros["raio_km"][0])
+        if raio <= 0:
+            raise ValueError("raio_km deve ser positivo.")
+        return indice.no_raio(latitude, longitude, raio)
+
+    k = int((parametros.get("k") or ["5"])[0])
+    return indice.proximas(latitude, longitude, min(max(k, 1), MAX_VIZINHOS))
+
+
+def montar_corpo(estado: EstadoPublicado, caminho: str, parametros: dict) -> tuple[int, bytes, str]:
+    """Gera (status HTTP, corpo, content-type) para a rota pedida."""
+    formato = (parametros.get("formato") or ["json"])[0].lower()
+    municipios = _valores(parametros, "municipio")
+    fontes = _valores(parametros, "fonte")
+
+    if caminho == "/saude":
+        return 200, serializar_json(
+            {"versao": estado.versao, "gerado_em": estado.gerado_em.isoformat()}
+        ), "application/json"
+
+    if caminho == "/status":
+        return 200, serializar_json([item.to_dict() for item in estado.status]), "application/json"
+
+    if caminho == "/acumulados":
+        df = estado.consolidado
+    elif caminho == "/estacoes/proximas":
+        try:
+            df = consultar_proximas(estado, parametros)
+        except (KeyError, ValueError):
+            return 400, serializar_json(
+                {"erro": "Informe lat e lon numéricos e, opcionalmente, k ou raio_km."}
+            ), "application/json"
+    elif caminho.startswith("/fontes/"):
+        nome = caminho.removeprefix("/fontes/").upper()
+        if nome not in estado.fontes:
+            return 404, serializar_json({"erro": f"Fonte {nome} indisponível."}), "application/json"
+        df = estado.fontes[nome]
+    else:
+        return 404, serializar_json({"erro": "Rota não encontrada."}), "application/json"
+
+    df = filtrar(df, municipios, fontes)
+    if formato == "csv":
+        return 200, df.to_csv(index=False).encode("utf-8"), "text/csv; charset=utf-8"
+
+    if formato == "arrow":
+        if not ARROW_DISPONIVEL:
+            return 406, serializar_json({"erro": "Formato arrow indisponível."}), "application/json"
+        metadados = {"versao": estado.versao, "gerado_em": estado.gerado_em.isoformat()}
+        return 200, ipc_stream(df, metadados), TIPO_MIDIA_ARROW
+
+    return 200, serializar_json(
+        {
+            "versao": estado.versao,
+            "gerado_em": estado.gerado_em.isoformat(),
+            "registros": registros(df),
+        }
+    ), "application/json"
+
+
+def etag_confere(if_none_match: str, etag: str) -> bool:
+    """Se alguma entity tag de ``If-None-Match`` (lista separada por vírgula) é ``etag``.
+
+    Comparação fraca, como pede o ``If-None-Match``: ``W/"x"`` confere com ``"x"``.
+    """
+    for candidata in if_none_match.split(","):
+        candidata = candidata.strip()
+        if candidata == "*" or candidata.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class CacheRespostas:
+    """Respostas prontas (já comprimidas quando for o caso) por versão e consulta."""
+
+    def __init__(self, limite: int = MAX_RESPOSTAS_EM_CACHE):
+        self.limite = limite
+        self._respostas: OrderedDict[tuple, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: tuple, gerar) -> tuple:
+        with self._lock:
+            resposta = self._respostas.get(chave)
+            if resposta is not None:
+                self._respostas.move_to_end(chave)
+                return resposta
+
+        resposta = gerar()
+        with self._lock:
+            self._respostas[chave] = resposta
+            while len(self._respostas) > self.limite:
+                self._respostas.popitem(last=False)
+        return resposta
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_version = "AcumuladosAPI/1.0"
+    cache = CacheRespostas()
+
+    def log_message(self, format, *args):  # noqa: A002 - assinatura da stdlib
+        pass
+
+    def do_GET(self):
+        estado = estado_atual()
+        if estado is None:
+            self._responder(503, serializar_json({"erro": "Nenhum estado publicado."}), "application/json")
+            return
+
+        url = urlsplit(self.path)
+        parametros = parse_qs(url.query)
+        aceita_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        chave = (estado.versao, url.path, url.query, aceita_gzip)
+
+        def gerar():
+            status, corpo, tipo = montar_corpo(estado, url.path, parametros)
+            etag = hashlib.blake2b(corpo, digest_size=12).hexdigest()
+            codificacao = ""
+            if aceita_gzip and len(corpo) >= API_GZIP_MIN_BYTES:
+                corpo = gzip.compress(corpo, compresslevel=5)
+                codificacao = "gzip"
+                # Cada representação tem o próprio validador forte.
+                etag += "-gz"
+            return status, corpo, tipo, f'"{etag}"', codificacao
+
+        try:
+            status, corpo, tipo, etag, codificacao = self.cache.obter(chave, gerar)
+        except Exception as exc:
+            print(f"Erro ao montar resposta para {url.path}: {exc}")
+            self._responder(500, serializar_json({"erro": "Erro interno."}), "application/json")
+            return
+
+        if status == 200 and etag_confere(self.headers.get("If-None-Match", ""), etag):
+            self._responder(304, b"", tipo, etag=etag)
+            return
+
+        self._responder(status, corpo, tipo, etag=etag, codificacao=codificacao)
+
+    def _responder(self, status: int, corpo: bytes, tipo: str, etag: str = "", codificacao: str = ""):
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if etag:
+            self.send_header("ETag", etag)
+        if codificacao:
+            self.send_header("Content-Encoding", codificacao)
+        if status != 304:
+            self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(corpo)
+
+
+def criar_servidor(porta: int, host: str = API_HOST) -> ThreadingHTTPServer:
+    servidor = ThreadingHTTPServer((host, porta), ApiHandler)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def iniciar_em_segundo_plano(porta: int, host: str = API_HOST) -> ThreadingHTTPServer:
+    servidor = criar_servidor(porta, host)
+    threading.Thread(target=servidor.serve_forever, name="api-acumulados", daemon=True).start()
+    return servidor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API somente leitura dos acumulados.")
+    parser.add_argument("--porta", type=int, default=int(API_PORT or 8502))
+    parser.add_argument("--host", default=API_HOST)
+    args = parser.parse_args()
+
+    servidor = criar_servidor(args.porta, args.host)
+    print(f"API de acumulados em http://{args.host}:{args.porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
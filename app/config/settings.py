@@ -14,10 +14,25 @@ BASE_DIR = Path(__file__).resolve().parents[2]
 DATA_DIR = BASE_DIR / "data"
 SNAPSHOT_DIR = DATA_DIR / "snapshots"
 SATDES_STATIONS_FILE = DATA_DIR / "stations_satdes.json"
+ALERTAS_REGRAS_FILE = DATA_DIR / "alertas_regras.json"
+ALERTAS_OUTBOX_FILE = DATA_DIR / "alertas" / "outbox.jsonl"
+HTTP_CACHE_DIR = DATA_DIR / "cache_http"
+MUNICIPIOS_GEOJSON_FILE = DATA_DIR / "municipios_es.geojson"
+ESTADO_COMPARTILHADO_FILE = DATA_DIR / "estado" / "estado.bin"
+ESTADO_COMPARTILHADO_LOCK = DATA_DIR / "estado" / "coletor.lock"
+CATALOGO_ESTACOES_FILE = DATA_DIR / "estado" / "catalogo_estacoes.json"
+CATALOGO_ESTACOES_LOCK = DATA_DIR / "estado" / "catalogo_estacoes.lock"
+ANA_TOKEN_FILE = DATA_DIR / "estado" / "token_ana.json"
+ANA_TOKEN_LOCK = DATA_DIR / "estado" / "token_ana.lock"
 
 load_dotenv(BASE_DIR / ".env")
 
 
+def get_env(name: str, default: str | None = None) -> str | None:
+    """Lê variável do ambiente/.env sem expor o valor em logs."""
+    return os.getenv(name, default)
+
+
 APP_TITLE = "Acumulados de Chuva nas Últimas 24h — Espírito Santo"
 APP_SUBTITLE = (
     "Script para verificação dos maiores acumulados de chuva de cada município "
@@ -26,7 +41,59 @@ APP_SUBTITLE = (
 
 CACHE_TTL_SECONDS = 120
 REQUEST_TIMEOUT_SECONDS = 30
+REQUEST_CONNECT_TIMEOUT_SECONDS = 5
+REQUEST_MAX_TENTATIVAS = 3
+REQUEST_BACKOFF_BASE_SECONDS = 0.5
+REQUEST_BACKOFF_MAX_SECONDS = 8.0
+REQUEST_HEDGE_PERCENTIL = 95
+REQUEST_HEDGE_MIN_AMOSTRAS = 20
+HTTP_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+SNAPSHOT_RETENCAO_COMPLETA_HORAS = 48
+SNAPSHOT_RETENCAO_HORARIA_DIAS = 30
+SNAPSHOT_RETENCAO_DIARIA_DIAS = 730
+SNAPSHOT_COMPACTACAO_INTERVALO_SECONDS = 3600
+REPLAY_MAX_QUADROS = 720
+
+# Regras padrão do motor de alertas; o arquivo ALERTAS_REGRAS_FILE pode
+# substituí-las e definir limiares por município.
+ALERTAS_REGRAS_PADRAO = [
+    {"nivel": "ATENÇÃO", "janela_horas": 24, "limiar_mm": 30.0, "histerese_mm": 3.0},
+    {"nivel": "ALERTA", "janela_horas": 24, "limiar_mm": 60.0, "histerese_mm": 5.0},
+    {"nivel": "ALERTA", "janela_horas": 1, "limiar_mm": 30.0, "histerese_mm": 5.0},
+]
+
+# Campo interpolado (IDW) sobre a caixa envolvente do ES.
+INTERPOLACAO_LIMITES = ((-21.35, -41.90), (-17.85, -39.65))
+INTERPOLACAO_RESOLUCAO_GRAUS = 0.05
+INTERPOLACAO_POTENCIA = 2.0
+INTERPOLACAO_VIZINHOS = 8
+INTERPOLACAO_RAIO_MASCARA_KM = 25.0
+MUNICIPIOS_INDICE_PASSO_GRAUS = 0.1
+
+# Controle de qualidade das leituras antes da consolidação.
+QC_MAX_24H_MM = 500.0
+QC_ESPACIAL_RAIO_KM = 20.0
+QC_ESPACIAL_MIN_VIZINHOS = 3
+QC_ESPACIAL_MINIMO_MM = 100.0
+QC_ESPACIAL_RAZAO = 0.1
+QC_TAXA_MAX_MM_H = 120.0
+QC_TRAVADO_HORAS = 26.0
+
+# Só a máquina local acessa a API por padrão; exponha com API_HOST=0.0.0.0.
+API_HOST = get_env("API_HOST", "127.0.0.1")
+# Sem API_PORT a API não sobe junto com o app; isolada, usa 8502.
+API_PORT = get_env("API_PORT")
+API_GZIP_MIN_BYTES = 1024
 ANA_TOKEN_TTL_SECONDS = 900
+# O token da ANA é renovado em segundo plano este tempo antes de vencer.
+ANA_TOKEN_ANTECEDENCIA_SECONDS = 120
+# Consultas em lote na ANA: códigos por pedido, por quanto tempo desistir do
+# modo lote depois que a API o recusar e os status HTTP que contam como recusa
+# (timeouts, 5xx e 401 não dizem nada sobre o modo lote).
+ANA_ESTACOES_POR_LOTE = 20
+ANA_LOTE_RECUSADO_SECONDS = 6 * 3600
+ANA_LOTE_STATUS_RECUSA = (400, 404, 405, 414, 422)
 
 CEMADEN_URL = "https://resources.cemaden.gov.br/graficos/interativo/getJson2.php?uf=ES"
 SATDES_MAP_URL = "https://satdes-backend.incaper.es.gov.br/api/v1/records/monitoring/map"
@@ -40,6 +107,36 @@ SOURCE_ANA = "ANA"
 SOURCE_SATDES = "SATDES"
 SOURCE_INMET = "INMET"
 
+# Cadência de coleta de cada fonte, próxima do intervalo de atualização real dela.
+INTERVALO_COLETA_SECONDS = {
+    SOURCE_CEMADEN: 60,
+    SOURCE_SATDES: 120,
+    SOURCE_ANA: 600,
+    SOURCE_INMET: 600,
+}
+COLETA_RETENTAR_FALHA_SECONDS = 30
+
+# Cadência adaptativa: limites da espera entre coletas e margem após a
+# publicação esperada.
+CADENCIA_INTERVALO_MINIMO_SECONDS = 30
+CADENCIA_INTERVALO_MAXIMO_SECONDS = 1800
+CADENCIA_MARGEM_SECONDS = 20
+CADENCIA_AMOSTRAS = 8
+
+# Processos que não coletam usam o estado compartilhado enquanto ele tiver até
+# esta idade; depois disso, voltam a coletar por conta própria.
+ESTADO_COMPARTILHADO_MAX_IDADE_SECONDS = 900
+
+# O processo coletor regrava o estado compartilhado neste intervalo, com ou sem
+# versão nova, para que ``gerado_em`` não envelheça enquanto ele estiver vivo.
+ESTADO_COMPARTILHADO_PUBLICAR_SECONDS = 60
+
+# Intervalo entre downloads da base de estações do SATDES para o catálogo.
+CATALOGO_ESTACOES_ATUALIZAR_SECONDS = 24 * 3600
+
+# Processos para ler e agregar payloads grandes fora do Streamlit (0 desliga).
+PARSE_PROCESSOS = int(os.getenv("PARSE_PROCESSOS", "0"))
+
 BASE_COLUMNS = ["Município", "Prec_mm", "Instituição"]
 EXTENDED_COLUMNS = [
     "Município",
@@ -55,7 +152,3 @@ EXTENDED_COLUMNS = [
 
 ALLOWED_SATDES_INSTITUTIONS = {"CEPDEC", "INCAPER"}
 
-
-def get_env(name: str, default: str | None = None) -> str | None:
-    """Lê variável do ambiente/.env sem expor o valor em logs."""
-    return os.getenv(name, default)
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import hashlib
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from itertools import repeat
 from zoneinfo import ZoneInfo
 
 import pandas as pd
-import requests
-import streamlit as st
 import urllib3
 from dateutil.parser import parse
 
@@ -14,23 +17,37 @@ from app.codEstacoes import ANA, CEPDEC, INCAPER, INMET
 from app.config.settings import (
     ALLOWED_SATDES_INSTITUTIONS,
     ANA_BASE_URL,
+    ANA_ESTACOES_POR_LOTE,
+    ANA_LOTE_RECUSADO_SECONDS,
+    ANA_LOTE_STATUS_RECUSA,
+    ANA_TOKEN_ANTECEDENCIA_SECONDS,
+    ANA_TOKEN_FILE,
+    ANA_TOKEN_LOCK,
     ANA_TOKEN_TTL_SECONDS,
     ANA_TOKEN_URL,
     CEMADEN_URL,
     EXTENDED_COLUMNS,
     INMET_BASE_URL,
-    REQUEST_TIMEOUT_SECONDS,
     SATDES_MAP_URL,
     SOURCE_ANA,
     SOURCE_CEMADEN,
     SOURCE_INMET,
+    SOURCE_SATDES,
 )
-from app.services.estacoes import carregar_base_estacoes
+from app.services.cache_http import cache_http
+from app.services.catalogo_estacoes import obter_catalogo
+from app.services.http import POLITICA_PADRAO, POLITICA_POR_ESTACAO, PoliticaRequisicao, requisitar
+from app.services.json_rapido import carregar_json, extrair_colunas
+from app.services.metricas import metricas
+from app.services.municipios_geo import atribuir_municipios
 from app.services.normalizacao import (
     garantir_colunas_estendidas,
     normalizar_instituicao,
     to_float,
 )
+from app.services.processos import executar_parse
+from app.services.qualidade import aprovadas
+from app.services.tokens import GerenciadorToken, chave_credenciais
 
 urllib3.disable_warnings()
 
@@ -42,11 +59,63 @@ MAPA_ESTACOES_SATDES = {
     **{k: ("INCAPER", v) for k, v in INCAPER.items()},
 }
 
+# Campos lidos dos payloads; o restante do JSON é descartado durante a leitura.
+CAMPOS_SATDES = ("id_station", "name", "code", "date_utc", "instant")
+CAMPOS_ANA = ("Data_Hora_Medicao", "Chuva_Adotada")
+CAMPO_CODIGO_ANA = "codigoestacao"
+CAMPOS_ANA_LOTE = (CAMPO_CODIGO_ANA, *CAMPOS_ANA)
+# Chave dos payloads que atendem várias estações: ``"lote:<cod>,<cod>,..."``.
+PREFIXO_LOTE = "lote:"
+
+COLUNAS_SATDES = [
+    "id_estacao",
+    "Município",
+    "Instituição",
+    "Prec_mm",
+    "Estação",
+    "Latitude",
+    "Longitude",
+    "Altitude",
+    "DataHoraReferencia",
+    "Fonte",
+]
+
+
+def hash_conteudo(*partes: bytes) -> str:
+    """Hash rápido do payload bruto, usado como versão dos dados de uma fonte."""
+    digest = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        digest.update(parte)
+    return digest.hexdigest()
+
+
+def referencia_http(response) -> datetime:
+    """Quando o servidor gerou o conteúdo (``Last-Modified``); sem o cabeçalho, agora."""
+    try:
+        return parsedate_to_datetime(response.headers["Last-Modified"]).astimezone(TZ_BRT)
+    except (KeyError, TypeError, ValueError):
+        return datetime.now(TZ_BRT)
+
 
 class DataCollector:
-    """Classe base para todos os coletores de acumulados."""
+    """Classe base para todos os coletores de acumulados.
+
+    Quando ``fetch()`` registra ``hash_payload``, ``get_dataframe()`` reaproveita
+    o último resultado processado para o mesmo hash e marca ``inalterado``. O
+    frame guardado é compartilhado entre coletas; quem chama recebe uma cópia
+    rasa, e alterações nela não chegam ao cache.
+    """
 
     fonte = "DESCONHECIDA"
+    politica: PoliticaRequisicao = POLITICA_PADRAO
+    # Fontes que recortam a janela de 24h localmente também variam com o relógio.
+    janela_versao_segundos: int | None = None
+
+    _ultimos_resultados: dict[str, tuple[str, pd.DataFrame]] = {}
+    _ultimos_resultados_lock = threading.Lock()
+
+    hash_payload: str | None = None
+    inalterado: bool = False
 
     def fetch(self):
         raise NotImplementedError("Implementar fetch() na classe filha.")
@@ -54,9 +123,33 @@ class DataCollector:
     def process(self, data):
         raise NotImplementedError("Implementar process() na classe filha.")
 
+    def versao(self) -> str | None:
+        if self.hash_payload is None:
+            return None
+        if not self.janela_versao_segundos:
+            return self.hash_payload
+        return f"{self.hash_payload}:{int(time.time() // self.janela_versao_segundos)}"
+
     def get_dataframe(self):
         data = self.fetch()
-        return self.process(data)
+        versao = self.versao()
+
+        if versao is not None:
+            with self._ultimos_resultados_lock:
+                anterior = self._ultimos_resultados.get(self.fonte)
+            if anterior is not None and anterior[0] == versao:
+                self.inalterado = True
+                return anterior[1].copy(deep=False)
+
+        df = self.process(data)
+        df.attrs["versao"] = versao
+        df.attrs["hash_payload"] = self.hash_payload
+
+        if versao is not None:
+            with self._ultimos_resultados_lock:
+                self._ultimos_resultados[self.fonte] = (versao, df)
+        self.inalterado = False
+        return df.copy(deep=False)
 
     @staticmethod
     def empty_dataframe() -> pd.DataFrame:
@@ -66,22 +159,27 @@ class DataCollector:
     def finalize(df: pd.DataFrame) -> pd.DataFrame:
         if df is None or df.empty:
             return DataCollector.empty_dataframe()
-        return garantir_colunas_estendidas(df)
+        return atribuir_municipios(garantir_colunas_estendidas(df))
 
 
 class CemadenCollector(DataCollector):
     fonte = SOURCE_CEMADEN
     BASE_URL = CEMADEN_URL
+    # O payload não traz horário de medição; vale o Last-Modified da resposta.
+    referencia: datetime | None = None
 
     def fetch(self):
         headers = {"Accept": "application/json", "User-Agent": "Mozilla/5.0"}
-        response = requests.get(
+        response = requisitar(
             self.BASE_URL,
+            fonte=self.fonte,
+            politica=self.politica,
+            cache=cache_http,
             headers=headers,
-            timeout=REQUEST_TIMEOUT_SECONDS,
             verify=False,
         )
-        response.raise_for_status()
+        self.hash_payload = hash_conteudo(response.content)
+        self.referencia = referencia_http(response)
         return response.json()
 
     def process(self, data):
@@ -101,16 +199,89 @@ class CemadenCollector(DataCollector):
 
         df["Instituição"] = SOURCE_CEMADEN
         df["Fonte"] = SOURCE_CEMADEN
-        df["DataHoraReferencia"] = datetime.now(TZ_BRT).isoformat()
+        df["DataHoraReferencia"] = (self.referencia or datetime.now(TZ_BRT)).isoformat()
         return self.finalize(df)
 
 
+def agregar_satdes(data, start_utc: datetime, end_utc: datetime, base_estacoes: dict) -> pd.DataFrame:
+    """Leitura e agregação por estação do payload SATDES; roda fora do processo do app."""
+    entrada = extrair_colunas(data, "data.prec.*.item", CAMPOS_SATDES)
+    registros = {coluna: [] for coluna in COLUNAS_SATDES}
+
+    for id_estacao, nome, codigo, date_utc, instantaneo in zip(
+        *(entrada[campo] for campo in CAMPOS_SATDES)
+    ):
+        codigo = codigo or ""
+        metadados = base_estacoes.get(nome, {})
+
+        instituicao = normalizar_instituicao(
+            metadados.get("instituicao")
+            or MAPA_ESTACOES_SATDES.get(nome, ("DESCONHECIDA", nome))[0]
+        )
+
+        if instituicao not in ALLOWED_SATDES_INSTITUTIONS:
+            continue
+
+        if "ANA" in codigo or "INMET" in codigo:
+            continue
+
+        if not date_utc:
+            continue
+
+        ts_utc = datetime.fromisoformat(date_utc.replace("Z", "+00:00"))
+        if not (start_utc <= ts_utc <= end_utc):
+            continue
+
+        municipio = (
+            metadados.get("municipio")
+            or MAPA_ESTACOES_SATDES.get(nome, ("DESCONHECIDA", nome))[1]
+        )
+
+        registros["id_estacao"].append(id_estacao)
+        registros["Município"].append(municipio)
+        registros["Instituição"].append(instituicao)
+        registros["Prec_mm"].append(to_float(instantaneo))
+        registros["Estação"].append(nome)
+        registros["Latitude"].append(metadados.get("latitude"))
+        registros["Longitude"].append(metadados.get("longitude"))
+        registros["Altitude"].append(metadados.get("altitude"))
+        registros["DataHoraReferencia"].append(ts_utc.astimezone(TZ_BRT).isoformat())
+        registros["Fonte"].append(SOURCE_SATDES)
+
+    df = pd.DataFrame(registros)
+    if df.empty:
+        return df
+
+    agrupado = (
+        df.groupby(
+            [
+                "id_estacao",
+                "Município",
+                "Instituição",
+                "Estação",
+                "Latitude",
+                "Longitude",
+                "Altitude",
+                "Fonte",
+            ],
+            dropna=False,
+            as_index=False,
+        )
+        .agg(
+            Prec_mm=("Prec_mm", "sum"),
+            DataHoraReferencia=("DataHoraReferencia", "max"),
+        )
+    )
+
+    return agrupado[agrupado["Prec_mm"] > 0]
+
+
 class SatdesCollector(DataCollector):
-    fonte = "SATDES"
+    fonte = SOURCE_SATDES
     BASE_URL = SATDES_MAP_URL
 
     def __init__(self):
-        self.base_estacoes = carregar_base_estacoes()
+        self.base_estacoes = obter_catalogo().por_nome
 
     def fetch(self):
         end_utc = datetime.now(timezone.utc)
@@ -119,208 +290,316 @@ class SatdesCollector(DataCollector):
         fim = end_utc.strftime("%Y-%m-%dT%H:%M")
         url = f"{self.BASE_URL}/{inicio}/{fim}"
 
-        response = requests.get(url, timeout=REQUEST_TIMEOUT_SECONDS)
-        response.raise_for_status()
-        return response.json(), start_utc, end_utc
-
-    def _metadados_estacao(self, nome: str) -> dict:
-        return self.base_estacoes.get(nome, {})
+        response = requisitar(url, fonte=self.fonte, politica=self.politica)
+        self.hash_payload = hash_conteudo(response.content)
+        return response.content, start_utc, end_utc
 
     def process(self, payload):
         data, start_utc, end_utc = payload
-        registros = []
+        return self.finalize(
+            executar_parse(self.fonte, agregar_satdes, data, start_utc, end_utc, self.base_estacoes)
+        )
 
-        for lista in data.get("data", {}).get("prec", {}).values():
-            for item in lista:
-                nome = item.get("name")
-                codigo = item.get("code", "")
-                metadados = self._metadados_estacao(nome)
 
-                instituicao = normalizar_instituicao(
-                    metadados.get("instituicao")
-                    or MAPA_ESTACOES_SATDES.get(nome, ("DESCONHECIDA", nome))[0]
-                )
+def solicitar_token_ana(identificador: str, senha: str) -> str:
+    """Pede um token novo à ANA."""
+    headers = {
+        "Identificador": identificador,
+        "Senha": senha,
+    }
 
-                if instituicao not in ALLOWED_SATDES_INSTITUTIONS:
-                    continue
+    response = requisitar(ANA_TOKEN_URL, fonte=SOURCE_ANA, headers=headers)
 
-                if "ANA" in codigo or "INMET" in codigo:
-                    continue
+    token = response.json().get("items", {}).get("tokenautenticacao")
+    if not token:
+        raise RuntimeError("Token ANA não retornado pela API.")
+    return token
 
-                date_utc = item.get("date_utc")
-                if not date_utc:
-                    continue
 
-                ts_utc = datetime.fromisoformat(date_utc.replace("Z", "+00:00"))
-                if not (start_utc <= ts_utc <= end_utc):
-                    continue
+_tokens_ana: dict[tuple[str, str], GerenciadorToken] = {}
+_tokens_ana_lock = threading.Lock()
 
-                municipio = (
-                    metadados.get("municipio")
-                    or MAPA_ESTACOES_SATDES.get(nome, ("DESCONHECIDA", nome))[1]
-                )
 
-                registros.append(
-                    {
-                        "id_estacao": item.get("id_station"),
-                        "Município": municipio,
-                        "Instituição": instituicao,
-                        "Prec_mm": to_float(item.get("instant")),
-                        "Estação": nome,
-                        "Latitude": metadados.get("latitude"),
-                        "Longitude": metadados.get("longitude"),
-                        "Altitude": metadados.get("altitude"),
-                        "DataHoraReferencia": ts_utc.astimezone(TZ_BRT).isoformat(),
-                        "Fonte": "SATDES",
-                    }
-                )
+def gerenciador_token_ana(identificador: str, senha: str) -> GerenciadorToken:
+    """Gerenciador do token da ANA para as credenciais, um por processo."""
+    with _tokens_ana_lock:
+        gerenciador = _tokens_ana.get((identificador, senha))
+        if gerenciador is None:
+            gerenciador = GerenciadorToken(
+                SOURCE_ANA,
+                chave_credenciais(identificador, senha),
+                lambda: solicitar_token_ana(identificador, senha),
+                ANA_TOKEN_FILE,
+                ANA_TOKEN_LOCK,
+                ttl=ANA_TOKEN_TTL_SECONDS,
+                antecedencia=ANA_TOKEN_ANTECEDENCIA_SECONDS,
+            )
+            _tokens_ana[(identificador, senha)] = gerenciador
+        return gerenciador
 
-        df = pd.DataFrame(registros)
-        if df.empty:
-            return self.empty_dataframe()
 
-        agrupado = (
-            df.groupby(
-                [
-                    "id_estacao",
-                    "Município",
-                    "Instituição",
-                    "Estação",
-                    "Latitude",
-                    "Longitude",
-                    "Altitude",
-                    "Fonte",
-                ],
-                dropna=False,
-                as_index=False,
-            )
-            .agg(
-                Prec_mm=("Prec_mm", "sum"),
-                DataHoraReferencia=("DataHoraReferencia", "max"),
-            )
-        )
+def obter_token_ana(identificador: str, senha: str) -> str:
+    """Token da ANA válido, renovado em segundo plano antes de vencer."""
+    return gerenciador_token_ana(identificador, senha).obter()
 
-        agrupado = agrupado[agrupado["Prec_mm"] > 0]
-        return self.finalize(agrupado)
 
+def renovar_token_ana(identificador: str, senha: str, rejeitado: str) -> str:
+    """Substitui um token que a ANA recusou com 401."""
+    return gerenciador_token_ana(identificador, senha).renovar(rejeitado)
 
-@st.cache_resource(ttl=ANA_TOKEN_TTL_SECONDS)
-def obter_token_ana(identificador: str, senha: str) -> str:
-    """Obtém e mantém em cache o token da ANA."""
-    headers = {
-        "Identificador": identificador,
-        "Senha": senha,
-    }
 
-    response = requests.get(ANA_TOKEN_URL, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
-    response.raise_for_status()
+def token_recusado(exc: Exception) -> bool:
+    response = getattr(exc, "response", None)
+    return response is not None and response.status_code == 401
 
-    token = response.json().get("items", {}).get("tokenautenticacao")
-    if not token:
-        raise RuntimeError("Token ANA não retornado pela API.")
 
-    return token
+def lote_recusado(exc: Exception) -> bool:
+    """A API rejeitou o pedido em lote com um 4xx explícito (``ANA_LOTE_STATUS_RECUSA``)."""
+    response = getattr(exc, "response", None)
+    return response is not None and response.status_code in ANA_LOTE_STATUS_RECUSA
 
 
 class AnaCollector(DataCollector):
+    """Coleta as séries da ANA, agrupando estações em lotes quando a API aceita.
+
+    Cada lote pede vários códigos numa só consulta. Um lote com erro, ou cuja
+    resposta não identifica as estações pedidas, é refeito estação a estação; se
+    a API recusar o lote (um dos ``ANA_LOTE_STATUS_RECUSA``), o modo fica
+    desligado por ``ANA_LOTE_RECUSADO_SECONDS``.
+    """
+
     fonte = SOURCE_ANA
     BASE_URL = ANA_BASE_URL
+    politica = POLITICA_POR_ESTACAO
+    janela_versao_segundos = 900
+    estacoes_por_lote = ANA_ESTACOES_POR_LOTE
+
+    _lote_recusado_ate = 0.0
+    _lote_lock = threading.Lock()
 
     def __init__(self, identificador, senha, estacoes_dict, max_workers=8):
         self.identificador = identificador
         self.senha = senha
         self.estacoes = estacoes_dict
         self.max_workers = max_workers
-        self.base_estacoes = carregar_base_estacoes()
+        self.base_estacoes = obter_catalogo().da_fonte(self.fonte)
 
-    def _consulta_estacao(self, codigo, token):
+    def _url_serie(self, codigos: str) -> str:
         data_busca = datetime.now(TZ_BRT).strftime("%Y-%m-%d")
-        url = (
+        return (
             f"{self.BASE_URL}/HidroinfoanaSerieTelemetricaAdotada/v1"
-            f"?Código da Estação={codigo}"
+            f"?Código da Estação={codigos}"
             f"&Tipo Filtro Data=DATA_LEITURA"
             f"&Data de Busca (yyyy-MM-dd)={data_busca}"
             f"&Range Intervalo de busca=DIAS_2"
         )
 
-        headers = {"Authorization": f"Bearer {token}"}
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
-        response.raise_for_status()
-        return codigo, response.json()
-
-    def fetch(self):
-        end_utc = datetime.now(timezone.utc)
-        start_utc = end_utc - timedelta(hours=24)
-        registros = []
+    def _requisitar_serie(self, codigos: str):
+        """Consulta a série com o token atual; num 401, renova o token uma vez e repete.
 
+        O token é lido a cada consulta: depois que uma delas renova, as demais
+        da mesma coleta já saem com o novo.
+        """
         token = obter_token_ana(self.identificador, self.senha)
+        try:
+            return requisitar(
+                self._url_serie(codigos),
+                fonte=self.fonte,
+                politica=self.politica,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        except Exception as exc:
+            if not token_recusado(exc):
+                raise
+        token = renovar_token_ana(self.identificador, self.senha, token)
+        return requisitar(
+            self._url_serie(codigos),
+            fonte=self.fonte,
+            politica=self.politica,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    def _consulta_estacao(self, codigo):
+        response = self._requisitar_serie(codigo)
+        return codigo, response.content
+
+    def _consulta_lote(self, codigos: list[str]) -> tuple[bytes | None, set[str], bool]:
+        """Payload do lote, códigos que vieram nele e se a API recusou o modo lote.
+
+        A resposta só vale se todos os itens trazem o código de uma estação pedida.
+        Um único código numa resposta a vários é tratado como lote não suportado
+        (a API pode ter lido só o primeiro). Lote sem itens não prova nada: é
+        refeito por estação, sem desligar o modo, assim como um lote que falhou
+        por timeout, conexão ou erro do servidor.
+        """
+        try:
+            response = self._requisitar_serie(",".join(codigos))
+            colunas = extrair_colunas(response.content, "items.item", (CAMPO_CODIGO_ANA,))
+            retornados = {str(codigo) for codigo in colunas[CAMPO_CODIGO_ANA]}
+        except Exception as exc:
+            # Só uma rejeição explícita desliga o modo; falhas transitórias valem
+            # apenas para esta coleta.
+            return None, set(), lote_recusado(exc)
+
+        if not retornados:
+            return None, set(), False
+        if not retornados <= set(codigos) or (len(retornados) == 1 and len(codigos) > 1):
+            return None, set(), True
+        return response.content, retornados, False
+
+    @classmethod
+    def lote_disponivel(cls) -> bool:
+        with cls._lote_lock:
+            return time.monotonic() >= cls._lote_recusado_ate
+
+    @classmethod
+    def recusar_lote(cls) -> None:
+        with cls._lote_lock:
+            cls._lote_recusado_ate = time.monotonic() + ANA_LOTE_RECUSADO_SECONDS
+
+    def _coletar_lotes(self, executor, payloads: dict) -> list[str]:
+        """Consulta os lotes e devolve os códigos que ainda precisam de consulta própria."""
+        codigos = list(self.estacoes)
+        tamanho = self.estacoes_por_lote
+        lotes = [codigos[inicio:inicio + tamanho] for inicio in range(0, len(codigos), tamanho)]
+        futures = {executor.submit(self._consulta_lote, lote): lote for lote in lotes if len(lote) > 1}
+        pendentes = [cod for lote in lotes if len(lote) == 1 for cod in lote]
+
+        for future in as_completed(futures):
+            lote = futures[future]
+            conteudo, retornados, recusado = future.result()
+            metricas.incrementar(self.fonte, "consultas_em_lote")
+            if conteudo is None:
+                # O pedido do lote se soma aos que serão feitos estação a estação.
+                metricas.incrementar(self.fonte, "requisicoes_economizadas", -1)
+                pendentes.extend(lote)
+                if recusado:
+                    metricas.incrementar(self.fonte, "lotes_recusados")
+                    self.recusar_lote()
+                continue
+            payloads[PREFIXO_LOTE + ",".join(lote)] = conteudo
+            # Estações que o lote não trouxe são consultadas uma a uma.
+            ausentes = [cod for cod in lote if cod not in retornados]
+            pendentes.extend(ausentes)
+            metricas.incrementar(self.fonte, "requisicoes_economizadas", len(retornados) - 1)
+            if ausentes:
+                metricas.incrementar(self.fonte, "estacoes_fora_do_lote", len(ausentes))
+
+        return pendentes
+
+    def fetch(self):
+        # Sem token não adianta disparar as consultas: a coleta falha aqui.
+        obter_token_ana(self.identificador, self.senha)
+        payloads = {}
 
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pendentes = list(self.estacoes)
+            if self.estacoes_por_lote > 1 and self.lote_disponivel():
+                pendentes = self._coletar_lotes(executor, payloads)
+
             futures = {
-                executor.submit(self._consulta_estacao, cod, token): (cod, muni)
-                for cod, muni in self.estacoes.items()
+                executor.submit(self._consulta_estacao, cod): cod
+                for cod in pendentes
             }
 
             for future in as_completed(futures):
-                cod, muni = futures[future]
-                metadados = self.base_estacoes.get(cod, {})
-
+                cod = futures[future]
                 try:
-                    _, payload = future.result()
-                    items = payload.get("items", [])
-                    soma = 0.0
-                    ultima_referencia = None
-
-                    for item in items:
-                        data_str = item.get("Data_Hora_Medicao")
-                        if not data_str:
-                            continue
-
-                        try:
-                            ts = parse(data_str)
-                            ts = ts.replace(tzinfo=TZ_BRT).astimezone(timezone.utc)
-                        except Exception:
-                            continue
-
-                        if not (start_utc <= ts <= end_utc):
-                            continue
-
-                        soma += to_float(item.get("Chuva_Adotada"))
-                        ultima_referencia = ts.astimezone(TZ_BRT).isoformat()
-
-                    if soma > 0:
-                        registros.append(
-                            {
-                                "Estação": cod,
-                                "Município": metadados.get("municipio") or muni,
-                                "Instituição": SOURCE_ANA,
-                                "Prec_mm": round(soma, 2),
-                                "Latitude": metadados.get("latitude"),
-                                "Longitude": metadados.get("longitude"),
-                                "Altitude": metadados.get("altitude"),
-                                "DataHoraReferencia": ultima_referencia,
-                                "Fonte": SOURCE_ANA,
-                            }
-                        )
+                    _, payloads[cod] = future.result()
                 except Exception as exc:
                     print(f"Erro na estação {cod}: {exc}")
 
-        if not registros:
-            return self.empty_dataframe()
+        ordenados = sorted(payloads.items())
+        self.hash_payload = hash_conteudo(
+            *(parte for cod, conteudo in ordenados for parte in (cod.encode(), conteudo))
+        )
+        return payloads
 
-        df = pd.DataFrame(registros).sort_values(by="Prec_mm", ascending=False)
-        return self.finalize(df)
+    def process(self, payloads):
+        end_utc = datetime.now(timezone.utc)
+        start_utc = end_utc - timedelta(hours=24)
+        return self.finalize(
+            executar_parse(
+                self.fonte, agregar_ana, payloads, self.estacoes, self.base_estacoes, start_utc, end_utc
+            )
+        )
+
+
+def agregar_ana(
+    payloads: dict, estacoes: dict, base_estacoes: dict, start_utc: datetime, end_utc: datetime
+) -> pd.DataFrame:
+    """Soma das últimas 24h por estação da ANA; roda fora do processo do app.
+
+    Payloads de lote (chave com ``PREFIXO_LOTE``) trazem várias estações, separadas
+    pelo campo ``codigoestacao`` de cada item.
+    """
+    acumulados: dict[str, list] = {}
+
+    for chave, conteudo in payloads.items():
+        try:
+            if chave.startswith(PREFIXO_LOTE):
+                colunas = extrair_colunas(conteudo, "items.item", CAMPOS_ANA_LOTE)
+                codigos = [str(codigo) for codigo in colunas[CAMPO_CODIGO_ANA]]
+            else:
+                colunas = extrair_colunas(conteudo, "items.item", CAMPOS_ANA)
+                codigos = repeat(chave)
+
+            for cod, data_str, chuva in zip(codigos, *(colunas[campo] for campo in CAMPOS_ANA)):
+                if not data_str:
+                    continue
+
+                try:
+                    ts = parse(data_str)
+                    ts = ts.replace(tzinfo=TZ_BRT).astimezone(timezone.utc)
+                except Exception:
+                    continue
+
+                if not (start_utc <= ts <= end_utc):
+                    continue
+
+                acumulado = acumulados.setdefault(cod, [0.0, None])
+                acumulado[0] += to_float(chuva)
+                referencia = ts.astimezone(TZ_BRT).isoformat()
+                acumulado[1] = max(acumulado[1] or referencia, referencia)
+        except Exception as exc:
+            print(f"Erro na estação {chave}: {exc}")
+
+    registros = []
+    for cod, (soma, ultima_referencia) in acumulados.items():
+        if soma <= 0:
+            continue
+        metadados = base_estacoes.get(cod, {})
+        registros.append(
+            {
+                "Estação": cod,
+                "Município": metadados.get("municipio") or estacoes.get(cod),
+                "Instituição": SOURCE_ANA,
+                "Prec_mm": round(soma, 2),
+                "Latitude": metadados.get("latitude"),
+                "Longitude": metadados.get("longitude"),
+                "Altitude": metadados.get("altitude"),
+                "DataHoraReferencia": ultima_referencia,
+                "Fonte": SOURCE_ANA,
+            }
+        )
+
+    if not registros:
+        return pd.DataFrame(columns=EXTENDED_COLUMNS)
+
+    return pd.DataFrame(registros).sort_values(by="Prec_mm", ascending=False)
 
 
 class InmetCollector(DataCollector):
     fonte = SOURCE_INMET
     BASE_URL = INMET_BASE_URL
+    politica = POLITICA_POR_ESTACAO
+    janela_versao_segundos = 900
 
     def __init__(self, token: str, estacoes_dict=None, max_workers=8):
         self.token = token
         self.estacoes = estacoes_dict or INMET
         self.max_workers = max_workers
-        self.base_estacoes = carregar_base_estacoes()
+        self.base_estacoes = obter_catalogo().da_fonte(self.fonte)
 
     def _consulta_estacao(self, codigo: str):
         fim = datetime.now(TZ_BRT).date()
@@ -330,9 +609,8 @@ class InmetCollector(DataCollector):
             f"{inicio.isoformat()}/{fim.isoformat()}/{codigo}/{self.token}"
         )
 
-        response = requests.get(url, timeout=REQUEST_TIMEOUT_SECONDS)
-        response.raise_for_status()
-        return codigo, response.json()
+        response = requisitar(url, fonte=self.fonte, politica=self.politica)
+        return codigo, response.content
 
     @staticmethod
     def _valor_chuva(item: dict) -> float:
@@ -364,67 +642,94 @@ class InmetCollector(DataCollector):
         if not self.token:
             raise RuntimeError("Token INMET não configurado.")
 
-        end_utc = datetime.now(timezone.utc)
-        start_utc = end_utc - timedelta(hours=24)
-        registros = []
+        payloads = {}
 
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             futures = {
-                executor.submit(self._consulta_estacao, cod): (cod, muni)
-                for cod, muni in self.estacoes.items()
+                executor.submit(self._consulta_estacao, cod): cod
+                for cod in self.estacoes
             }
 
             for future in as_completed(futures):
-                cod, muni = futures[future]
-                metadados = self.base_estacoes.get(cod, {})
-
+                cod = futures[future]
                 try:
-                    _, payload = future.result()
-                    if isinstance(payload, dict):
-                        items = payload.get("data", payload.get("items", []))
-                    else:
-                        items = payload
-
-                    soma = 0.0
-                    ultima_referencia = None
-
-                    for item in items or []:
-                        ts = self._timestamp_medicao(item)
-                        if not ts or not (start_utc <= ts <= end_utc):
-                            continue
-
-                        soma += self._valor_chuva(item)
-                        ultima_referencia = ts.astimezone(TZ_BRT).isoformat()
-
-                    if soma > 0:
-                        registros.append(
-                            {
-                                "Estação": cod,
-                                "Município": metadados.get("municipio") or muni,
-                                "Instituição": SOURCE_INMET,
-                                "Prec_mm": round(soma, 2),
-                                "Latitude": metadados.get("latitude"),
-                                "Longitude": metadados.get("longitude"),
-                                "Altitude": metadados.get("altitude"),
-                                "DataHoraReferencia": ultima_referencia,
-                                "Fonte": SOURCE_INMET,
-                            }
-                        )
+                    _, payloads[cod] = future.result()
                 except Exception as exc:
                     print(f"Erro na estação INMET {cod}: {exc}")
 
-        if not registros:
-            return self.empty_dataframe()
+        ordenados = sorted(payloads.items())
+        self.hash_payload = hash_conteudo(
+            *(parte for cod, conteudo in ordenados for parte in (cod.encode(), conteudo))
+        )
+        return payloads
 
-        df = pd.DataFrame(registros).sort_values(by="Prec_mm", ascending=False)
-        return self.finalize(df)
+    def process(self, payloads):
+        end_utc = datetime.now(timezone.utc)
+        start_utc = end_utc - timedelta(hours=24)
+        return self.finalize(
+            executar_parse(
+                self.fonte, agregar_inmet, payloads, self.estacoes, self.base_estacoes, start_utc, end_utc
+            )
+        )
+
+
+def agregar_inmet(
+    payloads: dict, estacoes: dict, base_estacoes: dict, start_utc: datetime, end_utc: datetime
+) -> pd.DataFrame:
+    """Soma das últimas 24h por estação do INMET; roda fora do processo do app."""
+    registros = []
+
+    for cod, conteudo in payloads.items():
+        muni = estacoes.get(cod)
+        metadados = base_estacoes.get(cod, {})
+
+        try:
+            payload = carregar_json(conteudo)
+            if isinstance(payload, dict):
+                items = payload.get("data", payload.get("items", []))
+            else:
+                items = payload
+
+            soma = 0.0
+            ultima_referencia = None
+
+            for item in items or []:
+                ts = InmetCollector._timestamp_medicao(item)
+                if not ts or not (start_utc <= ts <= end_utc):
+                    continue
+
+                soma += InmetCollector._valor_chuva(item)
+                ultima_referencia = ts.astimezone(TZ_BRT).isoformat()
+
+            if soma > 0:
+                registros.append(
+                    {
+                        "Estação": cod,
+                        "Município": metadados.get("municipio") or muni,
+                        "Instituição": SOURCE_INMET,
+                        "Prec_mm": round(soma, 2),
+                        "Latitude": metadados.get("latitude"),
+                        "Longitude": metadados.get("longitude"),
+                        "Altitude": metadados.get("altitude"),
+                        "DataHoraReferencia": ultima_referencia,
+                        "Fonte": SOURCE_INMET,
+                    }
+                )
+        except Exception as exc:
+            print(f"Erro na estação INMET {cod}: {exc}")
+
+    if not registros:
+        return pd.DataFrame(columns=EXTENDED_COLUMNS)
+
+    return pd.DataFrame(registros).sort_values(by="Prec_mm", ascending=False)
 
 
 class Joiner:
     @staticmethod
     def join(*dfs):
+        # Leituras reprovadas no controle de qualidade não disputam o máximo.
         validos = [
-            garantir_colunas_estendidas(df)
+            garantir_colunas_estendidas(aprovadas(df))
             for df in dfs
             if df is not None and not df.empty
         ]
@@ -438,8 +743,10 @@ class Joiner:
         if df.empty:
             return DataCollector.empty_dataframe()
 
+        # Só as linhas vencedoras são copiadas e ordenadas.
+        maiores = df.groupby("Município", sort=False)["Prec_mm"].idxmax()
         return (
-            df.sort_values("Prec_mm", ascending=False)
-            .drop_duplicates("Município")
+            df.loc[maiores.to_numpy()]
+            .sort_values("Prec_mm", ascending=False, kind="stable")
             .reset_index(drop=True)
         )
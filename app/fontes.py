@@ -0,0 +1,79 @@
+"""Declaração das fontes de acumulados.
+
+Para incluir uma fonte nova basta implementar o ``DataCollector`` e registrar
+aqui um ``FonteConfig``; o orquestrador cuida de cadência, concorrência,
+credenciais e status.
+"""
+from __future__ import annotations
+
+from app.codEstacoes import ANA, INMET
+from app.config.settings import (
+    INTERVALO_COLETA_SECONDS,
+    REQUEST_TIMEOUT_SECONDS,
+    SOURCE_ANA,
+    SOURCE_CEMADEN,
+    SOURCE_INMET,
+    SOURCE_SATDES,
+)
+from app.dataCollector import AnaCollector, CemadenCollector, InmetCollector, SatdesCollector
+from app.services.orquestrador import FonteConfig, registrar_fonte
+
+
+FONTE_CEMADEN = registrar_fonte(
+    FonteConfig(
+        nome=SOURCE_CEMADEN,
+        fabrica=lambda config: CemadenCollector(),
+        intervalo_segundos=INTERVALO_COLETA_SECONDS[SOURCE_CEMADEN],
+        prioridade=10,
+        timeout_segundos=REQUEST_TIMEOUT_SECONDS,
+        descricao="CEMADEN",
+    )
+)
+
+FONTE_SATDES = registrar_fonte(
+    FonteConfig(
+        nome=SOURCE_SATDES,
+        fabrica=lambda config: SatdesCollector(),
+        intervalo_segundos=INTERVALO_COLETA_SECONDS[SOURCE_SATDES],
+        prioridade=20,
+        timeout_segundos=REQUEST_TIMEOUT_SECONDS,
+        descricao="CEPDEC e INCAPER",
+    )
+)
+
+FONTE_ANA = registrar_fonte(
+    FonteConfig(
+        nome=SOURCE_ANA,
+        fabrica=lambda config, identificador, senha: AnaCollector(
+            identificador=identificador,
+            senha=senha,
+            estacoes_dict=ANA,
+            max_workers=config.max_workers,
+        ),
+        intervalo_segundos=INTERVALO_COLETA_SECONDS[SOURCE_ANA],
+        prioridade=30,
+        max_workers=8,
+        timeout_segundos=REQUEST_TIMEOUT_SECONDS,
+        credenciais={"identificador": "ANA_ID", "senha": "ANA_PWD"},
+        descricao="ANA",
+        mensagem_sem_credenciais="Credenciais ANA não configuradas.",
+    )
+)
+
+FONTE_INMET = registrar_fonte(
+    FonteConfig(
+        nome=SOURCE_INMET,
+        fabrica=lambda config, token: InmetCollector(
+            token=token,
+            estacoes_dict=INMET,
+            max_workers=config.max_workers,
+        ),
+        intervalo_segundos=INTERVALO_COLETA_SECONDS[SOURCE_INMET],
+        prioridade=40,
+        max_workers=8,
+        timeout_segundos=REQUEST_TIMEOUT_SECONDS,
+        credenciais={"token": "INMET_API_TOKEN"},
+        descricao="INMET",
+        mensagem_sem_credenciais="Token INMET não configurado.",
+    )
+)
@@ -1,34 +1,53 @@
 from __future__ import annotations
 
-from datetime import datetime
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 from zoneinfo import ZoneInfo
 
-import folium
+import numpy as np
 import pandas as pd
 import streamlit as st
-from folium import Element
-from PIL import Image
-from streamlit_folium import st_folium
-
-from app.codEstacoes import ANA, INMET
-from app.config.settings import (
-    APP_TITLE,
-    CACHE_TTL_SECONDS,
-    EXTENDED_COLUMNS,
-    SOURCE_ANA,
-    SOURCE_CEMADEN,
-    SOURCE_INMET,
-    SOURCE_SATDES,
-    get_env,
-)
-from app.dataCollector import AnaCollector, CemadenCollector, InmetCollector, Joiner, SatdesCollector
+
+import app.fontes  # noqa: F401 - registra as fontes no orquestrador
+from app.config.settings import API_HOST, APP_TITLE, ESTADO_COMPARTILHADO_MAX_IDADE_SECONDS, SNAPSHOT_DIR, get_env
+from app.dataCollector import Joiner, hash_conteudo
 from app.municipiosES import municipios_lat_lon_acumulados
-from app.render_header_footer import render_footer, render_header
+from app.render_header_footer import carregar_imagem, render_footer, render_header
+from app.services.alertas import MotorAlertas, alertas_abertos
+from app.services.catalogo_estacoes import agendar_atualizacao_catalogo, obter_catalogo
+from app.services.estado import EstadoPublicado, obter_estado, publicar_estado
+from app.services.estado_compartilhado import (
+    LeitorEstadoCompartilhado,
+    agendar_estado_compartilhado,
+    agendar_publicacao,
+    assumir_coleta,
+)
 from app.services.fonte_status import FonteStatus
-from app.services.snapshots import salvar_snapshot_json
+from app.services.interpolacao import CampoChuva, interpolar, pontos_observados
+from app.services.metricas import metricas
+from app.services.municipios_geo import IndiceMunicipios, geojson_com_valores, indice_municipios
+from app.services.orquestrador import Orquestrador, ResultadoColeta, dataframe_vazio
+from app.services.proximidade import indice_do_estado
+from app.services.qualidade import COLUNAS_QC, FiltroQualidade, aprovadas
+from app.services.replay import AnelQuadros
+from app.services.snapshots import agendar_snapshot_json
+from app.services.tabela_paginada import TAMANHOS_PAGINA, TabelaAcumulados, total_paginas
+
+if TYPE_CHECKING:
+    import folium
+
+# folium, streamlit_folium e PIL só são importados quando o mapa ou as imagens
+# são usados pela primeira vez, fora do caminho de importação do módulo.
 
 TZ_BRT = ZoneInfo("America/Sao_Paulo")
 
+# Última consolidação do processo; evita novo join/snapshot quando nenhuma fonte mudou.
+_ultima_consolidacao: dict = {}
+_consolidacao_lock = threading.Lock()
+_consolidar_lock = threading.Lock()
+
 
 def get_secret(name: str, default: str | None = None) -> str | None:
     """Busca configuração primeiro no Streamlit secrets e depois no .env."""
@@ -42,94 +61,176 @@ def get_secret(name: str, default: str | None = None) -> str | None:
     return get_env(name, default)
 
 
-@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner="Buscando dados do CEMADEN...")
-def load_cemaden():
-    return CemadenCollector().get_dataframe()
+@st.cache_resource
+def obter_orquestrador() -> Orquestrador:
+    """Orquestrador único do processo: cada fonte é coletada na sua cadência."""
+    return Orquestrador(obter_credencial=get_secret)
 
 
-@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner="Buscando dados do CEPDEC e INCAPER...")
-def load_satdes():
-    return SatdesCollector().get_dataframe()
+def coletar_fontes() -> list[ResultadoColeta]:
+    orquestrador = obter_orquestrador()
+    pendentes = orquestrador.pendentes()
+    if not pendentes:
+        return orquestrador.coletar()
 
-
-@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner="Buscando dados da ANA...")
-def load_ana(identificador: str, senha: str):
-    collector = AnaCollector(
-        identificador=identificador,
-        senha=senha,
-        estacoes_dict=ANA,
-        max_workers=8,
-    )
-    return collector.fetch()
+    descricoes = ", ".join(config.descricao or config.nome for config in pendentes)
+    with st.spinner(f"Buscando dados de {descricoes}..."):
+        return orquestrador.coletar()
 
 
-@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner="Buscando dados do INMET...")
-def load_inmet(token: str):
-    collector = InmetCollector(
-        token=token,
-        estacoes_dict=INMET,
-        max_workers=8,
-    )
-    return collector.fetch()
+def versao_consolidacao(dfs: list[pd.DataFrame]) -> str | None:
+    """Combina as versões das fontes; ``None`` quando alguma fonte não tem versão."""
+    versoes = []
+    for df in dfs:
+        versao = df.attrs.get("versao")
+        if versao is None and not df.empty:
+            return None
+        versoes.append(versao or "vazio")
+    return hash_conteudo(*(versao.encode() for versao in versoes))
 
 
-def dataframe_vazio() -> pd.DataFrame:
-    return pd.DataFrame(columns=EXTENDED_COLUMNS)
+@st.cache_resource
+def obter_motor_alertas() -> MotorAlertas:
+    return MotorAlertas(snapshots=SNAPSHOT_DIR)
 
 
-def coletar_fonte(nome: str, funcao, *args):
+def avaliar_alertas(df: pd.DataFrame) -> None:
+    """Só o processo coletor avalia; alertas não podem derrubar a consolidação."""
+    if not assumir_coleta():
+        return
     try:
-        df = funcao(*args)
-        if df is None or df.empty:
-            return dataframe_vazio(), FonteStatus.sucesso_coleta(nome, 0)
-
-        return df, FonteStatus.sucesso_coleta(nome, len(df))
+        obter_motor_alertas().avaliar(df)
     except Exception as exc:
-        return dataframe_vazio(), FonteStatus.falha_coleta(nome, exc)
+        print(f"Erro ao avaliar alertas: {exc}")
 
 
-def carregar_acumulados():
-    dfs = []
-    status = []
+def rede_coletada(status: list[FonteStatus]) -> list[dict]:
+    """Registros do catálogo das fontes coletadas com sucesso.
 
-    df_cemaden, status_cemaden = coletar_fonte(SOURCE_CEMADEN, load_cemaden)
-    dfs.append(df_cemaden)
-    status.append(status_cemaden)
+    A ausência de leitura de uma fonte fora do ar não quer dizer chuva zero.
+    """
+    fontes_ok = {item.fonte for item in status if item.sucesso}
+    return [registro for registro in obter_catalogo().registros if registro["fonte"] in fontes_ok]
 
-    df_satdes, status_satdes = coletar_fonte(SOURCE_SATDES, load_satdes)
-    dfs.append(df_satdes)
-    status.append(status_satdes)
 
-    ana_id = get_secret("ANA_ID")
-    ana_pwd = get_secret("ANA_PWD")
-    if ana_id and ana_pwd:
-        df_ana, status_ana = coletar_fonte(SOURCE_ANA, load_ana, ana_id, ana_pwd)
-    else:
-        df_ana, status_ana = dataframe_vazio(), FonteStatus.falha_coleta(
-            SOURCE_ANA,
-            "Credenciais ANA não configuradas.",
+def calcular_campo(dfs: list[pd.DataFrame], status: list[FonteStatus]) -> CampoChuva | None:
+    """Campo interpolado com as leituras das fontes e 0.0 nas estações secas de ``rede_coletada``."""
+    try:
+        return interpolar(
+            pontos_observados([aprovadas(df) for df in dfs], obter_catalogo().por_nome, rede_coletada(status))
         )
-    dfs.append(df_ana)
-    status.append(status_ana)
+    except Exception as exc:
+        print(f"Erro ao interpolar campo de chuva: {exc}")
+        return None
 
-    inmet_token = get_secret("INMET_API_TOKEN")
-    if inmet_token:
-        df_inmet, status_inmet = coletar_fonte(SOURCE_INMET, load_inmet, inmet_token)
-    else:
-        df_inmet, status_inmet = dataframe_vazio(), FonteStatus.falha_coleta(
-            SOURCE_INMET,
-            "Token INMET não configurado.",
-        )
-    dfs.append(df_inmet)
-    status.append(status_inmet)
 
-    try:
-        df_final = Joiner.join(*dfs)
-        salvar_snapshot_json(df_final)
-        return df_final, status
-    except Exception as exc:
-        status.append(FonteStatus.falha_coleta("CONSOLIDAÇÃO", exc))
-        return dataframe_vazio(), status
+def campo_atual() -> CampoChuva | None:
+    with _consolidacao_lock:
+        return _ultima_consolidacao.get("campo")
+
+
+@st.cache_resource
+def obter_filtro_qualidade() -> FiltroQualidade:
+    return FiltroQualidade()
+
+
+@st.cache_resource
+def obter_leitor_estado() -> LeitorEstadoCompartilhado:
+    return LeitorEstadoCompartilhado()
+
+
+def estado_de_outro_processo() -> EstadoPublicado | None:
+    """Estado recente gravado pelo processo coletor, quando este processo não é ele.
+
+    A trava é tentada a cada execução: se o coletor morrer, outro processo assume.
+    """
+    if assumir_coleta():
+        return None
+
+    estado = obter_leitor_estado().obter()
+    if estado is None:
+        return None
+    idade = (datetime.now(TZ_BRT) - estado.gerado_em).total_seconds()
+    return estado if idade <= ESTADO_COMPARTILHADO_MAX_IDADE_SECONDS else None
+
+
+def usar_estado_compartilhado(estado: EstadoPublicado):
+    """Adota o estado do coletor sem coletar, filtrar nem consolidar de novo."""
+    with _consolidacao_lock:
+        if _ultima_consolidacao.get("versao") == estado.versao:
+            return _ultima_consolidacao["df"], list(estado.status)
+
+    publicar_estado(estado.consolidado, estado.fontes, estado.status)
+    campo = calcular_campo(list(estado.fontes.values()), estado.status)
+    with _consolidacao_lock:
+        _ultima_consolidacao.update(versao=estado.versao, df=estado.consolidado, campo=campo)
+    return estado.consolidado, list(estado.status)
+
+
+def consolidar(resultados: list[ResultadoColeta]):
+    """Filtra, junta e publica as coletas; reaproveita a última consolidação se nada mudou."""
+    dfs = [resultado.df for resultado in resultados]
+    status = [resultado.status for resultado in resultados]
+
+    versao = versao_consolidacao(dfs)
+    # Reruns e o publicador do estado compartilhado consolidam em paralelo; o
+    # filtro de qualidade guarda histórico e não pode ver a mesma versão duas vezes.
+    with _consolidar_lock:
+        with _consolidacao_lock:
+            anterior = _ultima_consolidacao.get("df")
+            if versao is not None and _ultima_consolidacao.get("versao") == versao:
+                return anterior, status
+
+        try:
+            dfs = obter_filtro_qualidade().aplicar(dfs, rede=rede_coletada(status))
+            df_final = Joiner.join(*dfs)
+            df_final.attrs["versao"] = versao
+            agendar_snapshot_json(df_final)
+            avaliar_alertas(df_final)
+            estado = publicar_estado(
+                df_final,
+                {resultado.fonte: df for resultado, df in zip(resultados, dfs)},
+                status,
+            )
+            agendar_estado_compartilhado(estado)
+            campo = calcular_campo(dfs, status)
+            with _consolidacao_lock:
+                _ultima_consolidacao.update(versao=versao, df=df_final, campo=campo)
+            return df_final, status
+        except Exception as exc:
+            status.append(FonteStatus.falha_coleta("CONSOLIDAÇÃO", exc))
+            return dataframe_vazio(), status
+
+
+def estado_para_publicar(orquestrador: Orquestrador) -> EstadoPublicado | None:
+    """Coleta o que venceu e devolve o estado atual com ``gerado_em`` de agora.
+
+    Com a consolidação falhando, não há o que confirmar: o estado anterior
+    envelhece e os outros processos voltam a coletar.
+    """
+    df, status = consolidar(orquestrador.coletar())
+    estado = obter_estado()
+    if estado is None or estado.consolidado is not df:
+        return None
+    return replace(estado, gerado_em=datetime.now(TZ_BRT), status=status)
+
+
+def iniciar_publicacao_compartilhada() -> None:
+    """No processo coletor, publica o estado em segundo plano, sem depender de reruns."""
+    orquestrador = obter_orquestrador()
+    agendar_publicacao(lambda: estado_para_publicar(orquestrador))
+
+
+def carregar_acumulados():
+    compartilhado = estado_de_outro_processo()
+    if compartilhado is not None:
+        return usar_estado_compartilhado(compartilhado)
+
+    df, status = consolidar(coletar_fontes())
+    if assumir_coleta():
+        iniciar_publicacao_compartilhada()
+        agendar_atualizacao_catalogo()
+    return df, status
 
 
 def cor_por_acumulado(valor: float) -> str:
@@ -140,7 +241,9 @@ def cor_por_acumulado(valor: float) -> str:
     return "red"
 
 
-def legenda_mapa() -> Element:
+def legenda_mapa():
+    from folium import Element
+
     html = """
     <div style="
         position: fixed;
@@ -187,13 +290,17 @@ def render_cards_resumo(df: pd.DataFrame, status: list[FonteStatus]) -> None:
     col5.metric("Atualizado em", agora)
 
 
-def render_mapa(df: pd.DataFrame) -> None:
-    st.subheader("Mapa de Acumulados")
-    mapa = folium.Map(location=(-19.6, -40.6), zoom_start=8)
+def marcadores_mapa(df: pd.DataFrame) -> list[tuple[tuple[float, float], str, str]]:
+    """Coordenadas, HTML do tooltip e cor de cada município com acumulado."""
+    if df.empty:
+        return []
+
+    linhas = df.drop_duplicates("Município").set_index("Município")
+    marcadores = []
 
     for municipio, dados in municipios_lat_lon_acumulados(df).items():
         coordenadas, acumulado = dados
-        linha = df.loc[df["Município"] == municipio].iloc[0]
+        linha = linhas.loc[municipio]
 
         estacao = linha.get("Estação") or "-"
         fonte = linha.get("Instituição") or linha.get("Fonte") or "-"
@@ -208,67 +315,270 @@ def render_mapa(df: pd.DataFrame) -> None:
                 Referência: {referencia}
             </div>
         """
+        marcadores.append((coordenadas, html, cor_por_acumulado(acumulado)))
+
+    return marcadores
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def marcadores_da_versao(versao: str, _df: pd.DataFrame):
+    """Marcadores calculados uma vez por versão dos dados e compartilhados entre sessões."""
+    return marcadores_mapa(_df)
+
+
+def imagem_campo(campo: CampoChuva) -> np.ndarray:
+    """Campo em RGBA (norte para cima) nas mesmas faixas de cor dos marcadores."""
+    valores = campo.matriz()[::-1]
+    imagem = np.zeros(valores.shape + (4,), dtype=np.uint8)
+
+    faixas = [
+        ((valores >= 1) & (valores <= 10), (51, 136, 255)),
+        ((valores > 10) & (valores <= 20), (245, 158, 11)),
+        (valores > 20, (220, 38, 38)),
+    ]
+    for mascara, cor in faixas:
+        imagem[mascara] = (*cor, 110)
+
+    return imagem
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def camada_da_versao(versao: str, _campo: CampoChuva):
+    return imagem_campo(_campo), _campo.grade.limites
+
+
+@st.cache_resource(show_spinner=False)
+def malha_municipal() -> IndiceMunicipios:
+    """Geometria municipal, carregada uma vez e compartilhada entre sessões."""
+    return indice_municipios()
+
+
+def acumulados_por_municipio(df: pd.DataFrame) -> dict[str, float]:
+    if df.empty:
+        return {}
+    return df.drop_duplicates("Município").set_index("Município")["Prec_mm"].to_dict()
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def acumulados_da_versao(versao: str, _df: pd.DataFrame) -> dict[str, float]:
+    return acumulados_por_municipio(_df)
+
+
+def malha_com_acumulados(valores: dict[str, float]) -> dict | None:
+    """Malha com os valores da versão; as geometrias vêm de ``malha_municipal`` sem cópia."""
+    return geojson_com_valores(valores, malha_municipal())
+
+
+def estilo_municipio(feicao: dict) -> dict:
+    valor = feicao["properties"]["Prec_mm"]
+    return {
+        "color": "#555",
+        "weight": 0.6,
+        "fillColor": {"blue": "#3388ff", "orange": "#f59e0b", "red": "#dc2626"}[cor_por_acumulado(valor)],
+        "fillOpacity": 0.35 if valor > 0 else 0.0,
+    }
+
+
+def construir_mapa(marcadores, camada=None, malha: dict | None = None) -> folium.Map:
+    import folium
+
+    mapa = folium.Map(location=(-19.6, -40.6), zoom_start=8)
+
+    if malha is not None:
+        folium.GeoJson(
+            malha,
+            name="Municípios",
+            style_function=estilo_municipio,
+            tooltip=folium.GeoJsonTooltip(["Municipio", "Prec_mm"], aliases=["Município", "Acumulado 24h (mm)"]),
+        ).add_to(mapa)
+
+    if camada is not None:
+        imagem, limites = camada
+        folium.raster_layers.ImageOverlay(
+            image=imagem,
+            bounds=limites,
+            mercator_project=True,
+            name="Campo interpolado",
+        ).add_to(mapa)
+
+    if camada is not None or malha is not None:
+        folium.LayerControl(collapsed=True).add_to(mapa)
 
+    for coordenadas, html, cor in marcadores:
         folium.Marker(
             location=coordenadas,
             tooltip=html,
             popup=html,
-            icon=folium.Icon(color=cor_por_acumulado(acumulado), icon="cloud-rain", prefix="fa"),
+            icon=folium.Icon(color=cor, icon="cloud-rain", prefix="fa"),
         ).add_to(mapa)
 
     mapa.get_root().html.add_child(legenda_mapa())
-    st_folium(mapa, width=1080, height=720)
+    return mapa
+
+
+def render_mapa(df: pd.DataFrame, chave: str | None = None, campo: CampoChuva | None = None) -> None:
+    from streamlit_folium import st_folium
+
+    st.subheader("Mapa de Acumulados")
+    versao = df.attrs.get("versao")
+    marcadores = marcadores_da_versao(versao, df) if versao else marcadores_mapa(df)
+
+    camada = None
+    if campo is not None:
+        camada = camada_da_versao(versao, campo) if versao else (imagem_campo(campo), campo.grade.limites)
+
+    malha = malha_com_acumulados(acumulados_da_versao(versao, df) if versao else acumulados_por_municipio(df))
+    st_folium(construir_mapa(marcadores, camada, malha), width=1080, height=720, key=chave)
 
 
-def render_ranking(df: pd.DataFrame) -> None:
-    st.subheader("Ranking de Acumulados")
+@st.cache_resource(max_entries=4, show_spinner=False)
+def tabela_da_versao(versao: str, _df: pd.DataFrame) -> TabelaAcumulados:
+    """Tabela ordenada e indexada uma vez por versão dos dados, compartilhada entre sessões."""
+    return TabelaAcumulados(_df)
 
+
+def render_tabela_acumulados(
+    df: pd.DataFrame,
+    chave: str,
+    versao: str | None = None,
+    tamanho_padrao: int = TAMANHOS_PAGINA[0],
+) -> None:
+    """Ranking filtrável e paginado no servidor; só as linhas da página vão ao navegador."""
     if df.empty:
-        st.info("Sem dados para exibir.")
+        st.info("Sem acumulados de chuva no momento!")
         return
 
-    fontes = sorted(df["Instituição"].dropna().unique().tolist())
-    filtro_fontes = st.multiselect("Filtrar por fonte", fontes, default=fontes)
-    busca = st.text_input("Buscar município", "")
+    versao = versao or df.attrs.get("versao")
+    tabela = tabela_da_versao(versao, df) if versao else TabelaAcumulados(df)
 
-    tabela = df.copy()
-    if filtro_fontes:
-        tabela = tabela[tabela["Instituição"].isin(filtro_fontes)]
+    filtro_fontes = st.multiselect("Filtrar por fonte", tabela.fontes, default=tabela.fontes, key=f"{chave}_fontes")
+    busca = st.text_input("Buscar município ou estação", "", key=f"{chave}_busca")
+    posicoes = tabela.filtrar(filtro_fontes or None, busca)
 
-    if busca:
-        tabela = tabela[tabela["Município"].str.contains(busca.upper(), na=False)]
+    area_tabela = st.container()
+    col_tamanho, col_pagina = st.columns(2)
+    tamanho = col_tamanho.selectbox(
+        "Linhas por página",
+        TAMANHOS_PAGINA,
+        index=TAMANHOS_PAGINA.index(tamanho_padrao),
+        key=f"{chave}_tamanho",
+    )
 
-    tabela = tabela.sort_values("Prec_mm", ascending=False).reset_index(drop=True)
-    tabela.insert(0, "Posição", range(1, len(tabela) + 1))
+    # Filtro novo volta para a primeira página; a página nunca passa da última.
+    chave_pagina = f"{chave}_pagina"
+    paginas = total_paginas(len(posicoes), tamanho)
+    assinatura = (tuple(filtro_fontes), busca, tamanho)
+    if st.session_state.get(f"{chave}_assinatura") != assinatura:
+        st.session_state[f"{chave}_assinatura"] = assinatura
+        st.session_state[chave_pagina] = 1
+    elif st.session_state.get(chave_pagina, 1) > paginas:
+        st.session_state[chave_pagina] = paginas
+    numero = col_pagina.number_input("Página", min_value=1, max_value=paginas, step=1, key=chave_pagina)
+
+    pagina = tabela.pagina(posicoes, numero, tamanho)
+    with area_tabela:
+        if pagina.empty:
+            st.info("Nenhum resultado para o filtro.")
+        else:
+            st.dataframe(
+                pagina,
+                height=min((len(pagina) + 1) * 35 + 3, 700),
+                hide_index=True,
+                column_config={
+                    "Prec_mm": st.column_config.NumberColumn("Acumulado 24h (mm)", format="%.2f"),
+                    "DataHoraReferencia": st.column_config.TextColumn("Referência"),
+                },
+            )
+        inicio = (numero - 1) * tamanho
+        st.caption(f"{inicio + min(len(pagina), 1)}–{inicio + len(pagina)} de {len(posicoes)} linhas")
+
+
+def render_estimativa_municipios(campo: CampoChuva | None) -> None:
+    if campo is None:
+        return
 
-    colunas = ["Posição", "Município", "Prec_mm", "Instituição"]
-    altura_df = min((len(tabela) + 1) * 35 + 3, 700)
+    tabela = campo.por_municipio()
+    tabela = tabela[tabela["Max_mm"] > 0].sort_values("Max_mm", ascending=False)
+    if tabela.empty:
+        return
 
+    st.markdown("**Estimativa interpolada por município:**")
     st.dataframe(
-        tabela[colunas],
-        height=altura_df,
+        tabela,
         hide_index=True,
         column_config={
-            "Prec_mm": st.column_config.NumberColumn("Acumulado 24h (mm)", format="%.2f")
+            "Media_mm": st.column_config.NumberColumn("Média estimada (mm)", format="%.2f"),
+            "Max_mm": st.column_config.NumberColumn("Máxima estimada (mm)", format="%.2f"),
         },
     )
 
 
-def render_lista(df: pd.DataFrame) -> None:
-    if df.empty:
-        st.info("Sem acumulados de chuvas no momento!")
+def render_alertas() -> None:
+    abertos = alertas_abertos()
+    if not abertos:
         return
 
-    df = df.reset_index(drop=True)
-    st.markdown("**Acumulados de chuva em 24h:**")
+    st.subheader("Alertas abertos")
+    st.dataframe(
+        pd.DataFrame(abertos)[["nivel", "municipio", "janela_horas", "valor_mm", "limiar_mm", "fonte", "em"]],
+        hide_index=True,
+        use_container_width=True,
+    )
+
+
+def render_reprovadas() -> None:
+    estado = obter_estado()
+    if estado is None:
+        return
+
+    reprovadas = [
+        df[~df["QC_OK"].astype(bool)]
+        for df in estado.fontes.values()
+        if "QC_OK" in df.columns
+    ]
+    reprovadas = [df for df in reprovadas if not df.empty]
+    if not reprovadas:
+        return
+
+    st.subheader("Leituras descartadas pelo controle de qualidade")
+    st.dataframe(
+        pd.concat(reprovadas, ignore_index=True)[
+            ["Município", "Estação", "Fonte", "Prec_mm", "DataHoraReferencia", *COLUNAS_QC[:-1]]
+        ],
+        hide_index=True,
+    )
+
 
-    for index, row in df.iterrows():
-        item = "{}. {} - {:.2f} mm".format(
-            index + 1,
-            row["Município"],
-            row["Prec_mm"],
+def render_proximidade() -> None:
+    estado = obter_estado()
+    if estado is None:
+        return
+
+    with st.expander("Estações próximas a um ponto"):
+        col1, col2, col3 = st.columns(3)
+        latitude = col1.number_input("Latitude", -90.0, 90.0, -20.3155, format="%.4f", key="prox_lat")
+        longitude = col2.number_input("Longitude", -180.0, 180.0, -40.3128, format="%.4f", key="prox_lon")
+        raio_km = col3.number_input("Raio (km, 0 = 5 mais próximas)", 0.0, 200.0, 10.0, key="prox_raio")
+
+        indice = indice_do_estado(estado)
+        if raio_km > 0:
+            resultado = indice.no_raio(latitude, longitude, raio_km)
+        else:
+            resultado = indice.proximas(latitude, longitude, 5)
+
+        if resultado.empty:
+            st.info("Nenhuma estação no raio informado.")
+            return
+
+        st.dataframe(
+            resultado[["Distancia_km", "Estação", "Município", "Fonte", "Prec_mm", "DataHoraReferencia", "Aproximada"]],
+            hide_index=True,
+            column_config={
+                "Distancia_km": st.column_config.NumberColumn("Distância (km)", format="%.2f"),
+                "Prec_mm": st.column_config.NumberColumn("Acumulado 24h (mm)", format="%.2f"),
+                "Aproximada": st.column_config.CheckboxColumn("Coord. da sede"),
+            },
         )
-        st.text(item)
 
 
 def render_status_fontes(status: list[FonteStatus]) -> None:
@@ -283,29 +593,136 @@ def render_status_fontes(status: list[FonteStatus]) -> None:
         use_container_width=True,
     )
 
+    contadores = metricas.contadores()
+    if contadores:
+        st.caption("Requisições por fonte")
+        st.dataframe(
+            pd.DataFrame.from_dict(contadores, orient="index").fillna(0).astype(int),
+            use_container_width=True,
+        )
+
+    cadencia = obter_orquestrador().resumo_cadencia()
+    if cadencia:
+        st.caption("Cadência de publicação estimada")
+        st.dataframe(pd.DataFrame(cadencia), hide_index=True, use_container_width=True)
+
+
+@st.cache_resource
+def iniciar_api():
+    """Sobe a API somente leitura no processo do app quando API_PORT está definido."""
+    porta = get_secret("API_PORT")
+    if not porta:
+        return None
+
+    from app.api import iniciar_em_segundo_plano
+
+    try:
+        return iniciar_em_segundo_plano(int(porta), get_secret("API_HOST", API_HOST))
+    except OSError:
+        return None
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def obter_anel_replay(inicio: datetime, fim: datetime) -> AnelQuadros:
+    """Anel de quadros do intervalo, compartilhado pelas sessões que olham o mesmo período.
+
+    Um anel por intervalo: uma sessão trocando de período não descarta os
+    quadros que outra está navegando.
+    """
+    return AnelQuadros()
+
+
+@st.fragment
+def render_historico() -> None:
+    """Só lê o índice e os snapshots com o histórico ligado; a navegação reroda só este trecho."""
+    st.subheader("Histórico de acumulados")
+    if not st.toggle("Carregar histórico", key="historico_ativo"):
+        st.caption("Ligue para navegar pelos snapshots armazenados.")
+        return
+
+    hoje = datetime.now(TZ_BRT).date()
+    col1, col2 = st.columns(2)
+    data_inicio = col1.date_input("Início", hoje - timedelta(days=1), key="historico_inicio")
+    data_fim = col2.date_input("Fim", hoje, key="historico_fim")
+
+    inicio = datetime.combine(data_inicio, datetime.min.time(), tzinfo=TZ_BRT)
+    fim = datetime.combine(data_fim, datetime.max.time(), tzinfo=TZ_BRT)
+
+    anel = obter_anel_replay(inicio, fim)
+    entradas = anel.instantes(inicio, fim)
+    if not entradas:
+        st.info("Nenhum snapshot armazenado no período.")
+        return
+
+    with st.spinner("Carregando snapshots do período..."):
+        anel.pre_carregar(entradas)
+
+    rotulos = [
+        datetime.fromisoformat(entrada["gerado_em"]).strftime("%d/%m/%Y %H:%M")
+        for entrada in entradas
+    ]
+    posicao = st.select_slider(
+        "Instante",
+        options=list(range(len(entradas))),
+        value=len(entradas) - 1,
+        format_func=lambda indice: rotulos[indice],
+        key="historico_instante",
+    )
+
+    quadro = anel.quadro(entradas[posicao])
+    if quadro is None:
+        st.warning("Não foi possível ler o snapshot selecionado.")
+        return
+
+    st.caption(
+        f"Snapshot de {quadro.gerado_em.strftime('%d/%m/%Y %H:%M')} "
+        f"(resolução {quadro.resolucao})"
+    )
+    col_mapa, col_tabela = st.columns([2, 1])
+    with col_mapa:
+        render_mapa(quadro.df, chave="mapa_historico")
+    with col_tabela:
+        render_tabela_acumulados(
+            quadro.df,
+            chave="historico",
+            versao=f"historico-{quadro.gerado_em.isoformat()}-{quadro.resolucao}",
+        )
+
 
 def run():
-    img_1 = Image.open("img/logo_cepdec.png")
-    st.set_page_config(page_title=APP_TITLE, page_icon=img_1, layout="wide")
+    st.set_page_config(page_title=APP_TITLE, page_icon=carregar_imagem("img/logo_cepdec.png"), layout="wide")
 
     render_header()
+    iniciar_api()
 
     df, status = carregar_acumulados()
+    campo = campo_atual()
     render_cards_resumo(df, status)
 
-    tab1, tab2, tab3 = st.tabs(["PRINCIPAL 📌", "LISTA DE ACUMULADOS 📋", "FONTES 🛰️"])
+    tab1, tab2, tab3, tab4 = st.tabs(
+        ["PRINCIPAL 📌", "LISTA DE ACUMULADOS 📋", "FONTES 🛰️", "HISTÓRICO ⏪"]
+    )
 
     with tab1:
         col1, col2 = st.columns([2, 1])
         with col1:
-            render_mapa(df)
+            render_mapa(df, campo=campo)
         with col2:
-            render_ranking(df)
+            st.subheader("Ranking de Acumulados")
+            render_tabela_acumulados(df, chave="ranking")
 
     with tab2:
-        render_lista(df)
+        st.markdown("**Acumulados de chuva em 24h:**")
+        render_tabela_acumulados(df, chave="lista", tamanho_padrao=100)
+        render_estimativa_municipios(campo)
 
     with tab3:
+        render_alertas()
+        render_reprovadas()
+        render_proximidade()
         render_status_fontes(status)
 
+    with tab4:
+        render_historico()
+
     render_footer()
@@ -1,12 +1,21 @@
 import streamlit as st
-from PIL import Image
 
 from app.config.settings import APP_SUBTITLE, APP_TITLE
 
 
+@st.cache_resource(show_spinner=False)
+def carregar_imagem(caminho: str):
+    """Decodifica a imagem estática uma única vez por processo."""
+    from PIL import Image
+
+    with Image.open(caminho) as imagem:
+        imagem.load()
+        return imagem.copy()
+
+
 def render_header():
 
-    img_2 = Image.open('img/cepdec.png')
+    img_2 = carregar_imagem('img/cepdec.png')
     
     # Cria três colunas: a do meio será mais larga que as laterais
     col1, col2, col3 = st.columns([1, 6, 1])
@@ -0,0 +1,289 @@
+"""Motor de alertas por limiar, avaliado a cada nova consolidação.
+
+Cada regra define nível, janela (em horas), limiar e histerese. A janela de 24h
+usa o próprio acumulado consolidado; janelas menores são estimadas pela variação
+do acumulado 24h do município em relação ao valor observado há ``janela_horas``.
+Um alerta abre quando o valor atinge o limiar e só fecha quando cai abaixo de
+``limiar - histerese``.
+
+A avaliação é incremental: só entram os municípios cujo valor mudou desde a
+consolidação anterior e os que estão com alerta aberto. Aberturas e
+encerramentos são gravados como JSON Lines em ``ALERTAS_OUTBOX_FILE``.
+
+Os alertas abertos ficam em ``abertos.json``, ao lado do outbox: um processo
+que reinicia ou assume a coleta continua a histerese de onde ela parou, sem
+reabrir alertas, e os demais processos leem o arquivo para exibir os abertos.
+Com ``snapshots``, a primeira avaliação semeia o histórico com os snapshots
+recentes, e as janelas curtas valem desde o início do processo.
+"""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_right
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from app.config.settings import (
+    ALERTAS_OUTBOX_FILE,
+    ALERTAS_REGRAS_FILE,
+    ALERTAS_REGRAS_PADRAO,
+)
+from app.services.arquivos import gravar_atomico
+from app.services.json_rapido import carregar_json, serializar_json
+from app.services.normalizacao import normalizar_municipio
+from app.services.retencao import RESOLUCAO_COMPLETA, carregar_indice
+
+
+TZ_BRT = ZoneInfo("America/Sao_Paulo")
+JANELA_CONSOLIDADA_HORAS = 24
+NOME_ABERTOS = "abertos.json"
+
+
+@dataclass(frozen=True)
+class RegraAlerta:
+    nivel: str
+    janela_horas: float
+    limiar_mm: float
+    histerese_mm: float = 0.0
+
+    @property
+    def chave(self) -> tuple:
+        return self.nivel, self.janela_horas, self.limiar_mm
+
+    def to_dict(self) -> dict:
+        return {
+            "nivel": self.nivel,
+            "janela_horas": self.janela_horas,
+            "limiar_mm": self.limiar_mm,
+            "histerese_mm": self.histerese_mm,
+        }
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "RegraAlerta":
+        return cls(
+            nivel=str(dados["nivel"]),
+            janela_horas=float(dados.get("janela_horas", JANELA_CONSOLIDADA_HORAS)),
+            limiar_mm=float(dados["limiar_mm"]),
+            histerese_mm=float(dados.get("histerese_mm", 0.0)),
+        )
+
+
+def carregar_regras(caminho: Path = ALERTAS_REGRAS_FILE) -> tuple[list[RegraAlerta], dict[str, list[RegraAlerta]]]:
+    """Regras padrão e específicas por município.
+
+    Formato do arquivo: ``{"padrao": [...], "municipios": {"VITÓRIA": [...]}}``.
+    Regras de um município substituem as padrão para ele.
+    """
+    padrao = [RegraAlerta.de_dict(regra) for regra in ALERTAS_REGRAS_PADRAO]
+    por_municipio: dict[str, list[RegraAlerta]] = {}
+
+    try:
+        config = carregar_json(Path(caminho).read_bytes())
+    except (OSError, ValueError):
+        return padrao, por_municipio
+
+    if config.get("padrao"):
+        padrao = [RegraAlerta.de_dict(regra) for regra in config["padrao"]]
+
+    for municipio, regras in (config.get("municipios") or {}).items():
+        por_municipio[normalizar_municipio(municipio)] = [RegraAlerta.de_dict(regra) for regra in regras]
+
+    return padrao, por_municipio
+
+
+def _ler_abertos(caminho: Path) -> list[tuple[RegraAlerta, dict]]:
+    try:
+        itens = carregar_json(caminho.read_bytes()).get("abertos", [])
+        return [(RegraAlerta.de_dict(item["regra"]), item["evento"]) for item in itens]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return []
+
+
+def alertas_abertos(outbox: Path = ALERTAS_OUTBOX_FILE) -> list[dict]:
+    """Alertas abertos gravados pelo processo que avalia, para exibir em qualquer processo."""
+    return [evento for _, evento in _ler_abertos(Path(outbox).with_name(NOME_ABERTOS))]
+
+
+class MotorAlertas:
+    def __init__(
+        self,
+        regras_padrao: list[RegraAlerta] | None = None,
+        regras_municipio: dict[str, list[RegraAlerta]] | None = None,
+        outbox: Path | None = ALERTAS_OUTBOX_FILE,
+        snapshots: Path | None = None,
+    ):
+        if regras_padrao is None:
+            regras_padrao, carregadas = carregar_regras()
+            regras_municipio = regras_municipio or carregadas
+        self.regras_padrao = regras_padrao
+        self.regras_municipio = regras_municipio or {}
+        self.outbox = Path(outbox) if outbox else None
+        self.arquivo_abertos = self.outbox.with_name(NOME_ABERTOS) if self.outbox else None
+        self.snapshots = Path(snapshots) if snapshots else None
+
+        maior_janela = max(
+            [regra.janela_horas for regra in self._todas_regras()] or [JANELA_CONSOLIDADA_HORAS]
+        )
+        self._retencao = timedelta(hours=maior_janela + 1)
+        self._anterior = pd.Series(dtype="float64")
+        self._historico: dict[str, deque] = defaultdict(deque)
+        self._abertos: dict[tuple[str, tuple], tuple[RegraAlerta, dict]] = {}
+        self._inicio: datetime | None = None
+        self._lock = threading.Lock()
+
+        if self.arquivo_abertos is not None:
+            for regra, evento in _ler_abertos(self.arquivo_abertos):
+                self._abertos[(evento["municipio"], regra.chave)] = (regra, evento)
+
+    def _todas_regras(self):
+        yield from self.regras_padrao
+        for regras in self.regras_municipio.values():
+            yield from regras
+
+    def regras(self, municipio: str) -> list[RegraAlerta]:
+        return self.regras_municipio.get(municipio, self.regras_padrao)
+
+    @property
+    def abertos(self) -> list[dict]:
+        with self._lock:
+            return [evento for _, evento in self._abertos.values()]
+
+    def _registrar_historico(self, municipio: str, instante: datetime, valor: float) -> None:
+        historico = self._historico[municipio]
+        historico.append((instante, valor))
+        limite = instante - self._retencao
+        # Mantém a última leitura anterior ao limite: ela ainda vale no início da janela.
+        while len(historico) > 1 and historico[1][0] <= limite:
+            historico.popleft()
+
+    def _semear_historico(self, instante: datetime) -> None:
+        """Histórico das janelas curtas a partir dos snapshots completos recentes."""
+        desde = instante - self._retencao
+        anterior: dict[str, float] = {}
+        for entrada in carregar_indice(self.snapshots):
+            gerado_em = datetime.fromisoformat(entrada["gerado_em"])
+            if entrada["resolucao"] != RESOLUCAO_COMPLETA or not desde <= gerado_em < instante:
+                continue
+            try:
+                payload = carregar_json((self.snapshots / entrada["arquivo"]).read_bytes())
+                registros = pd.DataFrame(payload["registros"])
+                prec = pd.to_numeric(registros["Prec_mm"], errors="coerce")
+            except (OSError, ValueError, KeyError):
+                continue
+
+            valores = prec.groupby(registros["Município"]).max().dropna()
+            for municipio, valor in valores.items():
+                if anterior.get(municipio) != valor:
+                    self._registrar_historico(municipio, gerado_em, float(valor))
+            anterior = valores.to_dict()
+            if self._inicio is None:
+                self._inicio = gerado_em
+
+    def _valor_janela(self, municipio: str, instante: datetime, atual: float, janela_horas: float):
+        if janela_horas >= JANELA_CONSOLIDADA_HORAS:
+            return atual
+
+        alvo = instante - timedelta(hours=janela_horas)
+        if self._inicio is None or alvo < self._inicio:
+            return None
+
+        # Sem leitura anterior ao início da janela, o município estava sem chuva.
+        historico = self._historico.get(municipio) or ()
+        posicao = bisect_right(historico, alvo, key=lambda leitura: leitura[0])
+        if posicao == 0:
+            return atual
+        return max(0.0, atual - historico[posicao - 1][1])
+
+    def avaliar(self, df: pd.DataFrame, instante: datetime | None = None) -> list[dict]:
+        """Avalia a consolidação e devolve os eventos de abertura/encerramento gerados."""
+        instante = instante or datetime.now(TZ_BRT)
+        if df is None or df.empty:
+            atual = pd.Series(dtype="float64")
+            linhas = pd.DataFrame()
+        else:
+            linhas = df.drop_duplicates("Município").set_index("Município")
+            atual = linhas["Prec_mm"].astype("float64")
+
+        with self._lock:
+            if self._inicio is None and self.snapshots is not None:
+                self._semear_historico(instante)
+            if self._inicio is None:
+                self._inicio = instante
+            todos = atual.index.union(self._anterior.index)
+            novo = atual.reindex(todos, fill_value=0.0)
+            velho = self._anterior.reindex(todos, fill_value=0.0)
+            alterados = set(novo.index[novo.ne(velho)])
+
+            # Municípios sem mudança só precisam rever alertas abertos de janelas
+            # curtas, cujo valor estimado depende do relógio.
+            pendentes = [
+                (municipio, regra)
+                for municipio in alterados
+                for regra in self.regras(municipio)
+            ] + [
+                (municipio, regra)
+                for (municipio, _), (regra, _) in self._abertos.items()
+                if municipio not in alterados and regra.janela_horas < JANELA_CONSOLIDADA_HORAS
+            ]
+
+            eventos = []
+            for municipio, regra in pendentes:
+                valor_atual = float(novo.get(municipio, 0.0))
+                valor = self._valor_janela(municipio, instante, valor_atual, regra.janela_horas)
+                if valor is None:
+                    continue
+
+                chave = (municipio, regra.chave)
+                aberto = chave in self._abertos
+                if not aberto and valor >= regra.limiar_mm:
+                    evento = self._evento("inicio", municipio, regra, valor, instante, linhas)
+                    self._abertos[chave] = (regra, evento)
+                    eventos.append(evento)
+                elif aberto and valor < regra.limiar_mm - regra.histerese_mm:
+                    del self._abertos[chave]
+                    eventos.append(self._evento("fim", municipio, regra, valor, instante, linhas))
+
+            for municipio in alterados:
+                self._registrar_historico(municipio, instante, float(novo[municipio]))
+            self._anterior = atual
+            abertos = [
+                {"regra": regra.to_dict(), "evento": evento} for regra, evento in self._abertos.values()
+            ]
+
+        self._gravar(eventos, abertos)
+        return eventos
+
+    @staticmethod
+    def _evento(tipo, municipio, regra: RegraAlerta, valor, instante, linhas: pd.DataFrame) -> dict:
+        def campo(nome):
+            if municipio not in linhas.index or nome not in linhas.columns:
+                return None
+            valor_campo = linhas.at[municipio, nome]
+            return None if pd.isna(valor_campo) else valor_campo
+
+        return {
+            "tipo": tipo,
+            "municipio": municipio,
+            "nivel": regra.nivel,
+            "janela_horas": regra.janela_horas,
+            "limiar_mm": regra.limiar_mm,
+            "valor_mm": round(valor, 2),
+            "fonte": campo("Instituição"),
+            "estacao": campo("Estação"),
+            "em": instante.isoformat(),
+        }
+
+    def _gravar(self, eventos: list[dict], abertos: list[dict]) -> None:
+        if not eventos or self.outbox is None:
+            return
+
+        self.outbox.parent.mkdir(parents=True, exist_ok=True)
+        with self.outbox.open("ab") as arquivo:
+            for evento in eventos:
+                arquivo.write(serializar_json(evento) + b"\n")
+        gravar_atomico(self.arquivo_abertos, serializar_json({"abertos": abertos}))
@@ -0,0 +1,55 @@
+"""Escrita de arquivos sem expor conteúdo parcial a leitores concorrentes."""
+from __future__ import annotations
+
+import os
+import secrets
+import tempfile
+from pathlib import Path
+
+
+def _ler_umask() -> int:
+    # Não há como ler a umask sem trocá-la; feito uma vez, na importação.
+    atual = os.umask(0)
+    os.umask(atual)
+    return atual
+
+
+UMASK = _ler_umask()
+MODO_PADRAO = 0o666 & ~UMASK
+
+
+def gravar_atomico(caminho: Path, dados: bytes, modo: int | None = None) -> None:
+    """Grava em arquivo temporário no mesmo diretório e troca com ``os.replace``.
+
+    O arquivo final fica com as permissões de um ``open`` comum (0666 menos a
+    umask), legível por outros usuários como antes; ``modo`` restringe, por
+    exemplo ``0o600`` para credenciais.
+    """
+    fd, temporario = tempfile.mkstemp(dir=caminho.parent, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as arquivo:
+            if hasattr(os, "fchmod"):
+                os.fchmod(arquivo.fileno(), MODO_PADRAO if modo is None else modo)
+            else:
+                os.chmod(temporario, MODO_PADRAO if modo is None else modo)
+            arquivo.write(dados)
+        os.replace(temporario, caminho)
+    except BaseException:
+        Path(temporario).unlink(missing_ok=True)
+        raise
+
+
+def vincular_atomico(origem: Path, destino: Path) -> None:
+    """Aponta ``destino`` para ``origem`` via hardlink; copia se o link não for suportado."""
+    # Nome único por chamada: dois processos publicando juntos não trocam o link um do outro.
+    temporario = destino.with_name(f".tmp_{destino.name}.{os.getpid()}.{secrets.token_hex(4)}")
+    try:
+        os.link(origem, temporario)
+    except OSError:
+        gravar_atomico(destino, origem.read_bytes())
+        return
+    try:
+        os.replace(temporario, destino)
+    finally:
+        # Se ``destino`` já era link para ``origem``, o rename não faz nada e o temporário fica.
+        temporario.unlink(missing_ok=True)
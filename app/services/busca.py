@@ -0,0 +1,100 @@
+"""Índice de busca por nome de município e de estação, sem acentos.
+
+Os nomes distintos são normalizados uma única vez (sem acentos, em maiúsculas)
+e indexados de dois jeitos:
+
+- palavras ordenadas, para buscas curtas (1 ou 2 letras) por prefixo de palavra;
+- trigramas, para buscas de 3 letras ou mais por trecho do nome: os candidatos
+  saem da interseção das listas de cada trigrama e só eles são conferidos.
+
+A consulta devolve uma máscara por linha, combinando os nomes casados com o
+código de nome de cada linha, sem varrer os textos.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from app.services.normalizacao import normalizar_texto, remover_acentos
+
+
+def chave_busca(valor) -> str:
+    """Texto sem acentos, em maiúsculas e com espaços simples, para comparar buscas."""
+    if valor is None or valor != valor:
+        return ""
+    return remover_acentos(normalizar_texto(valor)).upper()
+
+
+def trigramas(texto: str) -> set[str]:
+    return {texto[inicio:inicio + 3] for inicio in range(len(texto) - 2)}
+
+
+class IndiceBusca:
+    """Índice sobre uma ou mais colunas de nomes de um mesmo frame."""
+
+    def __init__(self, *colunas: pd.Series):
+        ids_por_nome: dict[str, int] = {}
+        self.nome_das_linhas: list[np.ndarray] = []
+        for coluna in colunas:
+            codigos, distintos = pd.factorize(coluna, use_na_sentinel=False)
+            ids = np.fromiter(
+                (ids_por_nome.setdefault(chave_busca(valor), len(ids_por_nome)) for valor in distintos),
+                dtype=np.int64,
+                count=len(distintos),
+            )
+            self.nome_das_linhas.append(ids[codigos])
+        self.nomes = list(ids_por_nome)
+
+        palavras = sorted(
+            (palavra, id_nome) for id_nome, nome in enumerate(self.nomes) for palavra in set(nome.split())
+        )
+        self._palavras = [palavra for palavra, _ in palavras]
+        self._ids_palavras = np.array([id_nome for _, id_nome in palavras], dtype=np.int64)
+
+        listas = defaultdict(list)
+        for id_nome, nome in enumerate(self.nomes):
+            for trigrama in trigramas(nome):
+                listas[trigrama].append(id_nome)
+        self._trigramas = {trigrama: np.array(ids, dtype=np.int64) for trigrama, ids in listas.items()}
+
+    def nomes_casados(self, consulta: str) -> np.ndarray:
+        """Máscara sobre ``nomes``: prefixo de palavra (1-2 letras) ou trecho (3+)."""
+        termo = chave_busca(consulta)
+        casados = np.zeros(len(self.nomes), dtype=bool)
+        if not termo:
+            return casados
+
+        if len(termo) < 3:
+            inicio = bisect_left(self._palavras, termo)
+            fim = bisect_left(self._palavras, termo + "\uffff")
+            casados[self._ids_palavras[inicio:fim]] = True
+            return casados
+
+        # Começa pelos trigramas mais raros para a interseção encolher rápido.
+        listas = sorted(
+            (self._trigramas.get(trigrama) for trigrama in trigramas(termo)),
+            key=lambda ids: -1 if ids is None else len(ids),
+        )
+        if listas[0] is None:
+            return casados
+        candidatos = listas[0]
+        for ids in listas[1:]:
+            candidatos = np.intersect1d(candidatos, ids, assume_unique=True)
+            if not len(candidatos):
+                return casados
+
+        for id_nome in candidatos:
+            if termo in self.nomes[id_nome]:
+                casados[id_nome] = True
+        return casados
+
+    def buscar(self, consulta: str) -> np.ndarray:
+        """Máscara das linhas em que algum dos nomes casa com a consulta."""
+        casados = self.nomes_casados(consulta)
+        mascara = np.zeros(len(self.nome_das_linhas[0]) if self.nome_das_linhas else 0, dtype=bool)
+        for ids in self.nome_das_linhas:
+            mascara |= casados[ids]
+        return mascara
@@ -0,0 +1,135 @@
+"""Cache em disco de respostas HTTP com revalidação por ETag/Last-Modified."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+
+from app.config.settings import HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES
+from app.services.arquivos import gravar_atomico
+
+
+@dataclass
+class EntradaCache:
+    url: str
+    conteudo: bytes
+    etag: str | None = None
+    last_modified: str | None = None
+    content_type: str | None = None
+
+    def cabecalhos_condicionais(self) -> dict[str, str]:
+        cabecalhos = {}
+        if self.etag:
+            cabecalhos["If-None-Match"] = self.etag
+        if self.last_modified:
+            cabecalhos["If-Modified-Since"] = self.last_modified
+        return cabecalhos
+
+
+class CacheHttp:
+    """Guarda o corpo das respostas que trazem validadores e remove as mais antigas
+    (por último acesso) quando o diretório passa do limite de bytes."""
+
+    def __init__(self, diretorio: Path = HTTP_CACHE_DIR, limite_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.diretorio = Path(diretorio)
+        self.limite_bytes = limite_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _chave(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _caminhos(self, url: str) -> tuple[Path, Path]:
+        chave = self._chave(url)
+        return self.diretorio / f"{chave}.json", self.diretorio / f"{chave}.body"
+
+    def obter(self, url: str) -> EntradaCache | None:
+        meta_path, corpo_path = self._caminhos(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            conteudo = corpo_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+
+        return EntradaCache(
+            url=url,
+            conteudo=conteudo,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            content_type=meta.get("content_type"),
+        )
+
+    def salvar(self, url: str, response: requests.Response) -> bool:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return False
+
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": response.headers.get("Content-Type"),
+            "armazenado_em": datetime.now(timezone.utc).isoformat(),
+            "tamanho": len(response.content),
+        }
+        meta_path, corpo_path = self._caminhos(url)
+
+        with self._lock:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            gravar_atomico(corpo_path, response.content)
+            gravar_atomico(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+            self._remover_excedente()
+        return True
+
+    def resposta_revalidada(self, entrada: EntradaCache, response: requests.Response) -> requests.Response:
+        """Converte um 304 na resposta completa guardada em disco."""
+        revalidada = requests.Response()
+        revalidada.status_code = 200
+        revalidada.url = response.url or entrada.url
+        revalidada.headers.update(response.headers)
+        revalidada.headers.pop("Content-Length", None)
+        revalidada.headers.pop("Content-Encoding", None)
+        if entrada.content_type and "Content-Type" not in revalidada.headers:
+            revalidada.headers["Content-Type"] = entrada.content_type
+        revalidada.headers["X-Cache"] = "REVALIDATED"
+        revalidada.encoding = response.encoding
+        revalidada._content = entrada.conteudo
+
+        for caminho in self._caminhos(entrada.url):
+            try:
+                os.utime(caminho)
+            except OSError:
+                pass
+        return revalidada
+
+    def tamanho_total(self) -> int:
+        if not self.diretorio.exists():
+            return 0
+        return sum(caminho.stat().st_size for caminho in self.diretorio.glob("*.body"))
+
+    def _remover_excedente(self) -> None:
+        corpos = []
+        for caminho in self.diretorio.glob("*.body"):
+            try:
+                estado = caminho.stat()
+            except OSError:
+                continue
+            corpos.append((estado.st_mtime_ns, estado.st_size, caminho))
+
+        total = sum(tamanho for _, tamanho, _ in corpos)
+        for _, tamanho, caminho in sorted(corpos):
+            if total <= self.limite_bytes:
+                break
+            caminho.unlink(missing_ok=True)
+            caminho.with_suffix(".json").unlink(missing_ok=True)
+            total -= tamanho
+
+
+cache_http = CacheHttp()
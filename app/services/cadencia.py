@@ -0,0 +1,146 @@
+"""Estimativa da cadência de publicação de cada fonte.
+
+A cada coleta, ``registrar`` decide se houve novidade: a maior
+``DataHoraReferencia`` avançou. O hash do payload só decide quando a fonte não
+traz referência; ele não serve de critério geral porque janelas móveis (a soma
+de 24h do SATDES) mudam o payload a cada consulta. As referências novas formam a
+série de instantes de publicação, da qual saem o período típico (mediana dos
+intervalos) e o atraso típico entre a referência e a disponibilidade do dado;
+novidade vista só pelo hash não entra na série, pois não diz quando o dado
+foi publicado.
+Como só se sabe que o dado ficou disponível entre a coleta anterior e a atual,
+cada amostra de atraso é o ponto médio desse intervalo; coletas que acertam de
+primeira puxam a estimativa para baixo e as que chegam cedo demais, para cima.
+
+``proximo_intervalo`` agenda a coleta logo depois da próxima publicação
+esperada. Passada a previsão sem novidade, a espera dobra a cada coleta vazia,
+até ``CADENCIA_INTERVALO_MAXIMO_SECONDS``.
+"""
+from __future__ import annotations
+
+import statistics
+import threading
+from collections import deque
+
+import pandas as pd
+
+from app.config.settings import (
+    CADENCIA_AMOSTRAS,
+    CADENCIA_INTERVALO_MAXIMO_SECONDS,
+    CADENCIA_INTERVALO_MINIMO_SECONDS,
+    CADENCIA_MARGEM_SECONDS,
+)
+from app.services.metricas import metricas
+
+
+def maior_referencia(df: pd.DataFrame) -> float | None:
+    """Maior ``DataHoraReferencia`` do frame, em segundos desde a época."""
+    if df is None or df.empty or "DataHoraReferencia" not in df.columns:
+        return None
+
+    instantes = pd.to_datetime(df["DataHoraReferencia"], utc=True, errors="coerce", format="ISO8601")
+    maior = instantes.max()
+    return None if pd.isna(maior) else maior.timestamp()
+
+
+class EstimadorCadencia:
+    def __init__(
+        self,
+        fonte: str,
+        intervalo_base: float,
+        minimo: float = CADENCIA_INTERVALO_MINIMO_SECONDS,
+        maximo: float = CADENCIA_INTERVALO_MAXIMO_SECONDS,
+        margem: float = CADENCIA_MARGEM_SECONDS,
+        amostras: int = CADENCIA_AMOSTRAS,
+    ):
+        self.fonte = fonte
+        self.intervalo_base = intervalo_base
+        self.minimo = minimo
+        self.maximo = max(maximo, intervalo_base)
+        self.margem = margem
+        self._publicacoes: deque[float] = deque(maxlen=amostras + 1)
+        self._atrasos: deque[float] = deque(maxlen=amostras)
+        self._assinatura: str | None = None
+        self._referencia: float | None = None
+        self._ultima_coleta: float | None = None
+        self.sem_novidade = 0
+        self._lock = threading.Lock()
+
+    @property
+    def periodo(self) -> float | None:
+        with self._lock:
+            publicacoes = list(self._publicacoes)
+        intervalos = [b - a for a, b in zip(publicacoes, publicacoes[1:]) if b > a]
+        return statistics.median(intervalos) if intervalos else None
+
+    @property
+    def atraso(self) -> float:
+        with self._lock:
+            return statistics.median(self._atrasos) if self._atrasos else 0.0
+
+    def registrar(self, df: pd.DataFrame, agora: float) -> bool:
+        """Registra o resultado de uma coleta e diz se ele trouxe dado novo."""
+        assinatura = df.attrs.get("hash_payload") if df is not None else None
+        referencia = maior_referencia(df)
+
+        with self._lock:
+            if referencia is not None:
+                novidade = self._referencia is None or referencia > self._referencia
+            else:
+                novidade = assinatura is not None and assinatura != self._assinatura
+
+            anterior = self._ultima_coleta
+            if anterior is not None:
+                evitadas = int((agora - anterior) // self.intervalo_base) - 1
+                if evitadas > 0:
+                    metricas.incrementar(self.fonte, "coletas_evitadas", evitadas)
+            self._ultima_coleta = agora
+
+            if novidade:
+                if referencia is not None:
+                    # Referência no futuro é relógio adiantado da fonte.
+                    self._publicacoes.append(min(referencia, agora))
+                if referencia is not None and referencia <= agora:
+                    defasagem = agora - referencia
+                    minimo = max(anterior - referencia, 0.0) if anterior is not None else 0.0
+                    self._atrasos.append((minimo + defasagem) / 2)
+                    metricas.registrar_latencia(f"{self.fonte}:defasagem", defasagem)
+                self.sem_novidade = 0
+                metricas.incrementar(self.fonte, "coletas_com_novidade")
+            else:
+                self.sem_novidade += 1
+                metricas.incrementar(self.fonte, "coletas_sem_novidade")
+
+            self._assinatura = assinatura
+            if referencia is not None:
+                self._referencia = max(referencia, self._referencia or referencia)
+
+        return novidade
+
+    def proximo_intervalo(self, agora: float) -> float:
+        """Segundos até a próxima coleta."""
+        periodo = self.periodo
+        if periodo is None:
+            return self.intervalo_base
+
+        with self._lock:
+            ultima_publicacao = self._publicacoes[-1]
+        esperado = ultima_publicacao + periodo + self.atraso + self.margem
+
+        if esperado > agora:
+            espera = esperado - agora
+        else:
+            espera = self.minimo * 2 ** max(self.sem_novidade - 1, 0)
+
+        return min(max(espera, self.minimo), self.maximo)
+
+    def resumo(self) -> dict:
+        periodo = self.periodo
+        defasagem = metricas.percentil_latencia(f"{self.fonte}:defasagem", 50)
+        return {
+            "Fonte": self.fonte,
+            "Período estimado (min)": round(periodo / 60, 1) if periodo else None,
+            "Atraso típico (min)": round(self.atraso / 60, 1),
+            "Defasagem mediana (min)": round(defasagem / 60, 1) if defasagem is not None else None,
+            "Coletas sem novidade seguidas": self.sem_novidade,
+        }
@@ -0,0 +1,275 @@
+"""Catálogo único de estações de todas as fontes, com índice em disco.
+
+Junta a base do SATDES (``data/stations_satdes.json``, com coordenadas e
+altitude) e as listas fixas de ``app/codEstacoes.py`` numa tabela só, indexada
+por ``(fonte, código)`` e pelo nome que aparece na coluna ``Estação``. O código
+de cada estação é o que a própria fonte usa: código ANA, código INMET ou o nome
+da estação no SATDES, com o ``code`` do SATDES como apelido.
+
+O catálogo montado vai para ``CATALOGO_ESTACOES_FILE`` junto com a assinatura
+das entradas (mtime e tamanho da base, hash das listas fixas); enquanto ela não
+muda, os processos leem só o índice. ``agendar_atualizacao_catalogo`` baixa a
+base do SATDES de tempos em tempos e quem chamar ``obter_catalogo`` depois
+recebe a versão nova. O download acontece sob ``CATALOGO_ESTACOES_LOCK``, que
+guarda o horário da última verificação: com vários processos agendando, só um
+baixa a cada intervalo.
+
+A CEMADEN não entra: o coletor agrega por município e o projeto não guarda
+metadados das estações dela.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from app.codEstacoes import ANA, CEPDEC, INCAPER, INMET
+from app.config.settings import (
+    CATALOGO_ESTACOES_ATUALIZAR_SECONDS,
+    CATALOGO_ESTACOES_FILE,
+    CATALOGO_ESTACOES_LOCK,
+    SATDES_STATIONS_FILE,
+    SOURCE_ANA,
+    SOURCE_INMET,
+    SOURCE_SATDES,
+)
+from app.services.arquivos import gravar_atomico
+from app.services.estacoes import atualizar_base_estacoes, carregar_base_estacoes
+from app.services.metricas import metricas
+from app.services.normalizacao import normalizar_municipio
+
+try:
+    import fcntl
+except ModuleNotFoundError:
+    fcntl = None
+
+
+CAMPOS = (
+    "fonte",
+    "codigo",
+    "estacao",
+    "codigo_satdes",
+    "municipio",
+    "instituicao",
+    "latitude",
+    "longitude",
+    "altitude",
+    "tipo",
+    "ativa",
+)
+FONTE_METRICAS = "CATALOGO"
+
+# Listas fixas por fonte, com a instituição de cada uma.
+LISTAS_FIXAS = (
+    (SOURCE_ANA, "ANA", ANA),
+    (SOURCE_INMET, "INMET", INMET),
+    (SOURCE_SATDES, "CEPDEC", CEPDEC),
+    (SOURCE_SATDES, "INCAPER", INCAPER),
+)
+HASH_LISTAS_FIXAS = hashlib.blake2b(
+    json.dumps([lista for *_, lista in LISTAS_FIXAS], sort_keys=True).encode("utf-8"),
+    digest_size=16,
+).hexdigest()
+
+
+class CatalogoEstacoes:
+    """Estações indexadas por ``(fonte, código)``, por nome e por fonte."""
+
+    def __init__(self, registros: list[dict], versao: str):
+        self.versao = versao
+        self.registros = registros
+        self.por_codigo: dict[tuple[str, str], dict] = {}
+        self.por_nome: dict[str, dict] = {}
+        self._por_fonte: dict[str, dict[str, dict]] = {}
+
+        for registro in registros:
+            fonte, codigo = registro["fonte"], registro["codigo"]
+            self.por_codigo[(fonte, codigo)] = registro
+            self.por_nome.setdefault(registro["estacao"], registro)
+            self._por_fonte.setdefault(fonte, {})[codigo] = registro
+        for registro in registros:
+            if registro["codigo_satdes"]:
+                self.por_codigo.setdefault((registro["fonte"], registro["codigo_satdes"]), registro)
+
+    def __len__(self) -> int:
+        return len(self.registros)
+
+    def obter(self, fonte: str, codigo) -> dict | None:
+        return self.por_codigo.get((fonte, str(codigo)))
+
+    def da_fonte(self, fonte: str) -> dict[str, dict]:
+        """Estações de uma fonte pelo código, no formato que os coletores consultam."""
+        return self._por_fonte.get(fonte, {})
+
+
+def montar_registros(base_satdes: dict[str, dict]) -> list[dict]:
+    """Registros do catálogo; a base do SATDES prevalece sobre as listas fixas."""
+    registros: dict[tuple[str, str], dict] = {}
+
+    def incluir(fonte: str, codigo: str, **dados) -> None:
+        registro = registros.get((fonte, codigo))
+        if registro is None:
+            registro = dict.fromkeys(CAMPOS)
+            registro.update(fonte=fonte, codigo=codigo, estacao=codigo)
+            registros[(fonte, codigo)] = registro
+        registro.update({campo: valor for campo, valor in dados.items() if valor not in (None, "")})
+
+    for fonte, instituicao, lista in LISTAS_FIXAS:
+        for codigo, municipio in lista.items():
+            incluir(fonte, str(codigo), municipio=normalizar_municipio(municipio), instituicao=instituicao)
+
+    for nome, dados in base_satdes.items():
+        instituicao = dados.get("instituicao")
+        # Estações da ANA e do INMET republicadas pelo SATDES usam o código da fonte como nome.
+        fonte = instituicao if instituicao in (SOURCE_ANA, SOURCE_INMET) else SOURCE_SATDES
+        incluir(
+            fonte,
+            str(nome),
+            codigo_satdes=dados.get("codigo"),
+            **{campo: dados.get(campo) for campo in CAMPOS[4:]},
+        )
+
+    return sorted(registros.values(), key=lambda registro: (registro["fonte"], registro["codigo"]))
+
+
+def assinatura_entradas(caminho_base: Path | None = None) -> list:
+    caminho_base = caminho_base or SATDES_STATIONS_FILE
+    try:
+        estado = caminho_base.stat()
+    except OSError:
+        return [None, None, HASH_LISTAS_FIXAS]
+    return [estado.st_mtime_ns, estado.st_size, HASH_LISTAS_FIXAS]
+
+
+def _ler_indice(caminho: Path, assinatura: list) -> CatalogoEstacoes | None:
+    try:
+        indice = json.loads(caminho.read_bytes())
+        if indice.get("assinatura") != assinatura or indice.get("campos") != list(CAMPOS):
+            return None
+        registros = [dict(zip(CAMPOS, linha)) for linha in indice["estacoes"]]
+        return CatalogoEstacoes(registros, indice["versao"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def carregar_catalogo(
+    caminho_base: Path | None = None,
+    caminho_indice: Path | None = None,
+) -> CatalogoEstacoes:
+    """Catálogo do índice em disco; remonta e regrava se as entradas mudaram.
+
+    Sem caminhos, valem ``SATDES_STATIONS_FILE`` e ``CATALOGO_ESTACOES_FILE``
+    do módulo, lidos na chamada (os testes os apontam para ``tmp_path``).
+    """
+    caminho_base = caminho_base or SATDES_STATIONS_FILE
+    caminho_indice = caminho_indice or CATALOGO_ESTACOES_FILE
+    assinatura = assinatura_entradas(caminho_base)
+    catalogo = _ler_indice(caminho_indice, assinatura)
+    if catalogo is not None:
+        return catalogo
+
+    registros = montar_registros(carregar_base_estacoes(caminho_base))
+    linhas = [[registro[campo] for campo in CAMPOS] for registro in registros]
+    versao = hashlib.blake2b(
+        json.dumps(linhas, ensure_ascii=False).encode("utf-8"), digest_size=16
+    ).hexdigest()
+    metricas.incrementar(FONTE_METRICAS, "catalogo_montado")
+
+    indice = {"versao": versao, "assinatura": assinatura, "campos": list(CAMPOS), "estacoes": linhas}
+    try:
+        caminho_indice.parent.mkdir(parents=True, exist_ok=True)
+        gravar_atomico(caminho_indice, json.dumps(indice, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    except OSError as exc:
+        print(f"Não foi possível gravar o catálogo de estações: {exc}")
+
+    return CatalogoEstacoes(registros, versao)
+
+
+_catalogo: tuple[list, CatalogoEstacoes] | None = None
+_catalogo_lock = threading.Lock()
+
+
+def obter_catalogo() -> CatalogoEstacoes:
+    """Catálogo atual do processo; só relê quando a base em disco muda."""
+    global _catalogo
+    assinatura = assinatura_entradas()
+    with _catalogo_lock:
+        if _catalogo is not None and _catalogo[0] == assinatura:
+            return _catalogo[1]
+
+    catalogo = carregar_catalogo()
+    with _catalogo_lock:
+        _catalogo = (assinatura, catalogo)
+    return catalogo
+
+
+def atualizar_se_vencida(
+    intervalo: float = CATALOGO_ESTACOES_ATUALIZAR_SECONDS,
+    caminho_base: Path | None = None,
+    caminho_trava: Path | None = None,
+) -> float:
+    """Baixa a base se a última verificação, de qualquer processo, tiver ``intervalo`` de idade.
+
+    A verificação acontece com a trava tomada e o horário fica gravado nela;
+    sem registro, vale o mtime da base. Devolve quantos segundos faltam para a
+    próxima.
+    """
+    caminho_base = caminho_base or SATDES_STATIONS_FILE
+    caminho_trava = caminho_trava or CATALOGO_ESTACOES_LOCK
+    caminho_trava.parent.mkdir(parents=True, exist_ok=True)
+
+    descritor = os.open(caminho_trava, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(descritor, fcntl.LOCK_EX)
+        try:
+            ultima = float(os.pread(descritor, 32, 0))
+        except ValueError:
+            try:
+                ultima = caminho_base.stat().st_mtime
+            except OSError:
+                ultima = 0.0
+
+        idade = time.time() - ultima
+        if idade < intervalo:
+            return intervalo - idade
+
+        atualizar_base_estacoes(caminho_base)
+        os.ftruncate(descritor, 0)
+        os.pwrite(descritor, repr(time.time()).encode(), 0)
+        metricas.incrementar(FONTE_METRICAS, "base_atualizada")
+        return intervalo
+    finally:
+        os.close(descritor)
+
+
+_atualizador: threading.Thread | None = None
+_atualizador_lock = threading.Lock()
+
+
+def agendar_atualizacao_catalogo(
+    intervalo: float = CATALOGO_ESTACOES_ATUALIZAR_SECONDS,
+    caminho_base: Path | None = None,
+) -> threading.Thread:
+    """Mantém a base do SATDES atualizada numa thread daemon, uma por processo."""
+    global _atualizador
+
+    def laco():
+        while True:
+            try:
+                espera = atualizar_se_vencida(intervalo, caminho_base)
+                obter_catalogo()
+            except Exception as exc:
+                metricas.incrementar(FONTE_METRICAS, "falha_atualizacao")
+                print(f"Falha ao atualizar a base de estações: {exc}")
+                espera = min(intervalo, 3600)
+            time.sleep(espera)
+
+    with _atualizador_lock:
+        if _atualizador is None:
+            _atualizador = threading.Thread(target=laco, name="catalogo_estacoes", daemon=True)
+            _atualizador.start()
+        return _atualizador
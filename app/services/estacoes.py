@@ -3,13 +3,12 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
-import requests
-
 from app.config.settings import (
-    REQUEST_TIMEOUT_SECONDS,
     SATDES_STATIONS_FILE,
     SATDES_STATIONS_URL,
+    SOURCE_SATDES,
 )
+from app.services.arquivos import gravar_atomico
 from app.services.normalizacao import normalizar_instituicao, normalizar_municipio
 
 
@@ -42,14 +41,17 @@ def carregar_base_estacoes(caminho: Path = SATDES_STATIONS_FILE) -> dict[str, di
 
 
 def atualizar_base_estacoes(caminho: Path = SATDES_STATIONS_FILE) -> int:
-    response = requests.get(SATDES_STATIONS_URL, timeout=REQUEST_TIMEOUT_SECONDS)
-    response.raise_for_status()
+    # Importado aqui para que leitores da base (API, consultas) não carreguem o requests.
+    from app.services.cache_http import cache_http
+    from app.services.http import requisitar
+
+    response = requisitar(SATDES_STATIONS_URL, fonte=SOURCE_SATDES, cache=cache_http)
     payload = response.json()
 
+    if response.headers.get("X-Cache") == "REVALIDATED" and caminho.exists():
+        return len(payload.get("data", []))
+
     caminho.parent.mkdir(parents=True, exist_ok=True)
-    caminho.write_text(
-        json.dumps(payload, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+    gravar_atomico(caminho, json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8"))
 
     return len(payload.get("data", []))
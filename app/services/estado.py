@@ -0,0 +1,116 @@
+"""Último estado consolidado publicado pelo app, para leitores que não coletam."""
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from app.config.settings import SNAPSHOT_DIR
+from app.services.fonte_status import FonteStatus
+from app.services.json_rapido import carregar_json
+from app.services.normalizacao import garantir_colunas_estendidas
+from app.services.tabelas import ARROW_DISPONIVEL, ler_ipc
+
+
+TZ_BRT = ZoneInfo("America/Sao_Paulo")
+
+
+@dataclass(frozen=True)
+class EstadoPublicado:
+    versao: str
+    gerado_em: datetime
+    consolidado: pd.DataFrame
+    fontes: dict[str, pd.DataFrame] = field(default_factory=dict)
+    status: list[FonteStatus] = field(default_factory=list)
+
+
+_estado: EstadoPublicado | None = None
+_estado_lock = threading.Lock()
+_armazenado: tuple[tuple, EstadoPublicado] | None = None
+
+
+def publicar_estado(
+    consolidado: pd.DataFrame,
+    fontes: dict[str, pd.DataFrame],
+    status: list[FonteStatus],
+) -> EstadoPublicado:
+    global _estado
+    agora = datetime.now(TZ_BRT)
+    estado = EstadoPublicado(
+        versao=consolidado.attrs.get("versao") or agora.strftime("%Y%m%d%H%M%S%f"),
+        gerado_em=agora,
+        consolidado=consolidado,
+        fontes=dict(fontes),
+        status=list(status),
+    )
+    with _estado_lock:
+        _estado = estado
+    return estado
+
+
+def obter_estado() -> EstadoPublicado | None:
+    with _estado_lock:
+        return _estado
+
+
+def _snapshot_mais_recente(diretorio: Path) -> tuple[Path, os.stat_result] | None:
+    nomes = ["acumulados_latest.json"]
+    if ARROW_DISPONIVEL:
+        nomes.insert(0, "acumulados_latest.arrow")
+
+    encontrados = []
+    for nome in nomes:
+        caminho = Path(diretorio) / nome
+        try:
+            encontrados.append((caminho, caminho.stat()))
+        except OSError:
+            continue
+    # Em empate, vale o Arrow, gravado logo depois do JSON do mesmo snapshot.
+    return max(encontrados, key=lambda item: item[1].st_mtime_ns, default=None)
+
+
+def carregar_estado_armazenado(diretorio: Path = SNAPSHOT_DIR) -> EstadoPublicado | None:
+    """Estado reconstruído do último snapshot em disco (apenas o consolidado).
+
+    Prefere o ``acumulados_latest.arrow``, lido por ``memory_map``; o JSON fica
+    para quando ele não existe ou é mais antigo. O arquivo só é relido quando
+    inode ou mtime mudam.
+    """
+    global _armazenado
+    encontrado = _snapshot_mais_recente(diretorio)
+    if encontrado is None:
+        return None
+    caminho, estado_arquivo = encontrado
+
+    assinatura = (str(caminho), estado_arquivo.st_ino, estado_arquivo.st_mtime_ns)
+    with _estado_lock:
+        if _armazenado is not None and _armazenado[0] == assinatura:
+            return _armazenado[1]
+
+    try:
+        if caminho.suffix == ".arrow":
+            df, metadados = ler_ipc(caminho)
+            gerado_em = metadados["gerado_em"]
+        else:
+            payload = carregar_json(caminho.read_bytes())
+            df = pd.DataFrame(payload.get("registros", []))
+            gerado_em = payload["gerado_em"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if not df.empty:
+        df = garantir_colunas_estendidas(df)
+
+    estado = EstadoPublicado(
+        versao=f"arquivo-{estado_arquivo.st_ino}-{estado_arquivo.st_mtime_ns}",
+        gerado_em=datetime.fromisoformat(gerado_em),
+        consolidado=df,
+    )
+    with _estado_lock:
+        _armazenado = (assinatura, estado)
+    return estado
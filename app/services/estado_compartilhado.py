@@ -0,0 +1,273 @@
+"""Estado consolidado num arquivo mapeado em memória, compartilhado entre processos.
+
+Com vários workers do Streamlit (e ferramentas ao lado, como a API isolada),
+cada processo manteria a própria cópia dos frames e coletaria por conta própria.
+Aqui um único processo, o que obtém ``assumir_coleta``, coleta e grava o estado
+em ``ESTADO_COMPARTILHADO_FILE``; os demais mapeiam o arquivo e dividem a mesma
+cópia no page cache.
+
+Layout do arquivo (little-endian)::
+
+    cabeçalho  8s   assinatura  b"ACUMEST1"
+               Q    contador    incrementado a cada publicação
+               Q    tamanho do manifesto
+    manifesto  JSON com versão, horário, status e, por frame, (início, tamanho)
+    frames     Arrow IPC (formato arquivo), alinhados em 64 bytes
+
+O arquivo é trocado por inteiro com ``os.replace``: quem já o mapeou continua
+lendo a versão anterior, consistente. Para saber se há dado novo, o leitor lê só
+o cabeçalho e compara o contador; os frames saem direto do mapeamento.
+
+A publicação no coletor roda numa thread própria (``agendar_publicacao``), sem
+depender de reruns de sessões; o arquivo é regravado a cada intervalo mesmo sem
+versão nova, e ``gerado_em`` marca a última confirmação do coletor.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from app.config.settings import (
+    ESTADO_COMPARTILHADO_FILE,
+    ESTADO_COMPARTILHADO_LOCK,
+    ESTADO_COMPARTILHADO_PUBLICAR_SECONDS,
+)
+from app.services.arquivos import gravar_atomico
+from app.services.estado import EstadoPublicado
+from app.services.fonte_status import FonteStatus
+from app.services.tabelas import ARROW_DISPONIVEL, ipc_arquivo, para_pandas
+
+try:
+    import fcntl
+except ModuleNotFoundError:
+    fcntl = None
+
+if ARROW_DISPONIVEL:
+    import pyarrow as pa
+    import pyarrow.ipc
+
+
+ASSINATURA = b"ACUMEST1"
+CABECALHO = struct.Struct("<8sQQ")
+ALINHAMENTO = 64
+CONSOLIDADO = "__consolidado__"
+
+_escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="estado_compartilhado")
+_trava_coleta = None
+_publicador: tuple[threading.Thread, threading.Event] | None = None
+_publicador_lock = threading.Lock()
+
+
+def _status_para_json(status: FonteStatus) -> dict:
+    return {
+        "fonte": status.fonte,
+        "sucesso": status.sucesso,
+        "registros": status.registros,
+        "mensagem": status.mensagem,
+        "atualizado_em": status.atualizado_em.isoformat() if status.atualizado_em else None,
+        "ultima_tentativa": status.ultima_tentativa.isoformat() if status.ultima_tentativa else None,
+    }
+
+
+def _status_de_json(dados: dict) -> FonteStatus:
+    return FonteStatus(
+        fonte=dados["fonte"],
+        sucesso=dados["sucesso"],
+        registros=dados["registros"],
+        mensagem=dados["mensagem"],
+        atualizado_em=datetime.fromisoformat(dados["atualizado_em"]) if dados["atualizado_em"] else None,
+        ultima_tentativa=datetime.fromisoformat(dados["ultima_tentativa"]) if dados["ultima_tentativa"] else None,
+    )
+
+
+def ler_contador(caminho: Path = ESTADO_COMPARTILHADO_FILE) -> int | None:
+    """Contador do arquivo, lendo apenas o cabeçalho; ``None`` se não houver estado."""
+    try:
+        with open(caminho, "rb") as arquivo:
+            bruto = arquivo.read(CABECALHO.size)
+    except OSError:
+        return None
+    if len(bruto) < CABECALHO.size:
+        return None
+    assinatura, contador, _ = CABECALHO.unpack(bruto)
+    return contador if assinatura == ASSINATURA else None
+
+
+def gravar_estado_compartilhado(
+    estado: EstadoPublicado, caminho: Path = ESTADO_COMPARTILHADO_FILE
+) -> int | None:
+    """Grava o estado com o contador seguinte; devolve o contador gravado."""
+    if not ARROW_DISPONIVEL:
+        return None
+
+    frames = {CONSOLIDADO: estado.consolidado, **estado.fontes}
+    blocos = {nome: ipc_arquivo(df) for nome, df in frames.items() if df is not None}
+    contador = (ler_contador(caminho) or 0) + 1
+
+    # O manifesto traz posições absolutas, que dependem do próprio tamanho:
+    # calcula com uma estimativa e repete até estabilizar.
+    tamanho_manifesto = 0
+    while True:
+        posicao = CABECALHO.size + tamanho_manifesto
+        intervalos = {}
+        for nome, bloco in blocos.items():
+            posicao += -posicao % ALINHAMENTO
+            intervalos[nome] = [posicao, len(bloco)]
+            posicao += len(bloco)
+        manifesto = json.dumps(
+            {
+                "versao": estado.versao,
+                "gerado_em": estado.gerado_em.isoformat(),
+                "status": [_status_para_json(item) for item in estado.status],
+                "frames": intervalos,
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+        if len(manifesto) == tamanho_manifesto:
+            break
+        tamanho_manifesto = len(manifesto)
+
+    conteudo = bytearray(CABECALHO.pack(ASSINATURA, contador, len(manifesto)))
+    conteudo += manifesto
+    for nome, bloco in blocos.items():
+        conteudo += bytes(intervalos[nome][0] - len(conteudo))
+        conteudo += bloco
+
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    gravar_atomico(caminho, bytes(conteudo))
+    return contador
+
+
+def agendar_estado_compartilhado(estado: EstadoPublicado) -> Future:
+    """Grava em segundo plano; um único escritor mantém a ordem dos contadores."""
+    return _escritor.submit(gravar_estado_compartilhado, estado)
+
+
+def agendar_publicacao(
+    produzir: Callable[[], EstadoPublicado | None],
+    intervalo: float = ESTADO_COMPARTILHADO_PUBLICAR_SECONDS,
+    caminho: Path = ESTADO_COMPARTILHADO_FILE,
+) -> threading.Thread:
+    """Grava o estado devolvido por ``produzir`` a cada ``intervalo`` numa thread daemon.
+
+    Uma thread por processo; chamadas seguintes devolvem a que já roda. Com a
+    mesma versão o arquivo é regravado assim mesmo, com o ``gerado_em`` que
+    ``produzir`` informar.
+    """
+    global _publicador
+
+    def laco(parar: threading.Event):
+        while not parar.is_set():
+            try:
+                estado = produzir()
+                if estado is not None:
+                    _escritor.submit(gravar_estado_compartilhado, estado, caminho).result()
+            except Exception as exc:
+                print(f"Falha ao publicar o estado compartilhado: {exc}")
+            parar.wait(intervalo)
+
+    with _publicador_lock:
+        if _publicador is None:
+            parar = threading.Event()
+            thread = threading.Thread(target=laco, args=(parar,), name="publicador_estado", daemon=True)
+            _publicador = (thread, parar)
+            thread.start()
+        return _publicador[0]
+
+
+def parar_publicacao() -> None:
+    """Encerra a thread de ``agendar_publicacao``, se houver, e espera a última gravação."""
+    global _publicador
+    with _publicador_lock:
+        publicador, _publicador = _publicador, None
+    if publicador is not None:
+        thread, parar = publicador
+        parar.set()
+        thread.join()
+
+
+class LeitorEstadoCompartilhado:
+    """Mantém o último estado lido e só remapeia quando o contador muda."""
+
+    def __init__(self, caminho: Path = ESTADO_COMPARTILHADO_FILE):
+        self.caminho = caminho
+        self.contador: int | None = None
+        self._estado: EstadoPublicado | None = None
+        self._lock = threading.Lock()
+
+    def obter(self) -> EstadoPublicado | None:
+        if not ARROW_DISPONIVEL:
+            return None
+
+        contador = ler_contador(self.caminho)
+        with self._lock:
+            if contador is None or contador == self.contador:
+                return self._estado
+
+            try:
+                estado, contador = self._mapear()
+            except (OSError, ValueError, KeyError):
+                return self._estado
+
+            self._estado, self.contador = estado, contador
+            return estado
+
+    def _mapear(self) -> tuple[EstadoPublicado, int]:
+        with open(self.caminho, "rb") as arquivo:
+            mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # O contador vem do arquivo mapeado, que pode ser mais novo que o do cabeçalho lido antes.
+        assinatura, contador, tamanho_manifesto = CABECALHO.unpack_from(mapa)
+        if assinatura != ASSINATURA:
+            raise ValueError("Arquivo de estado com assinatura desconhecida.")
+        manifesto = json.loads(mapa[CABECALHO.size:CABECALHO.size + tamanho_manifesto])
+
+        # Os buffers Arrow apontam para o mapeamento, que fica vivo enquanto houver frames.
+        buffer = pa.py_buffer(mapa)
+        frames = {}
+        for nome, (inicio, tamanho) in manifesto["frames"].items():
+            leitor = pa.ipc.open_file(pa.BufferReader(buffer.slice(inicio, tamanho)))
+            frames[nome] = para_pandas(leitor.read_all())
+
+        consolidado = frames.pop(CONSOLIDADO)
+        consolidado.attrs["versao"] = manifesto["versao"]
+        estado = EstadoPublicado(
+            versao=manifesto["versao"],
+            gerado_em=datetime.fromisoformat(manifesto["gerado_em"]),
+            consolidado=consolidado,
+            fontes=frames,
+            status=[_status_de_json(item) for item in manifesto["status"]],
+        )
+        return estado, contador
+
+
+def assumir_coleta(caminho: Path = ESTADO_COMPARTILHADO_LOCK) -> bool:
+    """Tenta ser o processo coletor; a trava vale enquanto o processo viver.
+
+    Sem ``fcntl`` (Windows) todo processo coleta, como antes.
+    """
+    global _trava_coleta
+    if _trava_coleta is not None:
+        return True
+    if fcntl is None:
+        return True
+
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    descritor = os.open(caminho, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(descritor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(descritor)
+        return False
+
+    os.ftruncate(descritor, 0)
+    os.write(descritor, str(os.getpid()).encode())
+    _trava_coleta = descritor
+    return True
@@ -0,0 +1,206 @@
+"""Política de requisições HTTP usada pelos coletores.
+
+Cada chamada passa por tentativas limitadas com backoff exponencial e jitter,
+timeouts separados de conexão e leitura e, opcionalmente, uma requisição
+duplicada (hedge) disparada quando a primeira passa do p95 observado para o
+mesmo endpoint (fonte, host e caminho) da fonte.
+Com um ``CacheHttp`` a requisição vira condicional e um 304 devolve o corpo
+guardado em disco.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import requests
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+
+from app.config.settings import (
+    REQUEST_BACKOFF_BASE_SECONDS,
+    REQUEST_BACKOFF_MAX_SECONDS,
+    REQUEST_CONNECT_TIMEOUT_SECONDS,
+    REQUEST_HEDGE_MIN_AMOSTRAS,
+    REQUEST_HEDGE_PERCENTIL,
+    REQUEST_MAX_TENTATIVAS,
+    REQUEST_TIMEOUT_SECONDS,
+)
+from app.services.cache_http import CacheHttp, EntradaCache
+from app.services.metricas import metricas
+
+
+STATUS_RETENTAVEIS = {408, 425, 429, 500, 502, 503, 504}
+
+
+@dataclass(frozen=True)
+class PoliticaRequisicao:
+    tentativas: int = REQUEST_MAX_TENTATIVAS
+    backoff_base: float = REQUEST_BACKOFF_BASE_SECONDS
+    backoff_max: float = REQUEST_BACKOFF_MAX_SECONDS
+    timeout_conexao: float = REQUEST_CONNECT_TIMEOUT_SECONDS
+    timeout_leitura: float = REQUEST_TIMEOUT_SECONDS
+    hedge: bool = False
+    hedge_percentil: float = REQUEST_HEDGE_PERCENTIL
+    hedge_min_amostras: int = REQUEST_HEDGE_MIN_AMOSTRAS
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        return self.timeout_conexao, self.timeout_leitura
+
+    def espera(self, tentativa: int) -> float:
+        """Backoff exponencial com jitter completo."""
+        teto = min(self.backoff_max, self.backoff_base * (2 ** (tentativa - 1)))
+        return random.uniform(0, teto)
+
+
+POLITICA_PADRAO = PoliticaRequisicao()
+POLITICA_POR_ESTACAO = PoliticaRequisicao(hedge=True)
+
+_executor_hedge: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _executor_hedge
+    with _executor_lock:
+        if _executor_hedge is None:
+            _executor_hedge = ThreadPoolExecutor(
+                max_workers=16,
+                thread_name_prefix="http-hedge",
+            )
+        return _executor_hedge
+
+
+def chave_latencia(fonte: str, url: str) -> str:
+    """Amostras de latência por fonte e endpoint: a query (estação, datas) fica de fora."""
+    partes = urlsplit(url)
+    return f"{fonte}:{partes.netloc}{partes.path}"
+
+
+def _enviar(url: str, fonte: str, politica: PoliticaRequisicao, **kwargs) -> requests.Response:
+    inicio = time.perf_counter()
+    response = requests.get(url, timeout=politica.timeout, **kwargs)
+    if response.status_code < 400:
+        metricas.registrar_latencia(chave_latencia(fonte, url), time.perf_counter() - inicio)
+    return response
+
+
+def _enviar_com_hedge(
+    url: str, fonte: str, politica: PoliticaRequisicao, **kwargs
+) -> requests.Response:
+    atraso = metricas.percentil_latencia(
+        chave_latencia(fonte, url),
+        politica.hedge_percentil,
+        minimo_amostras=politica.hedge_min_amostras,
+    )
+    if atraso is None:
+        return _enviar(url, fonte, politica, **kwargs)
+
+    # O atraso conta a partir do envio, não do tempo na fila do executor compartilhado.
+    iniciada = threading.Event()
+
+    def enviar_principal():
+        iniciada.set()
+        return _enviar(url, fonte, politica, **kwargs)
+
+    executor = _executor()
+    principal = executor.submit(enviar_principal)
+    iniciada.wait()
+    concluidas, _ = wait([principal], timeout=atraso)
+    if concluidas:
+        return principal.result()
+
+    metricas.incrementar(fonte, "hedge_enviado")
+    duplicada = executor.submit(_enviar, url, fonte, politica, **kwargs)
+    pendentes = {principal, duplicada}
+    erro = None
+    retentavel = None
+
+    while pendentes:
+        concluidas, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+        for future in concluidas:
+            try:
+                response = future.result()
+            except Exception as exc:
+                erro = exc
+                continue
+
+            # Um 5xx/429 só é devolvido se nenhuma das duas trouxer coisa melhor.
+            if response.status_code in STATUS_RETENTAVEIS:
+                retentavel = response
+                continue
+
+            if future is duplicada:
+                metricas.incrementar(fonte, "hedge_venceu")
+            return response
+
+    if retentavel is not None:
+        return retentavel
+    raise erro
+
+
+def _aplicar_cache(
+    cache: CacheHttp,
+    entrada: EntradaCache | None,
+    url: str,
+    fonte: str,
+    response: requests.Response,
+) -> requests.Response:
+    if response.status_code == 304 and entrada is not None:
+        metricas.incrementar(fonte, "cache_revalidado")
+        return cache.resposta_revalidada(entrada, response)
+
+    if cache.salvar(url, response):
+        metricas.incrementar(fonte, "cache_armazenado")
+    return response
+
+
+def requisitar(
+    url: str,
+    *,
+    fonte: str,
+    politica: PoliticaRequisicao = POLITICA_PADRAO,
+    cache: CacheHttp | None = None,
+    **kwargs,
+) -> requests.Response:
+    """Executa um GET seguindo a política e levanta erro se todas as tentativas falharem."""
+    enviar = _enviar_com_hedge if politica.hedge else _enviar
+    metricas.incrementar(fonte, "requisicoes")
+
+    entrada = cache.obter(url) if cache is not None else None
+    if cache is not None:
+        # O urllib3 só inclui ``br``/``zstd`` quando o decodificador está
+        # instalado (``brotli`` vem no extra ``rapido``).
+        kwargs["headers"] = {
+            "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
+            **(kwargs.get("headers") or {}),
+        }
+    if entrada is not None:
+        kwargs["headers"].update(entrada.cabecalhos_condicionais())
+
+    for tentativa in range(1, politica.tentativas + 1):
+        ultima = tentativa == politica.tentativas
+        metricas.incrementar(fonte, "tentativas")
+
+        try:
+            response = enviar(url, fonte, politica, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if ultima:
+                metricas.incrementar(fonte, "falhas")
+                raise
+        else:
+            if response.status_code not in STATUS_RETENTAVEIS or ultima:
+                if response.status_code >= 400:
+                    metricas.incrementar(fonte, "falhas")
+                response.raise_for_status()
+                if cache is not None:
+                    return _aplicar_cache(cache, entrada, url, fonte, response)
+                return response
+
+        metricas.incrementar(fonte, "retentativas")
+        time.sleep(politica.espera(tentativa))
+
+    raise RuntimeError("Política de requisição sem tentativas configuradas.")
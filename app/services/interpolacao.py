@@ -0,0 +1,273 @@
+"""Campo de chuva interpolado (IDW) sobre o Espírito Santo.
+
+A grade regular, a máscara do estado e a matriz de pesos normalizada dependem
+só da geometria: são montadas uma vez por conjunto de coordenadas de estações e
+reaproveitadas. A cada atualização o campo sai de um único produto
+``pesos @ valores``.
+
+Com a malha municipal disponível, cada célula pertence ao polígono que contém
+seu centro. Sem ela, cada célula é atribuída ao município com a sede mais
+próxima e a máscara descarta células a mais de ``INTERPOLACAO_RAIO_MASCARA_KM``
+de qualquer sede.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from app.config.settings import (
+    INTERPOLACAO_LIMITES,
+    INTERPOLACAO_POTENCIA,
+    INTERPOLACAO_RAIO_MASCARA_KM,
+    INTERPOLACAO_RESOLUCAO_GRAUS,
+    INTERPOLACAO_VIZINHOS,
+)
+from app.municipiosES import COORDENADAS_ESPIRITO_SANTO
+from app.services.municipios_geo import indice_municipios
+
+
+KM_POR_GRAU_LAT = 110.57
+KM_POR_GRAU_LON_EQUADOR = 111.32
+DISTANCIA_MINIMA_KM = 0.05
+
+MUNICIPIOS = tuple(COORDENADAS_ESPIRITO_SANTO)
+SEDES = np.array([COORDENADAS_ESPIRITO_SANTO[municipio] for municipio in MUNICIPIOS])
+
+
+def distancias_km(origem: np.ndarray, destino: np.ndarray) -> np.ndarray:
+    """Matriz de distâncias (equiretangular) entre pontos ``(lat, lon)``."""
+    latitude_media = np.radians(np.mean(INTERPOLACAO_LIMITES, axis=0)[0])
+    escala = np.array([KM_POR_GRAU_LAT, KM_POR_GRAU_LON_EQUADOR * np.cos(latitude_media)])
+    diferenca = (origem[:, None, :] - destino[None, :, :]) * escala
+    return np.hypot(diferenca[..., 0], diferenca[..., 1])
+
+
+@dataclass(frozen=True)
+class Grade:
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    celulas: np.ndarray
+    """Centros ``(lat, lon)`` das células dentro da máscara."""
+    indices: np.ndarray
+    """Posição de cada célula da máscara na grade achatada."""
+    rotulos: np.ndarray
+    """Índice em ``MUNICIPIOS`` do município de cada célula."""
+
+    @property
+    def forma(self) -> tuple[int, int]:
+        return len(self.latitudes), len(self.longitudes)
+
+    @property
+    def limites(self) -> list[list[float]]:
+        meio = self.resolucao / 2
+        return [
+            [float(self.latitudes[0] - meio), float(self.longitudes[0] - meio)],
+            [float(self.latitudes[-1] + meio), float(self.longitudes[-1] + meio)],
+        ]
+
+    @property
+    def resolucao(self) -> float:
+        return float(self.latitudes[1] - self.latitudes[0])
+
+
+@lru_cache(maxsize=2)
+def grade_espirito_santo(resolucao: float = INTERPOLACAO_RESOLUCAO_GRAUS) -> Grade:
+    (lat_min, lon_min), (lat_max, lon_max) = INTERPOLACAO_LIMITES
+    latitudes = np.arange(lat_min, lat_max + resolucao / 2, resolucao)
+    longitudes = np.arange(lon_min, lon_max + resolucao / 2, resolucao)
+
+    malha_lat, malha_lon = np.meshgrid(latitudes, longitudes, indexing="ij")
+    centros = np.column_stack([malha_lat.ravel(), malha_lon.ravel()])
+
+    ate_sedes = distancias_km(centros, SEDES)
+    mais_proxima = ate_sedes.argmin(axis=1)
+    dentro = ate_sedes[np.arange(len(centros)), mais_proxima] <= INTERPOLACAO_RAIO_MASCARA_KM
+
+    indice = indice_municipios()
+    if indice.tem_geometria:
+        posicoes = {municipio: posicao for posicao, municipio in enumerate(MUNICIPIOS)}
+        nomes = indice.localizar_muitos(centros[:, 0], centros[:, 1])
+        dentro = np.array([nome in posicoes for nome in nomes], dtype=bool)
+        mais_proxima = np.array([posicoes.get(nome, -1) for nome in nomes])
+
+    return Grade(
+        latitudes=latitudes,
+        longitudes=longitudes,
+        celulas=centros[dentro],
+        indices=np.flatnonzero(dentro),
+        rotulos=mais_proxima[dentro],
+    )
+
+
+@lru_cache(maxsize=8)
+def matriz_pesos(
+    coordenadas: tuple[tuple[float, float], ...],
+    resolucao: float = INTERPOLACAO_RESOLUCAO_GRAUS,
+    potencia: float = INTERPOLACAO_POTENCIA,
+    vizinhos: int = INTERPOLACAO_VIZINHOS,
+) -> np.ndarray:
+    """Pesos IDW normalizados para as células da grade seguidas das sedes municipais.
+
+    Só os ``vizinhos`` mais próximos de cada alvo recebem peso, o que mantém o
+    campo local. A chave do cache é a tupla de coordenadas das estações.
+    """
+    grade = grade_espirito_santo(resolucao)
+    alvos = np.vstack([grade.celulas, SEDES])
+    estacoes = np.asarray(coordenadas, dtype="float64")
+
+    distancias = np.maximum(distancias_km(alvos, estacoes), DISTANCIA_MINIMA_KM)
+    pesos = distancias ** -potencia
+
+    if vizinhos < len(estacoes):
+        descartados = np.argpartition(distancias, vizinhos, axis=1)[:, vizinhos:]
+        np.put_along_axis(pesos, descartados, 0.0, axis=1)
+
+    pesos /= pesos.sum(axis=1, keepdims=True)
+    pesos.setflags(write=False)
+    return pesos
+
+
+def _componente(serie: pd.Series, chave) -> pd.Series:
+    return pd.to_numeric(
+        serie.map(lambda item: item[chave] if isinstance(item, (dict, tuple)) else None),
+        errors="coerce",
+    )
+
+
+def preencher_coordenadas(df: pd.DataFrame, base_estacoes: dict[str, dict] | None = None) -> pd.DataFrame:
+    """``Latitude``/``Longitude`` numéricas, completadas pela base de estações e pela sede.
+
+    ``Aproximada`` marca as linhas que ficaram com a coordenada da sede municipal.
+    """
+    vazia = pd.Series(np.nan, index=df.index)
+    latitude = pd.to_numeric(df.get("Latitude", vazia), errors="coerce")
+    longitude = pd.to_numeric(df.get("Longitude", vazia), errors="coerce")
+
+    if base_estacoes and "Estação" in df.columns:
+        metadados = df["Estação"].map(base_estacoes)
+        latitude = latitude.fillna(_componente(metadados, "latitude"))
+        longitude = longitude.fillna(_componente(metadados, "longitude"))
+
+    aproximada = latitude.isna() | longitude.isna()
+    if aproximada.any():
+        sedes = df.loc[aproximada, "Município"].map(COORDENADAS_ESPIRITO_SANTO)
+        latitude = latitude.fillna(_componente(sedes, 0))
+        longitude = longitude.fillna(_componente(sedes, 1))
+
+    return df.assign(Latitude=latitude, Longitude=longitude, Aproximada=aproximada)
+
+
+def leituras_secas(rede: list[dict], presentes: set) -> pd.DataFrame:
+    """Leitura 0.0 para cada estação da rede com coordenada própria e sem leitura.
+
+    Os coletores descartam estações secas; sem elas o IDW só veria chuva e o
+    conjunto de estações mudaria a cada vez que a chuva começa ou para.
+    """
+    secas = [
+        {
+            "Estação": registro["estacao"],
+            "Latitude": registro["latitude"],
+            "Longitude": registro["longitude"],
+            "Prec_mm": 0.0,
+        }
+        for registro in rede
+        if registro.get("latitude") is not None
+        and registro.get("longitude") is not None
+        and registro.get("ativa") is not False
+        and registro["estacao"] not in presentes
+    ]
+    return pd.DataFrame(secas, columns=["Estação", "Latitude", "Longitude", "Prec_mm"])
+
+
+def pontos_observados(
+    dfs,
+    base_estacoes: dict[str, dict] | None = None,
+    rede: list[dict] | None = None,
+) -> pd.DataFrame:
+    """Uma leitura por coordenada (a maior), com ``Latitude``, ``Longitude`` e ``Prec_mm``.
+
+    Sem coordenada no registro, usa a base de estações pelo nome e, por último,
+    a sede do município. As estações de ``rede`` (registros do catálogo) sem
+    leitura entram com 0.0.
+    """
+    validos = [df for df in dfs if df is not None and not df.empty]
+    if validos:
+        validos = [preencher_coordenadas(pd.concat(validos, ignore_index=True), base_estacoes)]
+    if rede:
+        presentes = set(validos[0]["Estação"].dropna()) if validos else set()
+        secas = leituras_secas(rede, presentes)
+        if not secas.empty:
+            validos.append(secas)
+    if not validos:
+        return pd.DataFrame(columns=["Latitude", "Longitude", "Prec_mm"])
+
+    df = pd.concat(validos, ignore_index=True)
+    pontos = pd.DataFrame(
+        {
+            "Latitude": pd.to_numeric(df["Latitude"], errors="coerce").round(4),
+            "Longitude": pd.to_numeric(df["Longitude"], errors="coerce").round(4),
+            "Prec_mm": pd.to_numeric(df["Prec_mm"], errors="coerce").clip(lower=0),
+        }
+    ).dropna()
+
+    return (
+        pontos.groupby(["Latitude", "Longitude"], as_index=False)["Prec_mm"]
+        .max()
+        .sort_values(["Latitude", "Longitude"], ignore_index=True)
+    )
+
+
+@dataclass(frozen=True)
+class CampoChuva:
+    grade: Grade
+    celulas: np.ndarray
+    """Valor interpolado (mm) de cada célula da máscara."""
+    sedes: np.ndarray
+    """Valor interpolado (mm) na sede de cada município."""
+
+    def matriz(self) -> np.ndarray:
+        """Campo na grade completa (sul → norte), ``NaN`` fora da máscara."""
+        campo = np.full(self.grade.forma[0] * self.grade.forma[1], np.nan)
+        campo[self.grade.indices] = self.celulas
+        return campo.reshape(self.grade.forma)
+
+    def por_municipio(self) -> pd.DataFrame:
+        """Média e máximo estimados por município.
+
+        Municípios pequenos podem não receber célula; neles vale o valor na sede.
+        """
+        quantidade = len(MUNICIPIOS)
+        rotulos = self.grade.rotulos
+
+        contagem = np.bincount(rotulos, minlength=quantidade)
+        soma = np.bincount(rotulos, weights=self.celulas, minlength=quantidade)
+        maximo = self.sedes.copy()
+        np.maximum.at(maximo, rotulos, self.celulas)
+
+        media = np.where(contagem > 0, soma / np.maximum(contagem, 1), self.sedes)
+        return pd.DataFrame(
+            {
+                "Município": MUNICIPIOS,
+                "Media_mm": media.round(2),
+                "Max_mm": maximo.round(2),
+            }
+        )
+
+
+def interpolar(pontos: pd.DataFrame, resolucao: float = INTERPOLACAO_RESOLUCAO_GRAUS) -> CampoChuva | None:
+    if pontos is None or pontos.empty:
+        return None
+
+    coordenadas = tuple(zip(pontos["Latitude"].tolist(), pontos["Longitude"].tolist()))
+    pesos = matriz_pesos(coordenadas, resolucao)
+    valores = pesos @ pontos["Prec_mm"].to_numpy(dtype="float64")
+
+    grade = grade_espirito_santo(resolucao)
+    return CampoChuva(
+        grade=grade,
+        celulas=valores[: len(grade.celulas)],
+        sedes=valores[len(grade.celulas):],
+    )
@@ -0,0 +1,124 @@
+"""Leitura de JSON que extrai apenas os campos usados pelos coletores.
+
+Com ``ijson`` (backend em C) o payload é percorrido como fluxo de eventos e só os
+campos pedidos chegam aos buffers de coluna, sem montar a árvore completa de
+dicionários. Sem ele, usa ``orjson`` quando instalado e, por fim, ``json``.
+A escrita também prefere ``orjson``.
+"""
+from __future__ import annotations
+
+import io
+import json
+from typing import Any, Iterable, Iterator
+
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None
+
+try:
+    import ijson
+except ModuleNotFoundError:
+    ijson = None
+
+
+EVENTOS_ESCALARES = {"string", "number", "boolean", "null"}
+
+
+def carregar_json(conteudo: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(conteudo)
+    return json.loads(conteudo)
+
+
+def serializar_json(dados: Any, indentar: bool = False) -> bytes:
+    """Serializa em UTF-8 sem escapar acentos; valores desconhecidos viram texto."""
+    if orjson is not None:
+        opcoes = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indentar:
+            opcoes |= orjson.OPT_INDENT_2
+        return orjson.dumps(dados, option=opcoes, default=str)
+
+    return json.dumps(
+        dados,
+        ensure_ascii=False,
+        indent=2 if indentar else None,
+        default=str,
+    ).encode("utf-8")
+
+
+def streaming_disponivel() -> bool:
+    return ijson is not None and ijson.backend in {"yajl2_c", "yajl2_cffi"}
+
+
+def _casa(prefixo: str, padrao: list[str]) -> bool:
+    partes = prefixo.split(".")
+    return len(partes) == len(padrao) and all(
+        esperado in ("*", parte) for parte, esperado in zip(partes, padrao)
+    )
+
+
+def _navegar(dados: Any, padrao: list[str]) -> Iterator[Any]:
+    if not padrao:
+        yield dados
+        return
+
+    chave, resto = padrao[0], padrao[1:]
+    if chave == "item":
+        filhos = dados if isinstance(dados, list) else []
+    elif chave == "*":
+        filhos = dados.values() if isinstance(dados, dict) else []
+    else:
+        filhos = [dados[chave]] if isinstance(dados, dict) and chave in dados else []
+
+    for filho in filhos:
+        yield from _navegar(filho, resto)
+
+
+def _extrair_em_fluxo(conteudo: bytes, padrao: list[str], campos: tuple[str, ...]) -> dict[str, list]:
+    buffers = {campo: [] for campo in campos}
+    atual = None
+    profundidade = len(padrao)
+
+    for prefixo, evento, valor in ijson.parse(io.BytesIO(conteudo), use_float=True):
+        if evento == "start_map" and _casa(prefixo, padrao):
+            atual = {}
+        elif evento == "end_map" and atual is not None and _casa(prefixo, padrao):
+            for campo in campos:
+                buffers[campo].append(atual.get(campo))
+            atual = None
+        elif atual is not None and evento in EVENTOS_ESCALARES:
+            partes = prefixo.split(".")
+            if len(partes) == profundidade + 1 and partes[-1] in buffers:
+                atual[partes[-1]] = valor
+
+    return buffers
+
+
+def extrair_colunas(
+    conteudo: bytes | str | dict | list,
+    caminho: str,
+    campos: Iterable[str],
+) -> dict[str, list]:
+    """Retorna ``{campo: [valores]}`` para cada objeto em ``caminho``.
+
+    ``caminho`` segue a notação de prefixos do ijson (``items.item``), aceitando
+    ``*`` para chaves variáveis, como os grupos de ``data.prec.*.item`` do SATDES.
+    """
+    campos = tuple(campos)
+    padrao = caminho.split(".")
+
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode("utf-8")
+
+    if isinstance(conteudo, bytes) and streaming_disponivel():
+        return _extrair_em_fluxo(conteudo, padrao, campos)
+
+    dados = carregar_json(conteudo) if isinstance(conteudo, bytes) else conteudo
+    buffers = {campo: [] for campo in campos}
+    for item in _navegar(dados, padrao):
+        if not isinstance(item, dict):
+            continue
+        for campo in campos:
+            buffers[campo].append(item.get(campo))
+    return buffers
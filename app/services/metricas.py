@@ -0,0 +1,48 @@
+"""Instrumentação simples, em memória, das coletas e requisições."""
+from __future__ import annotations
+
+import threading
+from collections import defaultdict, deque
+
+
+class Metricas:
+    """Contadores e amostras de latência agrupados por fonte."""
+
+    def __init__(self, max_amostras: int = 200):
+        self._lock = threading.Lock()
+        self._contadores: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._latencias: dict[str, deque] = defaultdict(lambda: deque(maxlen=max_amostras))
+
+    def incrementar(self, fonte: str, evento: str, quantidade: int = 1) -> None:
+        with self._lock:
+            self._contadores[fonte][evento] += quantidade
+
+    def registrar_latencia(self, fonte: str, segundos: float) -> None:
+        with self._lock:
+            self._latencias[fonte].append(segundos)
+
+    def percentil_latencia(
+        self, fonte: str, percentil: float, minimo_amostras: int = 1
+    ) -> float | None:
+        with self._lock:
+            amostras = sorted(self._latencias.get(fonte, ()))
+
+        if not amostras or len(amostras) < minimo_amostras:
+            return None
+
+        indice = min(len(amostras) - 1, int(round(percentil / 100 * (len(amostras) - 1))))
+        return amostras[indice]
+
+    def contadores(self, fonte: str | None = None) -> dict:
+        with self._lock:
+            if fonte is not None:
+                return dict(self._contadores.get(fonte, {}))
+            return {nome: dict(valores) for nome, valores in self._contadores.items()}
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._contadores.clear()
+            self._latencias.clear()
+
+
+metricas = Metricas()
@@ -0,0 +1,228 @@
+"""Localização de coordenadas nos limites municipais do ES.
+
+Os polígonos vêm de ``MUNICIPIOS_GEOJSON_FILE`` (malha municipal do IBGE ou
+equivalente, com o nome em ``NM_MUN``, ``name``, ``nome`` ou ``municipio``).
+Na carga, cada polígono é registrado nos baldes de uma grade regular que sua
+caixa envolvente toca; uma consulta só testa (ray casting) os polígonos do
+balde do ponto. Resultados por coordenada ficam em cache.
+
+Sem o arquivo, não há geometria: ``localizar`` devolve ``None`` e quem chama
+mantém o município informado pela fonte.
+"""
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.config.settings import MUNICIPIOS_GEOJSON_FILE, MUNICIPIOS_INDICE_PASSO_GRAUS
+from app.services.json_rapido import carregar_json
+from app.services.normalizacao import normalizar_municipio
+
+
+CAMPOS_NOME = ("NM_MUN", "name", "nome", "municipio")
+CASAS_CACHE = 5
+
+
+@dataclass(frozen=True)
+class Poligono:
+    municipio: str
+    aneis: tuple[np.ndarray, ...]
+    """Anel externo seguido dos buracos, cada um ``(n, 2)`` em ``(lon, lat)``."""
+    caixa: tuple[float, float, float, float]
+    """``(lon_min, lat_min, lon_max, lat_max)``."""
+
+
+def _dentro_do_anel(lons: np.ndarray, lats: np.ndarray, anel: np.ndarray) -> np.ndarray:
+    x1, y1 = anel[:, 0], anel[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+
+    cruza = (y1[None, :] > lats[:, None]) != (y2[None, :] > lats[:, None])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_corte = x1 + (lats[:, None] - y1) * (x2 - x1) / (y2 - y1)
+    return np.count_nonzero(cruza & (lons[:, None] < x_corte), axis=1) % 2 == 1
+
+
+def dentro_do_poligono(lons: np.ndarray, lats: np.ndarray, poligono: Poligono) -> np.ndarray:
+    dentro = _dentro_do_anel(lons, lats, poligono.aneis[0])
+    for buraco in poligono.aneis[1:]:
+        dentro &= ~_dentro_do_anel(lons, lats, buraco)
+    return dentro
+
+
+def _nome(propriedades: dict) -> str:
+    for campo in CAMPOS_NOME:
+        if propriedades.get(campo):
+            return normalizar_municipio(propriedades[campo])
+    return ""
+
+
+def ler_poligonos(payload: dict) -> list[Poligono]:
+    poligonos = []
+
+    for feicao in payload.get("features", []):
+        municipio = _nome(feicao.get("properties") or {})
+        geometria = feicao.get("geometry") or {}
+        if not municipio:
+            continue
+
+        if geometria.get("type") == "Polygon":
+            partes = [geometria["coordinates"]]
+        elif geometria.get("type") == "MultiPolygon":
+            partes = geometria["coordinates"]
+        else:
+            continue
+
+        for parte in partes:
+            aneis = tuple(np.asarray(anel, dtype="float64")[:, :2] for anel in parte)
+            externo = aneis[0]
+            caixa = (*externo.min(axis=0), *externo.max(axis=0))
+            poligonos.append(Poligono(municipio, aneis, tuple(float(v) for v in caixa)))
+
+    return poligonos
+
+
+class IndiceMunicipios:
+    def __init__(
+        self,
+        poligonos: list[Poligono],
+        passo: float = MUNICIPIOS_INDICE_PASSO_GRAUS,
+        geojson: dict | None = None,
+    ):
+        self.poligonos = poligonos
+        self.passo = passo
+        self.geojson = geojson
+        self._baldes: dict[tuple[int, int], list[int]] = defaultdict(list)
+        self._cache: dict[tuple[float, float], str | None] = {}
+        self._lock = threading.Lock()
+
+        for posicao, poligono in enumerate(poligonos):
+            lon_min, lat_min, lon_max, lat_max = poligono.caixa
+            for i in range(self._balde(lon_min), self._balde(lon_max) + 1):
+                for j in range(self._balde(lat_min), self._balde(lat_max) + 1):
+                    self._baldes[(i, j)].append(posicao)
+
+    @classmethod
+    def do_arquivo(cls, caminho: Path = MUNICIPIOS_GEOJSON_FILE) -> "IndiceMunicipios":
+        try:
+            payload = carregar_json(Path(caminho).read_bytes())
+            return cls(ler_poligonos(payload), geojson=payload)
+        except (OSError, ValueError, KeyError, IndexError):
+            return cls([])
+
+    @property
+    def tem_geometria(self) -> bool:
+        return bool(self.poligonos)
+
+    @property
+    def municipios(self) -> list[str]:
+        return sorted({poligono.municipio for poligono in self.poligonos})
+
+    def _balde(self, valor: float) -> int:
+        return int(np.floor(valor / self.passo))
+
+    def localizar_muitos(self, latitudes, longitudes) -> np.ndarray:
+        """Município de cada ponto (``""`` fora de todos os polígonos)."""
+        lats = np.asarray(latitudes, dtype="float64")
+        lons = np.asarray(longitudes, dtype="float64")
+        resultado = np.full(len(lats), "", dtype=object)
+        if not self.poligonos or not len(lats):
+            return resultado
+
+        validos = np.isfinite(lats) & np.isfinite(lons)
+        grupos = defaultdict(list)
+        for posicao in np.flatnonzero(validos):
+            grupos[(self._balde(lons[posicao]), self._balde(lats[posicao]))].append(posicao)
+
+        for balde, posicoes in grupos.items():
+            posicoes = np.asarray(posicoes)
+            pendentes = posicoes
+            for indice in self._baldes.get(balde, ()):
+                if not len(pendentes):
+                    break
+                dentro = dentro_do_poligono(lons[pendentes], lats[pendentes], self.poligonos[indice])
+                resultado[pendentes[dentro]] = self.poligonos[indice].municipio
+                pendentes = pendentes[~dentro]
+
+        return resultado
+
+    def localizar(self, latitude: float, longitude: float) -> str | None:
+        chave = (round(float(latitude), CASAS_CACHE), round(float(longitude), CASAS_CACHE))
+        with self._lock:
+            if chave in self._cache:
+                return self._cache[chave]
+
+        municipio = self.localizar_muitos([chave[0]], [chave[1]])[0] or None
+        with self._lock:
+            self._cache[chave] = municipio
+        return municipio
+
+
+_indice: IndiceMunicipios | None = None
+_indice_lock = threading.Lock()
+
+
+def indice_municipios() -> IndiceMunicipios:
+    """Índice do processo, montado na primeira consulta."""
+    global _indice
+    with _indice_lock:
+        if _indice is None:
+            _indice = IndiceMunicipios.do_arquivo()
+        return _indice
+
+
+def geojson_com_valores(valores: dict[str, float], indice: IndiceMunicipios | None = None) -> dict | None:
+    """Malha municipal com ``Municipio`` e ``Prec_mm`` nas propriedades.
+
+    As geometrias são compartilhadas com o índice; só as propriedades são novas.
+    """
+    indice = indice or indice_municipios()
+    if not indice.geojson:
+        return None
+
+    feicoes = []
+    for feicao in indice.geojson.get("features", []):
+        municipio = _nome(feicao.get("properties") or {})
+        feicoes.append(
+            {
+                "type": "Feature",
+                "geometry": feicao.get("geometry"),
+                "properties": {"Municipio": municipio, "Prec_mm": float(valores.get(municipio, 0.0))},
+            }
+        )
+    return {"type": "FeatureCollection", "features": feicoes}
+
+
+def atribuir_municipios(df: pd.DataFrame, indice: IndiceMunicipios | None = None) -> pd.DataFrame:
+    """Substitui ``Município`` pelo polígono que contém a coordenada da estação.
+
+    Linhas sem coordenada ou fora da malha mantêm o município da fonte.
+    """
+    indice = indice or indice_municipios()
+    if df.empty or not indice.tem_geometria:
+        return df
+
+    latitudes = pd.to_numeric(df["Latitude"], errors="coerce")
+    longitudes = pd.to_numeric(df["Longitude"], errors="coerce")
+    com_coordenada = latitudes.notna() & longitudes.notna()
+    if not com_coordenada.any():
+        return df
+
+    encontrados = pd.Series(
+        [
+            indice.localizar(latitude, longitude) or ""
+            for latitude, longitude in zip(latitudes[com_coordenada], longitudes[com_coordenada])
+        ],
+        index=df.index[com_coordenada],
+    )
+    encontrados = encontrados[encontrados != ""]
+    if encontrados.empty:
+        return df
+
+    df = df.copy()
+    df.loc[encontrados.index, "Município"] = encontrados
+    return df
@@ -3,9 +3,11 @@ from __future__ import annotations
 import unicodedata
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from app.config.settings import EXTENDED_COLUMNS
+from app.services.tabelas import tipar_colunas
 
 
 def remover_acentos(valor: str) -> str:
@@ -48,22 +50,31 @@ def to_float(valor: Any, default: float = 0.0) -> float:
         return default
 
 
-def garantir_colunas_estendidas(df: pd.DataFrame) -> pd.DataFrame:
-    resultado = df.copy()
-    for coluna in EXTENDED_COLUMNS:
-        if coluna not in resultado.columns:
-            resultado[coluna] = None
-
-    if "Município" in resultado.columns:
-        resultado["Município"] = resultado["Município"].map(normalizar_municipio)
-
-    if "Instituição" in resultado.columns:
-        resultado["Instituição"] = resultado["Instituição"].map(normalizar_instituicao)
+def normalizar_valores(serie: pd.Series, funcao) -> pd.Series:
+    """Aplica ``funcao`` uma vez por valor distinto (há poucos municípios e fontes)."""
+    codigos, distintos = pd.factorize(serie, use_na_sentinel=False)
+    normalizados = np.array([funcao(valor) for valor in distintos], dtype=object)
+    return pd.Series(normalizados[codigos], index=serie.index, name=serie.name)
 
-    if "Fonte" in resultado.columns:
-        resultado["Fonte"] = resultado["Fonte"].fillna(resultado["Instituição"])
 
-    if "Prec_mm" in resultado.columns:
-        resultado["Prec_mm"] = resultado["Prec_mm"].map(to_float).round(2)
-
-    return resultado[EXTENDED_COLUMNS]
+def garantir_colunas_estendidas(df: pd.DataFrame) -> pd.DataFrame:
+    """Frame com exatamente ``EXTENDED_COLUMNS``, normalizado e nos tipos de ``TIPOS_COLUNAS``.
+
+    Só as colunas alteradas são recriadas; as demais compartilham os buffers do
+    frame de entrada.
+    """
+    colunas = {
+        coluna: df[coluna] if coluna in df.columns else pd.Series(None, index=df.index, dtype=object)
+        for coluna in EXTENDED_COLUMNS
+    }
+
+    colunas["Município"] = normalizar_valores(colunas["Município"], normalizar_municipio)
+    colunas["Instituição"] = normalizar_valores(colunas["Instituição"], normalizar_instituicao)
+    colunas["Fonte"] = colunas["Fonte"].fillna(colunas["Instituição"])
+
+    precipitacao = colunas["Prec_mm"]
+    if not pd.api.types.is_float_dtype(precipitacao):
+        precipitacao = normalizar_valores(precipitacao, to_float).astype("float64")
+    colunas["Prec_mm"] = precipitacao.round(2)
+
+    return pd.DataFrame(tipar_colunas(colunas), copy=False)
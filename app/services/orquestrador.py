@@ -0,0 +1,211 @@
+"""Registro declarativo de fontes e orquestração das coletas por cadência.
+
+Cada fonte é descrita por um ``FonteConfig`` (fábrica do coletor, cadência,
+prioridade, concorrência, timeout e credenciais) e registrada com
+``registrar_fonte``. O ``Orquestrador`` só coleta as fontes cujo prazo venceu;
+as demais devolvem o último resultado. Fontes vencidas são coletadas em
+paralelo e, entre sessões, pelo mesmo ``SingleFlight``.
+
+Com ``cadencia_adaptativa``, o prazo seguinte vem do ``EstimadorCadencia`` da
+fonte, que aprende quando ela publica; ``intervalo_segundos`` vale até haver
+publicações suficientes para estimar o período.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Callable
+
+import pandas as pd
+
+from app.config.settings import (
+    CACHE_TTL_SECONDS,
+    COLETA_RETENTAR_FALHA_SECONDS,
+    EXTENDED_COLUMNS,
+    REQUEST_TIMEOUT_SECONDS,
+    get_env,
+)
+from app.services.cadencia import EstimadorCadencia
+from app.services.fonte_status import FonteStatus
+from app.services.single_flight import coletas
+
+
+@dataclass(frozen=True)
+class FonteConfig:
+    nome: str
+    fabrica: Callable[..., object]
+    """Recebe ``(config, **credenciais)`` e devolve um ``DataCollector``."""
+    intervalo_segundos: int = CACHE_TTL_SECONDS
+    prioridade: int = 100
+    max_workers: int = 1
+    timeout_segundos: float = REQUEST_TIMEOUT_SECONDS
+    credenciais: dict[str, str] = field(default_factory=dict)
+    """Argumento da fábrica -> nome do secret/variável de ambiente."""
+    descricao: str = ""
+    mensagem_sem_credenciais: str = ""
+    cadencia_adaptativa: bool = True
+
+    def criar_coletor(self, **credenciais):
+        coletor = self.fabrica(self, **credenciais)
+        coletor.politica = replace(coletor.politica, timeout_leitura=self.timeout_segundos)
+        return coletor
+
+
+@dataclass
+class ResultadoColeta:
+    fonte: str
+    df: pd.DataFrame
+    status: FonteStatus
+    proxima_coleta: float = 0.0
+    credenciais: tuple = ()
+
+
+_registro: dict[str, FonteConfig] = {}
+_registro_lock = threading.Lock()
+
+
+def registrar_fonte(config: FonteConfig) -> FonteConfig:
+    with _registro_lock:
+        _registro[config.nome] = config
+    return config
+
+
+def fontes_registradas() -> list[FonteConfig]:
+    with _registro_lock:
+        return sorted(_registro.values(), key=lambda config: (config.prioridade, config.nome))
+
+
+def dataframe_vazio() -> pd.DataFrame:
+    return pd.DataFrame(columns=EXTENDED_COLUMNS)
+
+
+class Orquestrador:
+    def __init__(
+        self,
+        fontes: list[FonteConfig] | None = None,
+        obter_credencial: Callable[[str], str | None] = get_env,
+        relogio: Callable[[], float] = time.monotonic,
+        relogio_parede: Callable[[], float] = time.time,
+    ):
+        self._fontes = fontes
+        self.obter_credencial = obter_credencial
+        self.relogio = relogio
+        self.relogio_parede = relogio_parede
+        self._resultados: dict[str, ResultadoColeta] = {}
+        self._cadencias: dict[str, EstimadorCadencia] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def fontes(self) -> list[FonteConfig]:
+        if self._fontes is not None:
+            return sorted(self._fontes, key=lambda config: (config.prioridade, config.nome))
+        return fontes_registradas()
+
+    def cadencia(self, config: FonteConfig) -> EstimadorCadencia:
+        with self._lock:
+            estimador = self._cadencias.get(config.nome)
+            if estimador is None:
+                estimador = EstimadorCadencia(config.nome, config.intervalo_segundos)
+                self._cadencias[config.nome] = estimador
+            return estimador
+
+    def resumo_cadencia(self) -> list[dict]:
+        with self._lock:
+            estimadores = list(self._cadencias.values())
+        return [estimador.resumo() for estimador in estimadores]
+
+    def _credenciais(self, config: FonteConfig) -> dict[str, str] | None:
+        valores = {argumento: self.obter_credencial(nome) for argumento, nome in config.credenciais.items()}
+        if not all(valores.values()):
+            return None
+        return valores
+
+    def _vencida(self, config: FonteConfig, credenciais: dict, agora: float) -> bool:
+        with self._lock:
+            anterior = self._resultados.get(config.nome)
+        return (
+            anterior is None
+            or agora >= anterior.proxima_coleta
+            or anterior.credenciais != tuple(sorted(credenciais.items()))
+        )
+
+    def pendentes(self, agora: float | None = None) -> list[FonteConfig]:
+        """Fontes com credenciais cuja coleta está vencida."""
+        agora = self.relogio() if agora is None else agora
+        pendentes = []
+        for config in self.fontes:
+            credenciais = self._credenciais(config)
+            if credenciais is not None and self._vencida(config, credenciais, agora):
+                pendentes.append(config)
+        return pendentes
+
+    def _executar(self, config: FonteConfig, credenciais: dict) -> ResultadoColeta:
+        chave_credenciais = tuple(sorted(credenciais.items()))
+        try:
+            df = coletas.executar(
+                (config.nome, chave_credenciais),
+                lambda: config.criar_coletor(**credenciais).get_dataframe(),
+            )
+            if df is None or df.empty:
+                df, status = dataframe_vazio(), FonteStatus.sucesso_coleta(config.nome, 0)
+            else:
+                status = FonteStatus.sucesso_coleta(config.nome, len(df))
+            intervalo = config.intervalo_segundos
+            if config.cadencia_adaptativa:
+                estimador = self.cadencia(config)
+                agora = self.relogio_parede()
+                estimador.registrar(df, agora)
+                intervalo = estimador.proximo_intervalo(agora)
+        except Exception as exc:
+            df, status = dataframe_vazio(), FonteStatus.falha_coleta(config.nome, exc)
+            intervalo = min(config.intervalo_segundos, COLETA_RETENTAR_FALHA_SECONDS)
+
+        return ResultadoColeta(
+            fonte=config.nome,
+            df=df,
+            status=status,
+            proxima_coleta=self.relogio() + intervalo,
+            credenciais=chave_credenciais,
+        )
+
+    def coletar(self, agora: float | None = None) -> list[ResultadoColeta]:
+        """Resultado atual de todas as fontes, na ordem de prioridade.
+
+        Credenciais são lidas na thread de quem chama; só a coleta vai para as
+        threads de trabalho.
+        """
+        agora = self.relogio() if agora is None else agora
+        fontes = self.fontes
+        credenciais = {config.nome: self._credenciais(config) for config in fontes}
+        vencidas = [
+            config
+            for config in fontes
+            if credenciais[config.nome] is not None
+            and self._vencida(config, credenciais[config.nome], agora)
+        ]
+
+        if vencidas:
+            with ThreadPoolExecutor(max_workers=len(vencidas), thread_name_prefix="coleta") as executor:
+                novos = list(
+                    executor.map(lambda config: self._executar(config, credenciais[config.nome]), vencidas)
+                )
+            with self._lock:
+                for resultado in novos:
+                    self._resultados[resultado.fonte] = resultado
+
+        resultados = []
+        with self._lock:
+            for config in fontes:
+                if credenciais[config.nome] is None:
+                    resultados.append(
+                        ResultadoColeta(
+                            fonte=config.nome,
+                            df=dataframe_vazio(),
+                            status=FonteStatus.falha_coleta(config.nome, config.mensagem_sem_credenciais),
+                        )
+                    )
+                else:
+                    resultados.append(self._resultados[config.nome])
+        return resultados
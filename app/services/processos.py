@@ -0,0 +1,93 @@
+"""Leitura e agregação de payloads fora do processo do Streamlit.
+
+A decodificação do JSON, a conversão de datas e a agregação em pandas seguram a
+GIL; numa coleta grande do SATDES, os reruns das outras sessões ficam parados.
+Com ``PARSE_PROCESSOS`` > 0, ``executar_parse`` manda a função (de módulo, para
+poder ser serializada) e os bytes brutos para um ``ProcessPoolExecutor``. O
+frame volta em Arrow IPC, colunar e sem cópia na leitura, ou em pickle quando o
+``pyarrow`` não está instalado ou não aceita alguma coluna.
+
+Sem ``PARSE_PROCESSOS``, ou se o pool quebrar, a função roda na própria thread.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+import pandas as pd
+
+from app.config.settings import PARSE_PROCESSOS
+from app.services.metricas import metricas
+from app.services.tabelas import ARROW_DISPONIVEL, ipc_stream, ler_ipc_stream
+
+
+FORMATO_ARROW = b"A"
+FORMATO_PICKLE = b"P"
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def serializar_frame(df: pd.DataFrame) -> bytes:
+    if ARROW_DISPONIVEL:
+        try:
+            return FORMATO_ARROW + ipc_stream(df)
+        except (TypeError, ValueError):
+            pass
+    return FORMATO_PICKLE + pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def desserializar_frame(dados: bytes) -> pd.DataFrame:
+    formato, corpo = dados[:1], memoryview(dados)[1:]
+    if formato == FORMATO_ARROW:
+        return ler_ipc_stream(corpo)
+    return pickle.loads(corpo)
+
+
+def _no_processo(funcao: Callable[..., pd.DataFrame], args: tuple) -> bytes:
+    return serializar_frame(funcao(*args))
+
+
+def _contexto():
+    metodos = multiprocessing.get_all_start_methods()
+    # ``fork`` de um processo com threads (o do Streamlit) pode herdar locks presos.
+    return multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+
+
+def executor_processos() -> ProcessPoolExecutor | None:
+    global _executor
+    if PARSE_PROCESSOS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=PARSE_PROCESSOS, mp_context=_contexto())
+        return _executor
+
+
+def _descartar_executor(executor: ProcessPoolExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def executar_parse(fonte: str, funcao: Callable[..., pd.DataFrame], *args) -> pd.DataFrame:
+    """Roda ``funcao(*args)`` no pool de processos, se houver, senão aqui mesmo."""
+    executor = executor_processos()
+    if executor is None:
+        return funcao(*args)
+
+    try:
+        dados = executor.submit(_no_processo, funcao, args).result()
+    except BrokenProcessPool:
+        _descartar_executor(executor)
+        metricas.incrementar(fonte, "parse_pool_quebrado")
+        return funcao(*args)
+
+    metricas.incrementar(fonte, "parse_em_processo")
+    return desserializar_frame(dados)
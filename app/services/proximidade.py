@@ -0,0 +1,202 @@
+"""Consultas espaciais sobre as estações de todas as fontes.
+
+Com ``scipy`` instalado, as coordenadas viram vetores unitários em 3D e vão para
+um ``cKDTree``, no qual a distância euclidiana (corda) é monótona com a
+distância sobre a esfera. A árvore só é reconstruída quando o conjunto de
+estações muda; leituras novas das mesmas estações reaproveitam a anterior.
+
+Sem ``scipy``, cada consulta calcula a haversine até todas as estações de uma
+vez em NumPy: com alguns milhares de estações isso custa menos de um
+milissegundo. Nos dois casos as distâncias devolvidas são haversine.
+"""
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app.services.catalogo_estacoes import obter_catalogo
+from app.services.interpolacao import preencher_coordenadas
+from app.services.metricas import metricas
+
+try:
+    from scipy.spatial import cKDTree
+except ModuleNotFoundError:
+    cKDTree = None
+
+
+RAIO_TERRA_KM = 6371.0088
+TAMANHO_FOLHA = 16
+FONTE_METRICAS = "PROXIMIDADE"
+COLUNAS_ESTACAO = [
+    "Fonte",
+    "Instituição",
+    "Estação",
+    "Município",
+    "Latitude",
+    "Longitude",
+    "Aproximada",
+    "Prec_mm",
+    "DataHoraReferencia",
+]
+
+
+def vetores_unitarios(latitudes, longitudes) -> np.ndarray:
+    lat = np.radians(np.asarray(latitudes, dtype="float64"))
+    lon = np.radians(np.asarray(longitudes, dtype="float64"))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def haversine_km(lat, lon, latitudes, longitudes) -> np.ndarray:
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2 = np.radians(np.asarray(latitudes, dtype="float64"))
+    lon2 = np.radians(np.asarray(longitudes, dtype="float64"))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def corda_do_raio(raio_km: float) -> float:
+    return 2 * np.sin(min(raio_km / RAIO_TERRA_KM, np.pi) / 2)
+
+
+def _construir_arvore(vetores: np.ndarray):
+    """``cKDTree`` sobre os vetores; ``None`` sem ``scipy`` (busca por força bruta)."""
+    if cKDTree is None or not len(vetores):
+        return None
+    return cKDTree(vetores, leafsize=TAMANHO_FOLHA)
+
+
+class IndiceEstacoes:
+    def __init__(self, estacoes: pd.DataFrame, arvore=None):
+        self.estacoes = estacoes.reset_index(drop=True)
+        self.latitudes = self.estacoes["Latitude"].to_numpy(dtype="float64")
+        self.longitudes = self.estacoes["Longitude"].to_numpy(dtype="float64")
+        self.arvore = arvore if arvore is not None else _construir_arvore(
+            vetores_unitarios(self.latitudes, self.longitudes)
+        )
+
+    def __len__(self) -> int:
+        return len(self.estacoes)
+
+    def _resultado(self, latitude: float, longitude: float, indices) -> pd.DataFrame:
+        resultado = self.estacoes.iloc[list(indices)].copy()
+        resultado.insert(
+            0,
+            "Distancia_km",
+            haversine_km(latitude, longitude, resultado["Latitude"], resultado["Longitude"]).round(3),
+        )
+        return resultado.sort_values("Distancia_km", kind="stable").reset_index(drop=True)
+
+    def proximas(self, latitude: float, longitude: float, k: int = 5) -> pd.DataFrame:
+        k = max(0, min(int(k), len(self)))
+        if not k:
+            return self._resultado(latitude, longitude, [])
+
+        if self.arvore is not None:
+            _, indices = self.arvore.query(vetores_unitarios([latitude], [longitude])[0], k=k)
+        else:
+            distancias = haversine_km(latitude, longitude, self.latitudes, self.longitudes)
+            indices = np.argpartition(distancias, k - 1)[:k]
+        return self._resultado(latitude, longitude, np.atleast_1d(indices))
+
+    def no_raio(self, latitude: float, longitude: float, raio_km: float) -> pd.DataFrame:
+        if not len(self):
+            return self._resultado(latitude, longitude, [])
+
+        if self.arvore is not None:
+            indices = self.arvore.query_ball_point(
+                vetores_unitarios([latitude], [longitude])[0], corda_do_raio(raio_km)
+            )
+        else:
+            distancias = haversine_km(latitude, longitude, self.latitudes, self.longitudes)
+            indices = np.flatnonzero(distancias <= raio_km)
+        return self._resultado(latitude, longitude, indices)
+
+
+def estacoes_das_leituras(leituras: list[pd.DataFrame], base_estacoes: dict[str, dict] | None = None) -> pd.DataFrame:
+    """Uma linha por estação com a leitura mais recente conhecida.
+
+    Estações da base sem leitura no momento entram com ``Prec_mm`` vazio.
+    """
+    validos = [df for df in leituras if df is not None and not df.empty]
+    df = pd.concat(validos, ignore_index=True) if validos else pd.DataFrame(columns=COLUNAS_ESTACAO)
+    for coluna in COLUNAS_ESTACAO:
+        if coluna not in df.columns:
+            df[coluna] = None
+
+    if base_estacoes:
+        presentes = set(df["Estação"].dropna())
+        sem_leitura = [
+            {
+                "Fonte": dados.get("fonte") or "SATDES",
+                "Instituição": dados.get("instituicao"),
+                "Estação": nome,
+                "Município": dados.get("municipio"),
+                "Latitude": dados.get("latitude"),
+                "Longitude": dados.get("longitude"),
+            }
+            for nome, dados in base_estacoes.items()
+            # Sem coordenada própria, a estação cairia na sede do município.
+            if nome not in presentes and dados.get("latitude") is not None and dados.get("longitude") is not None
+        ]
+        if sem_leitura:
+            df = pd.concat([df, pd.DataFrame(sem_leitura)], ignore_index=True)
+
+    df = preencher_coordenadas(df, base_estacoes).dropna(subset=["Latitude", "Longitude"])
+    df["Prec_mm"] = pd.to_numeric(df["Prec_mm"], errors="coerce")
+    chave = df["Estação"].fillna(df["Município"])
+
+    return (
+        df.assign(_chave=chave)
+        .sort_values("Prec_mm", ascending=False, na_position="last")
+        .drop_duplicates(["Fonte", "_chave"])
+        .sort_values(["Fonte", "_chave"], ignore_index=True)[COLUNAS_ESTACAO]
+    )
+
+
+_arvore_atual: tuple[tuple, object] | None = None
+_indice_por_versao: tuple[str, IndiceEstacoes] | None = None
+_lock = threading.Lock()
+
+
+def indice_de_estacoes(estacoes: pd.DataFrame) -> IndiceEstacoes:
+    """Índice para as estações dadas, reaproveitando a árvore se o conjunto não mudou.
+
+    Sem ``scipy`` não há árvore a guardar e o índice sai direto das estações.
+    """
+    global _arvore_atual
+    assinatura = tuple(
+        zip(
+            estacoes["Fonte"].tolist(),
+            estacoes["Estação"].fillna(estacoes["Município"]).tolist(),
+            estacoes["Latitude"].round(6).tolist(),
+            estacoes["Longitude"].round(6).tolist(),
+        )
+    )
+
+    with _lock:
+        if _arvore_atual is not None and _arvore_atual[0] == assinatura:
+            return IndiceEstacoes(estacoes, _arvore_atual[1])
+
+    indice = IndiceEstacoes(estacoes)
+    if indice.arvore is None:
+        return indice
+    metricas.incrementar(FONTE_METRICAS, "arvore_construida")
+    with _lock:
+        _arvore_atual = (assinatura, indice.arvore)
+    return indice
+
+
+def indice_do_estado(estado) -> IndiceEstacoes:
+    """Índice das estações de um ``EstadoPublicado``, montado uma vez por versão."""
+    global _indice_por_versao
+    with _lock:
+        if _indice_por_versao is not None and _indice_por_versao[0] == estado.versao:
+            return _indice_por_versao[1]
+
+    leituras = list(estado.fontes.values()) or [estado.consolidado]
+    indice = indice_de_estacoes(estacoes_das_leituras(leituras, obter_catalogo().por_nome))
+    with _lock:
+        _indice_por_versao = (estado.versao, indice)
+    return indice
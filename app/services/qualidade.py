@@ -0,0 +1,214 @@
+"""Controle de qualidade das leituras antes da consolidação.
+
+Cada leitura recebe colunas booleanas com o resultado das verificações:
+
+- ``QC_Faixa``: acumulado negativo ou acima de ``QC_MAX_24H_MM``;
+- ``QC_Espacial``: acumulado alto (``QC_ESPACIAL_MINIMO_MM``) com todos os
+  vizinhos em ``QC_ESPACIAL_RAIO_KM`` abaixo de ``QC_ESPACIAL_RAZAO`` dele; as
+  estações secas da rede (que os coletores descartam) contam como vizinhos com
+  0.0, senão um pluviômetro isolado cercado de estações secas passaria;
+- ``QC_Taxa``: aumento desde a leitura anterior da estação acima de
+  ``QC_TAXA_MAX_MM_H`` por hora (mínimo de uma hora no denominador);
+- ``QC_Travado``: mesmo acumulado positivo por mais de ``QC_TRAVADO_HORAS``,
+  impossível numa soma móvel de 24h sem chuva idêntica contínua.
+
+Leituras sem ``Estação`` (o CEMADEN publica só o máximo por município, que
+troca de estação de uma coleta para outra) ficam fora das verificações
+temporais: não há uma série da mesma estação para comparar.
+
+``QC_OK`` resume as quatro; ``Joiner`` ignora as leituras reprovadas. Tudo é
+vetorizado: a vizinhança só é recalculada quando o conjunto de coordenadas muda.
+"""
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from app.config.settings import (
+    QC_ESPACIAL_MIN_VIZINHOS,
+    QC_ESPACIAL_MINIMO_MM,
+    QC_ESPACIAL_RAIO_KM,
+    QC_ESPACIAL_RAZAO,
+    QC_MAX_24H_MM,
+    QC_TAXA_MAX_MM_H,
+    QC_TRAVADO_HORAS,
+)
+from app.services.interpolacao import distancias_km, leituras_secas, preencher_coordenadas
+from app.services.metricas import metricas
+
+
+TZ_BRT = ZoneInfo("America/Sao_Paulo")
+FONTE_METRICAS = "QUALIDADE"
+BLOCO_VIZINHANCA = 256
+COLUNAS_QC = ["QC_Faixa", "QC_Espacial", "QC_Taxa", "QC_Travado", "QC_OK"]
+
+
+def aprovadas(df: pd.DataFrame) -> pd.DataFrame:
+    """Leituras que passaram no controle (todas, se ele não rodou)."""
+    if df is None or df.empty or "QC_OK" not in df.columns:
+        return df
+    return df[df["QC_OK"].astype(bool)]
+
+
+@lru_cache(maxsize=4)
+def vizinhanca(
+    coordenadas: tuple[tuple[float, float], ...], raio_km: float = QC_ESPACIAL_RAIO_KM
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pares (ponto, vizinho) no raio, ordenados por ponto.
+
+    As distâncias saem em blocos de ``BLOCO_VIZINHANCA`` linhas, então a memória
+    não cresce com o quadrado do número de estações.
+    """
+    pontos = np.asarray(coordenadas, dtype="float64").reshape(-1, 2)
+    linhas, colunas = [], []
+    for inicio in range(0, len(pontos), BLOCO_VIZINHANCA):
+        proximos = distancias_km(pontos[inicio:inicio + BLOCO_VIZINHANCA], pontos) <= raio_km
+        linha, coluna = np.nonzero(proximos)
+        linha += inicio
+        outro = linha != coluna
+        linhas.append(linha[outro])
+        colunas.append(coluna[outro])
+
+    pares = (
+        np.concatenate(linhas) if linhas else np.empty(0, dtype=np.intp),
+        np.concatenate(colunas) if colunas else np.empty(0, dtype=np.intp),
+    )
+    for array in pares:
+        array.setflags(write=False)
+    return pares
+
+
+def inconsistentes_espacialmente(latitudes, longitudes, valores) -> np.ndarray:
+    """Valores ``NaN`` (já reprovados) não contam como vizinhos."""
+    coordenadas = tuple(zip(np.round(latitudes, 5).tolist(), np.round(longitudes, 5).tolist()))
+    linhas, colunas = vizinhanca(coordenadas)
+    valores = np.asarray(valores, dtype="float64")
+
+    vizinhos = valores[colunas]
+    validos = ~np.isnan(vizinhos)
+    quantidade = np.bincount(linhas[validos], minlength=len(valores))
+    maior_vizinho = np.full(len(valores), -np.inf)
+    np.maximum.at(maior_vizinho, linhas[validos], vizinhos[validos])
+
+    return (
+        (valores >= QC_ESPACIAL_MINIMO_MM)
+        & (quantidade >= QC_ESPACIAL_MIN_VIZINHOS)
+        & (maior_vizinho < valores * QC_ESPACIAL_RAZAO)
+    )
+
+
+class FiltroQualidade:
+    """Mantém o histórico por estação necessário às verificações temporais."""
+
+    def __init__(self):
+        self._posicoes: dict[str, int] = {}
+        self._valor = np.empty(0)
+        self._instante = np.empty(0)
+        self._desde = np.empty(0)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _chaves(df: pd.DataFrame) -> list[str]:
+        fonte = df["Fonte"].fillna(df["Instituição"]).astype(str)
+        return (fonte + "|" + df["Estação"].astype(str)).tolist()
+
+    def _posicoes_das_chaves(self, chaves: list[str]) -> np.ndarray:
+        """Posição de cada chave no histórico, criando as que ainda não existem."""
+        novas = 0
+        posicoes = np.empty(len(chaves), dtype=int)
+        for indice, chave in enumerate(chaves):
+            posicao = self._posicoes.get(chave)
+            if posicao is None:
+                posicao = self._posicoes[chave] = len(self._valor) + novas
+                novas += 1
+            posicoes[indice] = posicao
+
+        if novas:
+            self._valor = np.concatenate([self._valor, np.full(novas, np.nan)])
+            self._instante = np.concatenate([self._instante, np.full(novas, np.nan)])
+            self._desde = np.concatenate([self._desde, np.full(novas, np.nan)])
+        return posicoes
+
+    def aplicar(
+        self,
+        dfs: list[pd.DataFrame],
+        instante: datetime | None = None,
+        rede: list[dict] | None = None,
+    ) -> list[pd.DataFrame]:
+        """Devolve cópias das fontes com as colunas ``QC_*``; as originais não mudam.
+
+        ``rede`` são registros do catálogo: as estações sem leitura entram como
+        vizinhas secas na verificação espacial.
+        """
+        agora = (instante or datetime.now(TZ_BRT)).timestamp()
+        tamanhos = [0 if df is None else len(df) for df in dfs]
+        validos = [df for df in dfs if df is not None and not df.empty]
+        if not validos:
+            return list(dfs)
+
+        todas = preencher_coordenadas(pd.concat(validos, ignore_index=True))
+        valores = pd.to_numeric(todas["Prec_mm"], errors="coerce").fillna(0.0).to_numpy(dtype="float64")
+        latitudes = todas["Latitude"].to_numpy(dtype="float64")
+        longitudes = todas["Longitude"].to_numpy(dtype="float64")
+
+        faixa = (valores < 0) | (valores > QC_MAX_24H_MM)
+
+        com_coordenada = ~(np.isnan(latitudes) | np.isnan(longitudes))
+        secas = leituras_secas(rede or [], set(todas["Estação"].dropna()))
+        quantidade = int(com_coordenada.sum())
+        espacial = np.zeros(len(valores), dtype=bool)
+        espacial[com_coordenada] = inconsistentes_espacialmente(
+            np.concatenate([latitudes[com_coordenada], secas["Latitude"].to_numpy(dtype="float64")]),
+            np.concatenate([longitudes[com_coordenada], secas["Longitude"].to_numpy(dtype="float64")]),
+            np.concatenate([np.where(faixa, np.nan, valores)[com_coordenada], np.zeros(len(secas))]),
+        )[:quantidade]
+
+        taxa = np.zeros(len(valores), dtype=bool)
+        travado = np.zeros(len(valores), dtype=bool)
+        identificadas = todas["Estação"].notna().to_numpy()
+        if identificadas.any():
+            chaves = self._chaves(todas[identificadas])
+            atuais = valores[identificadas]
+            with self._lock:
+                posicoes = self._posicoes_das_chaves(chaves)
+                valor_anterior = self._valor[posicoes]
+                horas = (agora - self._instante[posicoes]) / 3600
+
+                with np.errstate(invalid="ignore"):
+                    taxa[identificadas] = (atuais - valor_anterior) / np.maximum(horas, 1.0) > QC_TAXA_MAX_MM_H
+                    repetido = (valor_anterior == atuais) & (atuais > 0)
+                    desde = np.where(repetido, self._desde[posicoes], agora)
+                    travado[identificadas] = (agora - desde) / 3600 > QC_TRAVADO_HORAS
+
+                self._valor[posicoes] = atuais
+                self._instante[posicoes] = agora
+                self._desde[posicoes] = desde
+
+        sinalizadores = pd.DataFrame(
+            {"QC_Faixa": faixa, "QC_Espacial": espacial, "QC_Taxa": taxa, "QC_Travado": travado}
+        )
+        sinalizadores["QC_OK"] = ~(faixa | espacial | taxa | travado)
+
+        for coluna in COLUNAS_QC[:-1]:
+            quantidade = int(sinalizadores[coluna].sum())
+            if quantidade:
+                metricas.incrementar(FONTE_METRICAS, coluna.removeprefix("QC_").lower(), quantidade)
+
+        resultado = []
+        inicio = 0
+        for df, tamanho in zip(dfs, tamanhos):
+            if not tamanho:
+                resultado.append(df)
+                continue
+            trecho = sinalizadores.iloc[inicio:inicio + tamanho].set_axis(df.index)
+            com_qc = pd.concat([df, trecho], axis=1)
+            com_qc.attrs = dict(df.attrs)
+            resultado.append(com_qc)
+            inicio += tamanho
+
+        return resultado
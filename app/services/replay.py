@@ -0,0 +1,103 @@
+"""Reconstrução do estado consolidado em instantes passados a partir dos snapshots."""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from app.config.settings import REPLAY_MAX_QUADROS, SNAPSHOT_DIR
+from app.services.json_rapido import carregar_json
+from app.services.normalizacao import garantir_colunas_estendidas
+from app.services.retencao import carregar_indice
+
+
+@dataclass(frozen=True)
+class Quadro:
+    gerado_em: datetime
+    resolucao: str
+    df: pd.DataFrame
+
+
+def _decodificar(caminho: Path, entrada: dict) -> Quadro:
+    payload = carregar_json(caminho.read_bytes())
+    df = pd.DataFrame(payload.get("registros", []))
+    if not df.empty:
+        df = garantir_colunas_estendidas(df)
+    return Quadro(
+        gerado_em=datetime.fromisoformat(entrada["gerado_em"]),
+        resolucao=entrada["resolucao"],
+        df=df,
+    )
+
+
+class AnelQuadros:
+    """Quadros já decodificados, limitados a ``capacidade`` e descartados do mais antigo.
+
+    O intervalo escolhido na interface é pré-carregado de uma vez; depois disso,
+    navegar pelos instantes só consulta memória.
+    """
+
+    def __init__(self, capacidade: int = REPLAY_MAX_QUADROS, diretorio: Path = SNAPSHOT_DIR):
+        self.capacidade = capacidade
+        self.diretorio = Path(diretorio)
+        self._quadros: OrderedDict[str, Quadro] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._quadros)
+
+    def instantes(self, inicio: datetime, fim: datetime) -> list[dict]:
+        """Entradas do índice no intervalo, reduzidas uniformemente à capacidade do anel."""
+        entradas = [
+            entrada
+            for entrada in carregar_indice(self.diretorio)
+            if inicio <= datetime.fromisoformat(entrada["gerado_em"]) <= fim
+        ]
+        if len(entradas) <= self.capacidade:
+            return entradas
+
+        passo = len(entradas) / self.capacidade
+        return [entradas[int(indice * passo)] for indice in range(self.capacidade)]
+
+    def _guardar(self, arquivo: str, quadro: Quadro) -> None:
+        with self._lock:
+            self._quadros[arquivo] = quadro
+            self._quadros.move_to_end(arquivo)
+            while len(self._quadros) > self.capacidade:
+                self._quadros.popitem(last=False)
+
+    def pre_carregar(self, entradas: list[dict], max_workers: int = 4) -> int:
+        """Decodifica em paralelo as entradas que ainda não estão no anel."""
+        with self._lock:
+            pendentes = [entrada for entrada in entradas if entrada["arquivo"] not in self._quadros]
+
+        def carregar(entrada: dict):
+            try:
+                return entrada["arquivo"], _decodificar(self.diretorio / entrada["arquivo"], entrada)
+            except (OSError, ValueError):
+                return entrada["arquivo"], None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for arquivo, quadro in executor.map(carregar, pendentes):
+                if quadro is not None:
+                    self._guardar(arquivo, quadro)
+
+        return len(pendentes)
+
+    def quadro(self, entrada: dict) -> Quadro | None:
+        with self._lock:
+            quadro = self._quadros.get(entrada["arquivo"])
+        if quadro is not None:
+            return quadro
+
+        try:
+            quadro = _decodificar(self.diretorio / entrada["arquivo"], entrada)
+        except (OSError, ValueError):
+            return None
+        self._guardar(entrada["arquivo"], quadro)
+        return quadro
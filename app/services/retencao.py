@@ -0,0 +1,300 @@
+"""Retenção, compactação e índice dos snapshots de acumulados.
+
+Snapshots recentes ficam na resolução original. Depois de
+``SNAPSHOT_RETENCAO_COMPLETA_HORAS`` eles são agregados por hora e, depois de
+``SNAPSHOT_RETENCAO_HORARIA_DIAS``, por dia. Cada agregado guarda, por município,
+o maior acumulado do período e a fonte/estação que o registrou. O arquivo
+``indice.json`` lista todos os arquivos com data e resolução, para que consultas
+históricas não precisem listar o diretório nem abrir cada snapshot.
+
+Só quem grava snapshots (``registrar_no_indice``) e a compactação regravam o
+índice, sempre sob ``indice.lock`` (``fcntl.flock``): processos diferentes não
+perdem as entradas um do outro. Leitores nunca gravam; sem índice, recebem as
+entradas de uma varredura do diretório.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from app.config.settings import (
+    SNAPSHOT_COMPACTACAO_INTERVALO_SECONDS,
+    SNAPSHOT_DIR,
+    SNAPSHOT_RETENCAO_COMPLETA_HORAS,
+    SNAPSHOT_RETENCAO_DIARIA_DIAS,
+    SNAPSHOT_RETENCAO_HORARIA_DIAS,
+)
+from app.services.arquivos import gravar_atomico
+from app.services.json_rapido import carregar_json, serializar_json
+
+try:
+    import fcntl
+except ModuleNotFoundError:
+    fcntl = None
+
+
+TZ_BRT = ZoneInfo("America/Sao_Paulo")
+
+RESOLUCAO_COMPLETA = "completa"
+RESOLUCAO_HORARIA = "horaria"
+RESOLUCAO_DIARIA = "diaria"
+
+NOME_INDICE = "indice.json"
+NOME_TRAVA = "indice.lock"
+PREFIXO = "acumulados_"
+
+_indice_lock = threading.RLock()
+_ultima_compactacao = 0.0
+
+
+def _caminho_indice(diretorio: Path) -> Path:
+    return diretorio / NOME_INDICE
+
+
+def _relativo(caminho: Path, diretorio: Path) -> str:
+    return caminho.relative_to(diretorio).as_posix()
+
+
+def _ler_snapshot(caminho: Path) -> dict:
+    return carregar_json(caminho.read_bytes())
+
+
+@contextmanager
+def _travar_indice(diretorio: Path):
+    """Exclusão entre threads e, com ``fcntl``, entre processos, para regravar o índice."""
+    with _indice_lock:
+        if fcntl is None:
+            yield
+            return
+        diretorio.mkdir(parents=True, exist_ok=True)
+        descritor = os.open(diretorio / NOME_TRAVA, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(descritor, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(descritor)
+
+
+def carregar_indice(diretorio: Path = SNAPSHOT_DIR) -> list[dict]:
+    """Entradas do índice ordenadas por data; sem índice, varre o diretório sem gravar."""
+    try:
+        entradas = carregar_json(_caminho_indice(diretorio).read_bytes()).get("entradas", [])
+    except (OSError, ValueError):
+        entradas = varrer_snapshots(diretorio)
+    return sorted(entradas, key=lambda entrada: entrada["gerado_em"])
+
+
+def _gravar_indice(entradas: list[dict], diretorio: Path) -> None:
+    diretorio.mkdir(parents=True, exist_ok=True)
+    entradas = sorted(entradas, key=lambda entrada: entrada["gerado_em"])
+    gravar_atomico(_caminho_indice(diretorio), serializar_json({"entradas": entradas}))
+
+
+def _entrada(caminho: Path, diretorio: Path, gerado_em: datetime, resolucao: str, registros: int) -> dict:
+    return {
+        "arquivo": _relativo(caminho, diretorio),
+        "gerado_em": gerado_em.isoformat(),
+        "resolucao": resolucao,
+        "registros": registros,
+    }
+
+
+def registrar_no_indice(
+    caminho: Path,
+    gerado_em: datetime,
+    registros: int,
+    resolucao: str = RESOLUCAO_COMPLETA,
+    diretorio: Path = SNAPSHOT_DIR,
+) -> None:
+    with _travar_indice(diretorio):
+        entradas = carregar_indice(diretorio)
+        arquivo = _relativo(caminho, diretorio)
+        entradas = [entrada for entrada in entradas if entrada["arquivo"] != arquivo]
+        entradas.append(_entrada(caminho, diretorio, gerado_em, resolucao, registros))
+        _gravar_indice(entradas, diretorio)
+
+
+def varrer_snapshots(diretorio: Path = SNAPSHOT_DIR) -> list[dict]:
+    """Entradas de todos os snapshots do diretório, lendo cada arquivo uma vez."""
+    entradas = []
+    pastas = {
+        RESOLUCAO_COMPLETA: diretorio,
+        RESOLUCAO_HORARIA: diretorio / RESOLUCAO_HORARIA,
+        RESOLUCAO_DIARIA: diretorio / RESOLUCAO_DIARIA,
+    }
+
+    for resolucao, pasta in pastas.items():
+        for caminho in sorted(pasta.glob(f"{PREFIXO}*.json")):
+            if caminho.name == "acumulados_latest.json":
+                continue
+            try:
+                payload = _ler_snapshot(caminho)
+                gerado_em = datetime.fromisoformat(payload["gerado_em"])
+            except (OSError, ValueError, KeyError):
+                continue
+            entradas.append(
+                _entrada(caminho, diretorio, gerado_em, resolucao, len(payload.get("registros", [])))
+            )
+
+    return sorted(entradas, key=lambda entrada: entrada["gerado_em"])
+
+
+def reconstruir_indice(diretorio: Path = SNAPSHOT_DIR) -> list[dict]:
+    """Varre o diretório e regrava o índice."""
+    with _travar_indice(diretorio):
+        entradas = varrer_snapshots(diretorio)
+        _gravar_indice(entradas, diretorio)
+    return entradas
+
+
+def agregar_registros(payloads: list[dict]) -> list[dict]:
+    """Maior acumulado por município entre vários snapshots, com a fonte do máximo."""
+    frames = []
+    for payload in payloads:
+        df = pd.DataFrame(payload.get("registros", []))
+        if df.empty or "Município" not in df.columns:
+            continue
+        if "gerado_em" not in df.columns:
+            df["gerado_em"] = payload.get("gerado_em")
+        frames.append(df)
+
+    if not frames:
+        return []
+
+    df = pd.concat(frames, ignore_index=True)
+    df["Prec_mm"] = pd.to_numeric(df["Prec_mm"], errors="coerce")
+    df = (
+        df.dropna(subset=["Prec_mm"])
+        .sort_values("Prec_mm", ascending=False)
+        .drop_duplicates("Município")
+        .reset_index(drop=True)
+    )
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def _compactar_grupo(
+    entradas: list[dict],
+    diretorio: Path,
+    resolucao: str,
+    chave_periodo,
+    nome_periodo,
+) -> tuple[list[dict], list[dict]]:
+    """Agrega ``entradas`` por período e devolve (entradas removidas, entradas novas)."""
+    grupos: dict[datetime, list[dict]] = {}
+    for entrada in entradas:
+        inicio = chave_periodo(datetime.fromisoformat(entrada["gerado_em"]))
+        grupos.setdefault(inicio, []).append(entrada)
+
+    pasta = diretorio / resolucao
+    pasta.mkdir(parents=True, exist_ok=True)
+    removidas, novas = [], []
+
+    for inicio, grupo in sorted(grupos.items()):
+        destino = pasta / f"{PREFIXO}{inicio.strftime(nome_periodo)}.json"
+        payloads = []
+        if destino.exists():
+            payloads.append(_ler_snapshot(destino))
+
+        for entrada in grupo:
+            try:
+                payloads.append(_ler_snapshot(diretorio / entrada["arquivo"]))
+            except (OSError, ValueError):
+                continue
+
+        registros = agregar_registros(payloads)
+        gravar_atomico(
+            destino,
+            serializar_json(
+                {"gerado_em": inicio.isoformat(), "resolucao": resolucao, "registros": registros},
+                indentar=True,
+            ),
+        )
+
+        for entrada in grupo:
+            (diretorio / entrada["arquivo"]).unlink(missing_ok=True)
+        removidas.extend(grupo)
+        novas.append(_entrada(destino, diretorio, inicio, resolucao, len(registros)))
+
+    return removidas, novas
+
+
+def compactar_snapshots(agora: datetime | None = None, diretorio: Path = SNAPSHOT_DIR) -> dict:
+    """Aplica a política de retenção e devolve quantos arquivos foram afetados."""
+    agora = agora or datetime.now(TZ_BRT)
+    limite_completa = agora - timedelta(hours=SNAPSHOT_RETENCAO_COMPLETA_HORAS)
+    limite_horaria = agora - timedelta(days=SNAPSHOT_RETENCAO_HORARIA_DIAS)
+    limite_diaria = agora - timedelta(days=SNAPSHOT_RETENCAO_DIARIA_DIAS)
+
+    with _travar_indice(diretorio):
+        entradas = carregar_indice(diretorio)
+
+        def antigas(resolucao: str, limite: datetime) -> list[dict]:
+            return [
+                entrada
+                for entrada in entradas
+                if entrada["resolucao"] == resolucao
+                and datetime.fromisoformat(entrada["gerado_em"]) < limite
+            ]
+
+        removidas_h, novas_h = _compactar_grupo(
+            antigas(RESOLUCAO_COMPLETA, limite_completa),
+            diretorio,
+            RESOLUCAO_HORARIA,
+            lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+            "%Y%m%d_%H",
+        )
+        entradas = _substituir(entradas, removidas_h, novas_h)
+
+        removidas_d, novas_d = _compactar_grupo(
+            antigas(RESOLUCAO_HORARIA, limite_horaria),
+            diretorio,
+            RESOLUCAO_DIARIA,
+            lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0),
+            "%Y%m%d",
+        )
+        entradas = _substituir(entradas, removidas_d, novas_d)
+
+        expiradas = antigas(RESOLUCAO_DIARIA, limite_diaria)
+        for entrada in expiradas:
+            (diretorio / entrada["arquivo"]).unlink(missing_ok=True)
+        entradas = _substituir(entradas, expiradas, [])
+
+        _gravar_indice(entradas, diretorio)
+
+    return {
+        "completas_compactadas": len(removidas_h),
+        "horarias_compactadas": len(removidas_d),
+        "diarias_removidas": len(expiradas),
+    }
+
+
+def _substituir(entradas: list[dict], removidas: list[dict], novas: list[dict]) -> list[dict]:
+    arquivos_removidos = {entrada["arquivo"] for entrada in removidas}
+    arquivos_novos = {entrada["arquivo"] for entrada in novas}
+    mantidas = [
+        entrada
+        for entrada in entradas
+        if entrada["arquivo"] not in arquivos_removidos | arquivos_novos
+    ]
+    return mantidas + novas
+
+
+def compactar_se_necessario(diretorio: Path = SNAPSHOT_DIR) -> dict | None:
+    """Executa a compactação no máximo uma vez por intervalo configurado."""
+    global _ultima_compactacao
+    agora = time.monotonic()
+    if _ultima_compactacao and agora - _ultima_compactacao < SNAPSHOT_COMPACTACAO_INTERVALO_SECONDS:
+        return None
+
+    _ultima_compactacao = agora
+    try:
+        return compactar_snapshots(diretorio=diretorio)
+    except Exception:
+        return None
@@ -0,0 +1,46 @@
+"""Deduplicação de chamadas concorrentes pela mesma chave (single-flight)."""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+from app.services.metricas import metricas
+
+
+class SingleFlight:
+    """Enquanto uma chamada para ``chave`` está em andamento, outras chamadas com a
+    mesma chave esperam por ela e recebem o mesmo resultado (ou a mesma exceção)."""
+
+    def __init__(self, nome: str = "SINGLE_FLIGHT"):
+        self.nome = nome
+        self._lock = threading.Lock()
+        self._em_voo: dict[Hashable, Future] = {}
+
+    def executar(self, chave: Hashable, funcao: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            future = self._em_voo.get(chave)
+            lider = future is None
+            if lider:
+                future = Future()
+                self._em_voo[chave] = future
+
+        if not lider:
+            metricas.incrementar(self.nome, "chamadas_compartilhadas")
+            return future.result()
+
+        metricas.incrementar(self.nome, "chamadas_executadas")
+        try:
+            resultado = funcao(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(resultado)
+            return resultado
+        finally:
+            with self._lock:
+                self._em_voo.pop(chave, None)
+
+
+coletas = SingleFlight("COLETAS")
@@ -1,19 +1,30 @@
 from __future__ import annotations
 
-import json
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
 import pandas as pd
 
 from app.config.settings import SNAPSHOT_DIR
+from app.services.arquivos import gravar_atomico, vincular_atomico
+from app.services.json_rapido import serializar_json
+from app.services.retencao import compactar_se_necessario, registrar_no_indice
+from app.services.tabelas import ARROW_DISPONIVEL, gravar_ipc, registros
 
 
 TZ_BRT = ZoneInfo("America/Sao_Paulo")
 
+# Um único escritor em segundo plano mantém a ordem dos snapshots.
+_escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshots")
+
 
 def salvar_snapshot_json(df: pd.DataFrame) -> str | None:
-    """Salva snapshot JSON dos acumulados. Falhas não devem interromper o app."""
+    """Salva snapshot JSON dos acumulados. Falhas não devem interromper o app.
+
+    Com ``pyarrow``, o último estado também vai para ``acumulados_latest.arrow``,
+    que leitores abrem por ``memory_map`` sem decodificar JSON.
+    """
     if df is None or df.empty:
         return None
 
@@ -22,21 +33,30 @@ def salvar_snapshot_json(df: pd.DataFrame) -> str | None:
         agora = datetime.now(TZ_BRT)
         payload = {
             "gerado_em": agora.isoformat(),
-            "registros": df.to_dict(orient="records"),
+            "registros": registros(df),
         }
 
         nome_arquivo = f"acumulados_{agora.strftime('%Y%m%d_%H%M%S')}.json"
         caminho = SNAPSHOT_DIR / nome_arquivo
-        caminho.write_text(
-            json.dumps(payload, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
-
-        latest = SNAPSHOT_DIR / "acumulados_latest.json"
-        latest.write_text(
-            json.dumps(payload, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+        gravar_atomico(caminho, serializar_json(payload, indentar=True))
+
+        vincular_atomico(caminho, SNAPSHOT_DIR / "acumulados_latest.json")
+        if ARROW_DISPONIVEL:
+            gravar_ipc(df, SNAPSHOT_DIR / "acumulados_latest.arrow", {"gerado_em": payload["gerado_em"]})
+        registrar_no_indice(caminho, agora, len(payload["registros"]), diretorio=SNAPSHOT_DIR)
         return str(caminho)
     except Exception:
         return None
+
+
+def agendar_snapshot_json(df: pd.DataFrame) -> Future | None:
+    """Agenda o snapshot no escritor em segundo plano, fora do caminho da requisição."""
+    if df is None or df.empty:
+        return None
+    return _escritor.submit(_salvar_e_compactar, df)
+
+
+def _salvar_e_compactar(df: pd.DataFrame) -> str | None:
+    caminho = salvar_snapshot_json(df)
+    compactar_se_necessario(SNAPSHOT_DIR)
+    return caminho
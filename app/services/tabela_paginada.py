@@ -0,0 +1,86 @@
+"""Tabela de acumulados ordenada e filtrável, paginada no servidor.
+
+A ordenação por acumulado, o índice de busca (``app/services/busca.py``) e os
+códigos das fontes são calculados uma vez por versão dos dados. Cada rerun só combina
+máscaras NumPy já prontas e fatia a página pedida; o navegador recebe apenas as
+linhas da página, qualquer que seja o tamanho da rede de estações.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from app.services.busca import IndiceBusca, chave_busca
+
+
+COLUNAS_TABELA = ["Posição", "Município", "Estação", "Prec_mm", "Instituição", "DataHoraReferencia"]
+TAMANHOS_PAGINA = (25, 50, 100, 250)
+CONSULTAS_MEMORIZADAS = 64
+
+
+class TabelaAcumulados:
+    """Linhas ordenadas por acumulado com índice de busca, uma por versão dos dados.
+
+    A mesma instância atende todas as sessões; os resultados dos filtros mais
+    recentes ficam memorizados.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        precipitacao = df["Prec_mm"].to_numpy(dtype="float64", na_value=0.0)
+        ordem = np.argsort(-precipitacao, kind="stable")
+        colunas = [coluna for coluna in COLUNAS_TABELA[1:] if coluna in df.columns]
+        self.linhas = df.iloc[ordem][colunas].reset_index(drop=True)
+
+        codigos, fontes = pd.factorize(self.linhas["Instituição"])
+        self.codigos_fonte = codigos
+        self.fontes = sorted(str(fonte) for fonte in fontes)
+        self._posicao_fonte = {str(fonte): indice for indice, fonte in enumerate(fontes)}
+
+        self.indice = IndiceBusca(
+            *(self.linhas[coluna] for coluna in ("Município", "Estação") if coluna in self.linhas)
+        )
+
+        self._consultas: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.linhas)
+
+    def filtrar(self, fontes: list[str] | None = None, busca: str = "") -> np.ndarray:
+        """Posições (em ordem de acumulado) das linhas que passam nos filtros."""
+        selecionadas = None if fontes is None else tuple(sorted(fontes))
+        termo = chave_busca(busca)
+        consulta = (selecionadas, termo)
+        with self._lock:
+            if consulta in self._consultas:
+                self._consultas.move_to_end(consulta)
+                return self._consultas[consulta]
+
+        mascara = np.ones(len(self.linhas), dtype=bool)
+        if selecionadas is not None:
+            codigos = [self._posicao_fonte[fonte] for fonte in selecionadas if fonte in self._posicao_fonte]
+            mascara &= np.isin(self.codigos_fonte, codigos)
+        if termo:
+            mascara &= self.indice.buscar(termo)
+        posicoes = np.flatnonzero(mascara)
+
+        with self._lock:
+            self._consultas[consulta] = posicoes
+            while len(self._consultas) > CONSULTAS_MEMORIZADAS:
+                self._consultas.popitem(last=False)
+        return posicoes
+
+    def pagina(self, posicoes: np.ndarray, numero: int, tamanho: int) -> pd.DataFrame:
+        """Linhas da página ``numero`` (a partir de 1), com a posição no resultado filtrado."""
+        inicio = max(numero - 1, 0) * tamanho
+        fatia = posicoes[inicio:inicio + tamanho]
+        pagina = self.linhas.take(fatia).reset_index(drop=True)
+        pagina.insert(0, "Posição", np.arange(inicio + 1, inicio + len(fatia) + 1))
+        return pagina
+
+
+def total_paginas(quantidade: int, tamanho: int) -> int:
+    return max(1, -(-quantidade // tamanho))
@@ -0,0 +1,116 @@
+"""Formato colunar dos frames de acumulados e troca em Arrow IPC.
+
+Dentro do pipeline, os frames usam os tipos de ``TIPOS_COLUNAS``: texto em
+``TIPO_TEXTO`` (o ``str`` do pandas 3, guardado em arrays Arrow, com ``NaN`` nos
+ausentes; o mesmo tipo é pedido explicitamente no pandas 2) e números em
+``float64``. Assim,
+a conversão para uma tabela Arrow não passa por objetos Python e a volta
+reaproveita os buffers. Snapshots, API e leitura em processos separados trocam
+esses frames em Arrow IPC; o arquivo é lido por ``memory_map``, sem cópia para o
+heap do processo.
+
+O ``pyarrow`` é opcional: sem ele, ``ARROW_DISPONIVEL`` é falso e quem chama
+segue pelo caminho em JSON ou pickle.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from app.services.arquivos import gravar_atomico
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ModuleNotFoundError:
+    pa = None
+
+
+ARROW_DISPONIVEL = pa is not None
+TIPO_MIDIA_ARROW = "application/vnd.apache.arrow.stream"
+
+COLUNAS_TEXTO = ["Município", "Instituição", "Estação", "DataHoraReferencia", "Fonte"]
+COLUNAS_NUMERICAS = ["Prec_mm", "Latitude", "Longitude", "Altitude"]
+TIPO_TEXTO = pd.StringDtype("pyarrow" if ARROW_DISPONIVEL else "python", na_value=float("nan"))
+TIPOS_COLUNAS = {
+    **{coluna: TIPO_TEXTO for coluna in COLUNAS_TEXTO},
+    **{coluna: "float64" for coluna in COLUNAS_NUMERICAS},
+}
+
+
+def tipar_colunas(colunas: dict[str, pd.Series]) -> dict[str, pd.Series]:
+    """Converte para ``TIPOS_COLUNAS`` só as colunas que ainda não estão no tipo."""
+    tipadas = {}
+    for nome, serie in colunas.items():
+        tipo = TIPOS_COLUNAS.get(nome)
+        if tipo is None or serie.dtype == tipo:
+            tipadas[nome] = serie
+        elif tipo == "float64":
+            tipadas[nome] = pd.to_numeric(serie, errors="coerce").astype("float64")
+        else:
+            tipadas[nome] = serie.astype(tipo)
+    return tipadas
+
+
+def para_tabela(df: pd.DataFrame, metadados: dict | None = None) -> "pa.Table":
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    if metadados:
+        tabela = tabela.replace_schema_metadata(
+            {**(tabela.schema.metadata or {}), b"acumulados": json.dumps(metadados).encode()}
+        )
+    return tabela
+
+
+def para_pandas(tabela: "pa.Table") -> pd.DataFrame:
+    """Frame de uma tabela Arrow com o texto em ``TIPO_TEXTO`` também no pandas 2."""
+    return tabela.to_pandas(types_mapper={pa.string(): TIPO_TEXTO, pa.large_string(): TIPO_TEXTO}.get)
+
+
+def metadados_da_tabela(tabela: "pa.Table") -> dict:
+    bruto = (tabela.schema.metadata or {}).get(b"acumulados")
+    return json.loads(bruto) if bruto else {}
+
+
+def registros(df: pd.DataFrame) -> list[dict]:
+    """Linhas como dicionários, com ``None`` nos valores ausentes (para JSON)."""
+    if ARROW_DISPONIVEL:
+        try:
+            return para_tabela(df).to_pylist()
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def ipc_stream(df: pd.DataFrame, metadados: dict | None = None) -> bytes:
+    """Frame em Arrow IPC (formato stream), para respostas HTTP e entre processos."""
+    tabela = para_tabela(df, metadados)
+    destino = pa.BufferOutputStream()
+    with pa.ipc.new_stream(destino, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    return destino.getvalue().to_pybytes()
+
+
+def ler_ipc_stream(dados: bytes | memoryview) -> pd.DataFrame:
+    return para_pandas(pa.ipc.open_stream(dados).read_all())
+
+
+def ipc_arquivo(df: pd.DataFrame, metadados: dict | None = None) -> bytes:
+    """Frame em Arrow IPC no formato arquivo, que pode ser lido por ``memory_map``."""
+    tabela = para_tabela(df, metadados)
+    destino = pa.BufferOutputStream()
+    with pa.ipc.new_file(destino, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    return destino.getvalue().to_pybytes()
+
+
+def gravar_ipc(df: pd.DataFrame, caminho: Path, metadados: dict | None = None) -> None:
+    gravar_atomico(caminho, ipc_arquivo(df, metadados))
+
+
+def ler_ipc(caminho: Path) -> tuple[pd.DataFrame, dict]:
+    """Frame e metadados de um arquivo IPC, lido por ``memory_map``."""
+    with pa.memory_map(str(caminho), "r") as origem:
+        tabela = pa.ipc.open_file(origem).read_all()
+    return para_pandas(tabela), metadados_da_tabela(tabela)
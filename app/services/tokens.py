@@ -0,0 +1,201 @@
+"""Ciclo de vida de tokens de acesso: renovação antecipada e partilha entre processos.
+
+Cada ``GerenciadorToken`` guarda o token em memória e num arquivo local
+compartilhado pelos processos do app. A renovação acontece em segundo plano um
+pouco antes do vencimento (``antecedencia``), então a coleta não espera pelo
+pedido do token. Quem precisa renovar trava o arquivo com ``fcntl.flock`` e,
+já com a trava, relê o arquivo: se outro processo renovou antes, o token dele é
+aproveitado e só um pedido chega ao servidor.
+
+O arquivo é gravado com permissão 0600 e identifica as credenciais por hash,
+sem gravar a senha.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+from app.services.arquivos import gravar_atomico
+from app.services.metricas import metricas
+from app.services.single_flight import SingleFlight
+
+try:
+    import fcntl
+except ModuleNotFoundError:
+    fcntl = None
+
+
+RETENTAR_RENOVACAO_SECONDS = 30.0
+
+_renovacoes = SingleFlight("TOKENS")
+
+
+def chave_credenciais(*partes: str) -> str:
+    """Identificador estável das credenciais, sem expor nenhuma delas."""
+    return hashlib.sha256("\0".join(partes).encode("utf-8")).hexdigest()[:32]
+
+
+class GerenciadorToken:
+    """Token em memória e em arquivo, renovado antes de vencer.
+
+    ``solicitar`` faz o pedido ao servidor e devolve o token; a validade é
+    ``ttl`` segundos a partir do pedido. Sem ``fcntl`` (Windows) o arquivo
+    continua sendo lido e gravado, mas sem trava entre processos.
+    """
+
+    def __init__(
+        self,
+        fonte: str,
+        chave: str,
+        solicitar: Callable[[], str],
+        caminho: Path,
+        caminho_trava: Path,
+        ttl: float,
+        antecedencia: float,
+        relogio: Callable[[], float] = time.time,
+    ):
+        self.fonte = fonte
+        self.chave = chave
+        self.solicitar = solicitar
+        self.caminho = caminho
+        self.caminho_trava = caminho_trava
+        self.ttl = ttl
+        self.antecedencia = min(antecedencia, ttl / 2)
+        self.relogio = relogio
+
+        self._token: str | None = None
+        self._expira_em = 0.0
+        self._rejeitados: set[str] = set()
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._ultimo_uso = 0.0
+
+    def obter(self) -> str:
+        """Token válido; só bloqueia quando não há nenhum em memória nem no arquivo."""
+        agora = self.relogio()
+        with self._lock:
+            self._ultimo_uso = agora
+            token, expira_em = self._token, self._expira_em
+        if token and agora < expira_em:
+            return token
+        return _renovacoes.executar((self.chave, None), self._renovar, None)
+
+    def renovar(self, rejeitado: str | None = None) -> str:
+        """Troca o token ``rejeitado`` (ou vencido) por um válido.
+
+        Chamadas concorrentes com o mesmo token rejeitado viram um único pedido;
+        se o token em memória já é outro, ele é devolvido sem novo pedido.
+        """
+        if rejeitado:
+            with self._lock:
+                if rejeitado not in self._rejeitados:
+                    self._rejeitados.add(rejeitado)
+                    metricas.incrementar(self.fonte, "token_rejeitado")
+        return _renovacoes.executar((self.chave, rejeitado), self._renovar, rejeitado)
+
+    def _renovar(self, rejeitado: str | None, antecipado: bool = False) -> str:
+        agora = self.relogio()
+        with self._lock:
+            if self._token and self._token != rejeitado and self._valido(self._expira_em, agora, antecipado):
+                return self._token
+
+        with self._trava():
+            token, expira_em = self._ler_arquivo()
+            if token and token not in self._rejeitados and self._valido(expira_em, agora, antecipado):
+                metricas.incrementar(self.fonte, "token_compartilhado")
+            else:
+                token = self.solicitar()
+                expira_em = self.relogio() + self.ttl
+                self._gravar_arquivo(token, expira_em)
+                with self._lock:
+                    self._rejeitados.clear()
+                metricas.incrementar(self.fonte, "token_antecipado" if antecipado else "token_renovado")
+
+        with self._lock:
+            self._token, self._expira_em = token, expira_em
+        self._agendar(expira_em - self.antecedencia)
+        return token
+
+    def _valido(self, expira_em: float, agora: float, antecipado: bool) -> bool:
+        # Na renovação antecipada, um token prestes a vencer já não serve.
+        limite = agora + self.antecedencia if antecipado else agora
+        return limite < expira_em
+
+    def _agendar(self, quando: float) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(max(quando - self.relogio(), 0.0), self._renovar_em_segundo_plano)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _renovar_em_segundo_plano(self) -> None:
+        with self._lock:
+            self._timer = None
+            # Credenciais sem uso há mais de dois ciclos deixam de ser renovadas.
+            if self.relogio() - self._ultimo_uso > 2 * self.ttl:
+                return
+        try:
+            _renovacoes.executar((self.chave, "antecipado"), self._renovar, None, True)
+        except Exception as exc:
+            metricas.incrementar(self.fonte, "token_falha_antecipada")
+            print(f"Falha ao renovar token de {self.fonte}: {exc}")
+            with self._lock:
+                expira_em = self._expira_em
+            if self.relogio() + RETENTAR_RENOVACAO_SECONDS < expira_em:
+                self._agendar(self.relogio() + RETENTAR_RENOVACAO_SECONDS)
+
+    def cancelar(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    @contextmanager
+    def _trava(self):
+        if fcntl is None:
+            yield
+            return
+        self.caminho_trava.parent.mkdir(parents=True, exist_ok=True)
+        descritor = os.open(self.caminho_trava, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(descritor, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(descritor)
+
+    def _ler_tudo(self) -> dict:
+        try:
+            dados = json.loads(self.caminho.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        return dados if isinstance(dados, dict) else {}
+
+    def _ler_arquivo(self) -> tuple[str | None, float]:
+        entrada = self._ler_tudo().get(self.chave) or {}
+        try:
+            return entrada["token"], float(entrada["expira_em"])
+        except (KeyError, TypeError, ValueError):
+            return None, 0.0
+
+    def _gravar_arquivo(self, token: str, expira_em: float) -> None:
+        agora = self.relogio()
+        # Descarta entradas vencidas de outras credenciais ao regravar.
+        dados = {
+            chave: item
+            for chave, item in self._ler_tudo().items()
+            if isinstance(item, dict) and isinstance(item.get("expira_em"), (int, float)) and item["expira_em"] > agora
+        }
+        dados[self.chave] = {"token": token, "expira_em": expira_em}
+        try:
+            self.caminho.parent.mkdir(parents=True, exist_ok=True)
+            gravar_atomico(self.caminho, json.dumps(dados).encode("utf-8"), modo=0o600)
+        except OSError as exc:
+            # Sem o arquivo o token continua valendo para este processo.
+            print(f"Não foi possível gravar o token de {self.fonte}: {exc}")
@@ -0,0 +1,87 @@
+"""Mede a vazão da API somente leitura com clientes concorrentes em keep-alive.
+
+Uso:
+    python -m benchmarks.bench_api --clientes 16 --requisicoes 2000
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import threading
+import time
+
+import pandas as pd
+
+from app.api import iniciar_em_segundo_plano
+from app.municipiosES import COORDENADAS_ESPIRITO_SANTO
+from app.services.estado import publicar_estado
+
+
+ROTAS = [
+    "/acumulados",
+    "/acumulados?municipio=vitoria,serra",
+    "/acumulados?fonte=CEMADEN&formato=csv",
+    "/fontes/CEMADEN",
+    "/status",
+]
+
+
+def publicar_estado_sintetico() -> None:
+    df = pd.DataFrame(
+        [
+            {"Município": municipio, "Prec_mm": float(indice % 40), "Instituição": "CEMADEN"}
+            for indice, municipio in enumerate(COORDENADAS_ESPIRITO_SANTO)
+        ]
+    )
+    df["Fonte"] = df["Instituição"]
+    df.attrs["versao"] = "benchmark"
+    publicar_estado(df, {"CEMADEN": df}, [])
+
+
+def cliente(porta: int, quantidade: int, latencias: list[float], lock: threading.Lock) -> None:
+    conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=10)
+    locais = []
+    for indice in range(quantidade):
+        inicio = time.perf_counter()
+        conexao.request("GET", ROTAS[indice % len(ROTAS)], headers={"Accept-Encoding": "gzip"})
+        resposta = conexao.getresponse()
+        resposta.read()
+        locais.append(time.perf_counter() - inicio)
+    conexao.close()
+    with lock:
+        latencias.extend(locais)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=16)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    args = parser.parse_args()
+
+    publicar_estado_sintetico()
+    servidor = iniciar_em_segundo_plano(0, host="127.0.0.1")
+    porta = servidor.server_address[1]
+
+    latencias: list[float] = []
+    lock = threading.Lock()
+    por_cliente = args.requisicoes // args.clientes
+    threads = [
+        threading.Thread(target=cliente, args=(porta, por_cliente, latencias, lock))
+        for _ in range(args.clientes)
+    ]
+
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    servidor.shutdown()
+    latencias.sort()
+    p95 = latencias[int(len(latencias) * 0.95) - 1] * 1000
+    print(f"{len(latencias)} requisições em {duracao:.2f}s: {len(latencias) / duracao:.0f} req/s, p95 {p95:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
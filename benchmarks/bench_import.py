@@ -0,0 +1,58 @@
+"""Mede o tempo de importação a frio dos módulos de entrada do projeto.
+
+Cada medição roda num interpretador novo, então nenhum cache de módulos do
+processo atual interfere. Também informa quais dependências pesadas cada
+módulo acabou carregando.
+
+Uso:
+    python -m benchmarks.bench_import --repeticoes 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+RAIZ = Path(__file__).resolve().parents[1]
+MODULOS = ["app.dataCollector", "app.api", "app.main"]
+PESADOS = ["streamlit", "folium", "streamlit_folium", "PIL", "requests", "dateutil", "pyarrow"]
+
+SCRIPT = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+print(json.dumps({{"segundos": duracao, "carregados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def medir(modulo: str) -> dict:
+    saida = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(modulo=modulo, pesados=PESADOS)],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("modulos", nargs="*", default=MODULOS)
+    args = parser.parse_args()
+
+    for modulo in args.modulos:
+        medicoes = [medir(modulo) for _ in range(args.repeticoes)]
+        mediana = statistics.median(medicao["segundos"] for medicao in medicoes) * 1000
+        carregados = ", ".join(medicoes[-1]["carregados"]) or "-"
+        print(f"{modulo:<20} {mediana:8.1f} ms  (carrega: {carregados})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Mede pico de memória e tempo de uma atualização completa dos acumulados.
+
+Simula as quatro fontes com frames sintéticos e percorre o mesmo caminho do
+app: normalização das colunas, controle de qualidade, consolidação, snapshot em
+disco, releitura do snapshot (como a API isolada faz) e respostas da API. O
+pico vem do ``tracemalloc``, que conta as alocações do Python, do NumPy e do
+Arrow.
+
+Uso:
+    python -m benchmarks.bench_memoria --escala 20
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app import api
+from app.dataCollector import Joiner
+from app.municipiosES import COORDENADAS_ESPIRITO_SANTO
+from app.services import estado as estado_modulo
+from app.services import qualidade, snapshots
+from app.services.estado import publicar_estado
+from app.services.normalizacao import garantir_colunas_estendidas
+from app.services.qualidade import FiltroQualidade
+
+
+FONTES = {"CEMADEN": 80, "SATDES": 150, "ANA": 60, "INMET": 20}
+
+
+def registros_sinteticos(fonte: str, quantidade: int, gerador: np.random.Generator) -> list[dict]:
+    municipios = list(COORDENADAS_ESPIRITO_SANTO)
+    registros = []
+    for indice in range(quantidade):
+        municipio = municipios[indice % len(municipios)]
+        latitude, longitude = COORDENADAS_ESPIRITO_SANTO[municipio]
+        registros.append(
+            {
+                "Município": municipio,
+                "Prec_mm": round(float(gerador.gamma(1.2, 8.0)), 2),
+                "Instituição": fonte,
+                "Estação": f"{fonte}_{indice:06d}",
+                "Latitude": latitude + gerador.normal(0, 0.05),
+                "Longitude": longitude + gerador.normal(0, 0.05),
+                "Altitude": float(gerador.integers(0, 1200)),
+                "DataHoraReferencia": "2026-06-27T12:00:00-03:00",
+                "Fonte": fonte,
+            }
+        )
+    return registros
+
+
+def atualizar(entradas: dict[str, list[dict]], diretorio: Path) -> None:
+    fontes = {fonte: garantir_colunas_estendidas(pd.DataFrame(registros)) for fonte, registros in entradas.items()}
+    com_qc = FiltroQualidade().aplicar(list(fontes.values()))
+    consolidado = Joiner.join(*com_qc)
+    snapshots.salvar_snapshot_json(consolidado)
+    armazenado = estado_modulo.carregar_estado_armazenado(diretorio)
+    assert armazenado is not None and len(armazenado.consolidado) == len(consolidado)
+
+    estado = publicar_estado(consolidado, dict(zip(fontes, com_qc)), [])
+    api.montar_corpo(estado, "/acumulados", {})
+    api.montar_corpo(estado, "/fontes/SATDES", {})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escala", type=int, default=20, help="multiplica o número de estações de cada fonte")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    gerador = np.random.default_rng(0)
+    entradas = {
+        fonte: registros_sinteticos(fonte, quantidade * args.escala, gerador)
+        for fonte, quantidade in FONTES.items()
+    }
+    print(f"{sum(len(registros) for registros in entradas.values())} leituras por atualização")
+
+    with tempfile.TemporaryDirectory() as temporario:
+        diretorio = Path(temporario)
+        snapshots.SNAPSHOT_DIR = diretorio
+        atualizar(entradas, diretorio)  # aquece imports e caches
+
+        for rotulo, rede_nova in (("mesma rede de estações", False), ("rede de estações nova", True)):
+            picos, tempos = [], []
+            for _ in range(args.repeticoes):
+                estado_modulo._armazenado = None
+                if rede_nova:
+                    qualidade.vizinhanca.cache_clear()
+                tracemalloc.start()
+                inicio = time.perf_counter()
+                atualizar(entradas, diretorio)
+                tempos.append(time.perf_counter() - inicio)
+                picos.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            print(f"{rotulo:<24} pico {min(picos) / 2**20:7.1f} MiB  tempo {min(tempos) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Mede quanto a leitura de um payload SATDES grande trava as outras threads.
+
+Uma thread de "batimento" acorda a cada 5 ms, como os reruns das sessões do
+Streamlit; o maior intervalo entre batimentos mostra quanto tempo ela ficou sem
+a GIL. Compara a leitura na própria thread com a leitura no pool de processos.
+
+Uso:
+    python -m benchmarks.bench_parse_processos --estacoes 300 --leituras 144
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.dataCollector import agregar_satdes
+from app.services import processos
+
+
+def payload_sintetico(estacoes: int, leituras: int, fim: datetime) -> bytes:
+    itens = [
+        {
+            "id_station": estacao,
+            "name": f"EMA_{estacao:04d}",
+            "code": f"CEP_{estacao:04d}_A",
+            "date_utc": (fim - timedelta(minutes=10 * leitura)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "instant": f"{(estacao + leitura) % 5 * 0.2:.1f}",
+        }
+        for estacao in range(estacoes)
+        for leitura in range(leituras)
+    ]
+    return json.dumps({"data": {"prec": {"grupo": itens}}}).encode()
+
+
+def medir(args: tuple, repeticoes: int) -> tuple[float, float]:
+    parar = threading.Event()
+    maior_pausa = [0.0]
+
+    def batimento():
+        anterior = time.perf_counter()
+        while not parar.is_set():
+            time.sleep(0.005)
+            agora = time.perf_counter()
+            maior_pausa[0] = max(maior_pausa[0], agora - anterior - 0.005)
+            anterior = agora
+
+    thread = threading.Thread(target=batimento)
+    thread.start()
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        processos.executar_parse("BENCH", agregar_satdes, *args)
+    duracao = (time.perf_counter() - inicio) / repeticoes
+    parar.set()
+    thread.join()
+    return duracao, maior_pausa[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--estacoes", type=int, default=300)
+    parser.add_argument("--leituras", type=int, default=144)
+    parser.add_argument("--processos", type=int, default=2)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    fim = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    base = {
+        f"EMA_{estacao:04d}": {"instituicao": "CEPDEC", "municipio": "SERRA"}
+        for estacao in range(args.estacoes)
+    }
+    entrada = (payload_sintetico(args.estacoes, args.leituras, fim), fim - timedelta(hours=24), fim, base)
+    print(f"payload: {len(entrada[0]) / 1e6:.1f} MB, {args.estacoes * args.leituras} leituras")
+
+    duracao, pausa = medir(entrada, args.repeticoes)
+    print(f"na thread:  {duracao * 1000:7.1f} ms por leitura, maior pausa das outras threads {pausa * 1000:6.1f} ms")
+
+    processos.PARSE_PROCESSOS = args.processos
+    processos.executar_parse("BENCH", agregar_satdes, *entrada)  # sobe os processos
+    duracao, pausa = medir(entrada, args.repeticoes)
+    print(f"em processo:{duracao * 1000:7.1f} ms por leitura, maior pausa das outras threads {pausa * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Simula sessões concorrentes do dashboard e mede coletas e renderizações.
+
+Compara N sessões disparando a coleta ao mesmo tempo sem deduplicação e com o
+``SingleFlight`` do app, e o custo de calcular os marcadores do mapa em cada
+sessão contra uma vez por versão dos dados.
+
+Uso:
+    python -m benchmarks.bench_sessoes_concorrentes --sessoes 50
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+
+import pandas as pd
+
+from app.main import construir_mapa, marcadores_mapa
+from app.municipiosES import COORDENADAS_ESPIRITO_SANTO
+from app.services.single_flight import SingleFlight
+
+
+def coleta_simulada(latencia: float, contador: list[int], lock: threading.Lock) -> pd.DataFrame:
+    with lock:
+        contador[0] += 1
+    time.sleep(latencia)
+    return pd.DataFrame(
+        [
+            {"Município": municipio, "Prec_mm": float(indice % 40), "Instituição": "CEMADEN"}
+            for indice, municipio in enumerate(COORDENADAS_ESPIRITO_SANTO)
+        ]
+    )
+
+
+def rodar_sessoes(sessoes: int, alvo) -> float:
+    barreira = threading.Barrier(sessoes)
+
+    def sessao():
+        barreira.wait()
+        alvo()
+
+    threads = [threading.Thread(target=sessao) for _ in range(sessoes)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - inicio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessoes", type=int, default=50)
+    parser.add_argument("--latencia", type=float, default=0.5)
+    args = parser.parse_args()
+
+    lock = threading.Lock()
+
+    contador = [0]
+    tempo = rodar_sessoes(args.sessoes, lambda: coleta_simulada(args.latencia, contador, lock))
+    print(f"sem single-flight: {contador[0]} coletas, {tempo:.2f}s")
+
+    contador = [0]
+    voo = SingleFlight("BENCH")
+    tempo = rodar_sessoes(
+        args.sessoes,
+        lambda: voo.executar("CEMADEN", coleta_simulada, args.latencia, contador, lock),
+    )
+    print(f"com single-flight: {contador[0]} coletas, {tempo:.2f}s")
+
+    df = coleta_simulada(0, [0], lock)
+    inicio = time.perf_counter()
+    for _ in range(args.sessoes):
+        construir_mapa(marcadores_mapa(df))
+    por_sessao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    marcadores = marcadores_mapa(df)
+    for _ in range(args.sessoes):
+        construir_mapa(marcadores)
+    por_versao = time.perf_counter() - inicio
+
+    print(f"marcadores calculados por sessão: {por_sessao:.2f}s")
+    print(f"marcadores calculados por versão: {por_versao:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from app.services.alertas import MotorAlertas, RegraAlerta, alertas_abertos
+from app.services.json_rapido import serializar_json
+from app.services.retencao import registrar_no_indice
+
+
+TZ_BRT = ZoneInfo("America/Sao_Paulo")
+
+
+def _df(**valores):
+    return pd.DataFrame(
+        [{"Município": municipio, "Prec_mm": valor, "Instituição": "CEMADEN"} for municipio, valor in valores.items()]
+    )
+
+
+def test_motor_alertas_aplica_histerese(tmp_path):
+    outbox = tmp_path / "outbox.jsonl"
+    motor = MotorAlertas([RegraAlerta("ALERTA", 24, 50.0, 5.0)], {}, outbox=outbox)
+    inicio = datetime(2026, 6, 27, 12, 0, tzinfo=TZ_BRT)
+
+    assert [e["tipo"] for e in motor.avaliar(_df(SERRA=52.0), inicio)] == ["inicio"]
+    assert motor.avaliar(_df(SERRA=47.0), inicio + timedelta(minutes=2)) == []
+    assert [e["tipo"] for e in motor.avaliar(_df(SERRA=44.0), inicio + timedelta(minutes=4))] == ["fim"]
+    assert len(outbox.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_motor_alertas_estima_janela_curta_pela_variacao(tmp_path):
+    motor = MotorAlertas([RegraAlerta("ALERTA", 1, 20.0)], {}, outbox=None)
+    inicio = datetime(2026, 6, 27, 12, 0, tzinfo=TZ_BRT)
+
+    motor.avaliar(_df(SERRA=10.0), inicio)
+    eventos = motor.avaliar(_df(SERRA=35.0), inicio + timedelta(hours=1, minutes=5))
+
+    assert eventos[0]["valor_mm"] == 25.0
+
+
+def test_motor_alertas_avalia_apenas_municipios_alterados(tmp_path):
+    motor = MotorAlertas([RegraAlerta("ATENÇÃO", 24, 10.0)], {"VITÓRIA": [RegraAlerta("ATENÇÃO", 24, 5.0)]}, outbox=None)
+    inicio = datetime(2026, 6, 27, 12, 0, tzinfo=TZ_BRT)
+
+    primeiro = motor.avaliar(_df(SERRA=8.0, **{"VITÓRIA": 6.0}), inicio)
+    segundo = motor.avaliar(_df(SERRA=8.0, **{"VITÓRIA": 6.0}), inicio + timedelta(minutes=2))
+
+    assert [e["municipio"] for e in primeiro] == ["VITÓRIA"]
+    assert segundo == []
+
+
+def test_alertas_abertos_sobrevivem_a_outro_motor(tmp_path):
+    outbox = tmp_path / "outbox.jsonl"
+    regras = [RegraAlerta("ALERTA", 24, 50.0, 5.0)]
+    inicio = datetime(2026, 6, 27, 12, 0, tzinfo=TZ_BRT)
+    MotorAlertas(regras, {}, outbox=outbox).avaliar(_df(SERRA=52.0), inicio)
+
+    # Outro processo (ou um reinício) não reabre o alerta e mantém a histerese.
+    motor = MotorAlertas(regras, {}, outbox=outbox)
+    assert [evento["municipio"] for evento in alertas_abertos(outbox)] == ["SERRA"]
+    assert motor.avaliar(_df(SERRA=53.0), inicio + timedelta(minutes=2)) == []
+    assert motor.avaliar(_df(SERRA=47.0), inicio + timedelta(minutes=4)) == []
+    assert [e["tipo"] for e in motor.avaliar(_df(SERRA=40.0), inicio + timedelta(minutes=6))] == ["fim"]
+    assert alertas_abertos(outbox) == []
+
+
+def test_janela_curta_usa_snapshots_desde_a_primeira_avaliacao(tmp_path):
+    inicio = datetime(2026, 6, 27, 12, 0, tzinfo=TZ_BRT)
+    for minutos, valor in ((-90, 5.0), (-50, 8.0)):
+        gerado_em = inicio + timedelta(minutes=minutos)
+        caminho = tmp_path / f"acumulados_{gerado_em.strftime('%Y%m%d_%H%M%S')}.json"
+        registros = [{"Município": "SERRA", "Prec_mm": valor}]
+        caminho.write_bytes(serializar_json({"gerado_em": gerado_em.isoformat(), "registros": registros}))
+        registrar_no_indice(caminho, gerado_em, 1, diretorio=tmp_path)
+
+    motor = MotorAlertas([RegraAlerta("ALERTA", 1, 20.0)], {}, outbox=None, snapshots=tmp_path)
+    eventos = motor.avaliar(_df(SERRA=30.0), inicio)
+
+    # Há 1 h a Serra tinha 5 mm (snapshot de 90 min atrás, o último antes da janela).
+    assert [(evento["tipo"], evento["valor_mm"]) for evento in eventos] == [("inicio", 25.0)]
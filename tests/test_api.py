@@ -0,0 +1,120 @@
+import gzip
+import json
+import urllib.request
+from urllib.error import HTTPError
+
+import pandas as pd
+import pytest
+
+from app import api
+from app.services import catalogo_estacoes, estado
+from app.services.estado import publicar_estado
+from app.services.fonte_status import FonteStatus
+
+
+@pytest.fixture(autouse=True)
+def catalogo_temporario(tmp_path, monkeypatch):
+    """O catálogo montado nos testes vai para ``tmp_path``, não para ``data/estado``."""
+    monkeypatch.setattr(catalogo_estacoes, "CATALOGO_ESTACOES_FILE", tmp_path / "catalogo_estacoes.json")
+
+
+@pytest.fixture
+def servidor(monkeypatch):
+    # O estado publicado é global do processo; o monkeypatch devolve o anterior no fim.
+    monkeypatch.setattr(estado, "_estado", estado.obter_estado())
+    consolidado = pd.DataFrame(
+        [
+            {"Município": "VITÓRIA", "Prec_mm": 18.0, "Instituição": "INMET", "Fonte": "INMET"},
+            {"Município": "SERRA", "Prec_mm": 12.0, "Instituição": "CEMADEN", "Fonte": "CEMADEN"},
+        ]
+    )
+    consolidado.attrs["versao"] = "teste-api"
+    publicar_estado(consolidado, {"CEMADEN": consolidado.iloc[[1]]}, [FonteStatus.sucesso_coleta("CEMADEN", 1)])
+
+    servidor = api.iniciar_em_segundo_plano(0, host="127.0.0.1")
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _get(url, **headers):
+    return urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=5)
+
+
+def test_api_filtra_municipio_sem_acento(servidor):
+    resposta = _get(f"{servidor}/acumulados?municipio=vitoria&formato=csv")
+
+    corpo = resposta.read().decode("utf-8")
+    assert "VITÓRIA" in corpo
+    assert "SERRA" not in corpo
+    assert resposta.headers["Content-Type"].startswith("text/csv")
+
+
+def test_api_responde_304_para_etag_conhecida(servidor):
+    primeira = _get(f"{servidor}/fontes/cemaden")
+    etag = primeira.headers["ETag"]
+
+    with pytest.raises(HTTPError) as erro:
+        _get(f"{servidor}/fontes/cemaden", **{"If-None-Match": etag})
+
+    assert erro.value.code == 304
+
+
+def test_api_comprime_com_gzip_quando_aceito(servidor, monkeypatch):
+    monkeypatch.setattr(api, "API_GZIP_MIN_BYTES", 0)
+
+    resposta = _get(f"{servidor}/status", **{"Accept-Encoding": "gzip"})
+
+    assert resposta.headers["Content-Encoding"] == "gzip"
+    assert b"CEMADEN" in gzip.decompress(resposta.read())
+
+    identidade = _get(f"{servidor}/status")
+    assert resposta.headers["Vary"] == identidade.headers["Vary"] == "Accept-Encoding"
+    assert resposta.headers["ETag"] == identidade.headers["ETag"][:-1] + '-gz"'
+    # A ETag da versão comprimida não valida a resposta sem compressão.
+    assert _get(f"{servidor}/status", **{"If-None-Match": resposta.headers["ETag"]}).status == 200
+
+
+def test_api_estacoes_proximas_valida_parametros(servidor):
+    with pytest.raises(HTTPError) as erro:
+        _get(f"{servidor}/estacoes/proximas?lat=abc&lon=-40.3")
+    assert erro.value.code == 400
+
+    corpo = _get(f"{servidor}/estacoes/proximas?lat=-20.12&lon=-40.3&k=3").read()
+    distancias = [registro["Distancia_km"] for registro in json.loads(corpo)["registros"]]
+    assert len(distancias) == 3
+    assert distancias == sorted(distancias)
+
+
+def test_api_entrega_arrow_ipc(servidor):
+    pa = pytest.importorskip("pyarrow")
+
+    resposta = _get(f"{servidor}/acumulados?formato=arrow&municipio=serra")
+
+    tabela = pa.ipc.open_stream(resposta.read()).read_all()
+    assert resposta.headers["Content-Type"] == "application/vnd.apache.arrow.stream"
+    assert tabela.column("Município").to_pylist() == ["SERRA"]
+
+
+def test_api_compara_cada_etag_da_lista_exatamente(servidor):
+    etag = _get(f"{servidor}/fontes/cemaden").headers["ETag"]
+
+    for cabecalho in (f'"outra", {etag}', f"W/{etag}", "*"):
+        with pytest.raises(HTTPError) as erro:
+            _get(f"{servidor}/fontes/cemaden", **{"If-None-Match": cabecalho})
+        assert erro.value.code == 304
+
+    assert _get(f"{servidor}/fontes/cemaden", **{"If-None-Match": '"outra", ' + etag[:-3] + '"'}).status == 200
+
+
+def test_api_responde_500_quando_a_montagem_falha(servidor, monkeypatch):
+    def falhar(*args):
+        raise RuntimeError("quebrou")
+
+    monkeypatch.setattr(api, "montar_corpo", falhar)
+
+    with pytest.raises(HTTPError) as erro:
+        _get(f"{servidor}/acumulados?falha=1")
+
+    assert erro.value.code == 500
+    assert json.loads(erro.value.read()) == {"erro": "Erro interno."}
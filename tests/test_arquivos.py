@@ -0,0 +1,30 @@
+import os
+import stat
+
+from app.services.arquivos import MODO_PADRAO, gravar_atomico, vincular_atomico
+
+
+def modo(caminho) -> int:
+    return stat.S_IMODE(os.stat(caminho).st_mode)
+
+
+def test_gravar_atomico_respeita_a_umask_e_aceita_modo_restrito(tmp_path):
+    publico, privado = tmp_path / "publico.json", tmp_path / "privado.json"
+
+    gravar_atomico(publico, b"{}")
+    gravar_atomico(privado, b"{}", modo=0o600)
+
+    assert modo(publico) == MODO_PADRAO
+    assert modo(privado) == 0o600
+    assert [item.name for item in tmp_path.iterdir() if item.name.startswith(".tmp_")] == []
+
+
+def test_vincular_atomico_nao_deixa_temporarios(tmp_path):
+    origem, destino = tmp_path / "snapshot.json", tmp_path / "latest.json"
+    gravar_atomico(origem, b"1")
+
+    vincular_atomico(origem, destino)
+    vincular_atomico(origem, destino)
+
+    assert destino.read_bytes() == b"1"
+    assert sorted(item.name for item in tmp_path.iterdir()) == ["latest.json", "snapshot.json"]
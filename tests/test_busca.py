@@ -0,0 +1,28 @@
+import pandas as pd
+
+from app.services.busca import IndiceBusca
+
+
+def indice_de_teste() -> IndiceBusca:
+    return IndiceBusca(
+        pd.Series(["VITÓRIA", "VILA VELHA", "CARIACICA", "SÃO MATEUS", "VITÓRIA"]),
+        pd.Series(["JARDIM CAMBURI", "ITAPUÃ", "CENTRO", None, "GOIABEIRAS"]),
+    )
+
+
+def test_busca_ignora_acentos_e_caixa():
+    indice = indice_de_teste()
+
+    assert indice.buscar("vitoria").tolist() == [True, False, False, False, True]
+    assert indice.buscar("Sao Mat").tolist() == [False, False, False, True, False]
+    assert indice.buscar("itapua").tolist() == [False, True, False, False, False]
+
+
+def test_busca_curta_por_prefixo_de_palavra_e_longa_por_trecho():
+    indice = indice_de_teste()
+
+    # "VE" é início de "VELHA", mas não aparece no começo de outra palavra.
+    assert indice.buscar("ve").tolist() == [False, True, False, False, False]
+    assert indice.buscar("acic").tolist() == [False, False, True, False, False]
+    assert indice.buscar("camburi").tolist() == [True, False, False, False, False]
+    assert not indice.buscar("xyz").any()
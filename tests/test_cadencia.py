@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from app.services.cadencia import EstimadorCadencia
+from app.services.metricas import metricas
+
+
+PERIODO = 600
+ATRASO = 60
+
+
+def payload(instante: float) -> pd.DataFrame:
+    """Última publicação visível em ``instante`` de uma fonte de 10 em 10 minutos."""
+    publicacao = ((instante - ATRASO) // PERIODO) * PERIODO
+    referencia = datetime.fromtimestamp(publicacao, tz=timezone.utc).isoformat()
+    df = pd.DataFrame([{"Município": "SERRA", "Prec_mm": 1.0, "DataHoraReferencia": referencia}])
+    df.attrs["hash_payload"] = str(publicacao)
+    return df
+
+
+def test_aprende_o_periodo_e_coleta_logo_apos_a_publicacao():
+    metricas.limpar()
+    estimador = EstimadorCadencia("TESTE", intervalo_base=120, margem=20)
+
+    agora, coletas, defasagens = 1_000_000.0, 0, []
+    while agora < 1_000_000 + 6 * 3600:
+        df = payload(agora)
+        if estimador.registrar(df, agora):
+            defasagens.append(agora - float(df.attrs["hash_payload"]))
+        coletas += 1
+        agora += estimador.proximo_intervalo(agora)
+
+    assert estimador.periodo == PERIODO
+    assert abs(estimador.atraso - ATRASO) < 20
+    # Coleta fixa a cada 120s faria 180 coletas em 6h.
+    assert coletas < 180 * 0.5
+    # Coleta fixa a cada 120s veria o dado, em média, 60s depois de disponível.
+    assert max(defasagens[-10:]) < ATRASO + 60
+    contadores = metricas.contadores("TESTE")
+    assert contadores["coletas_evitadas"] > 0
+    assert contadores["coletas_com_novidade"] == len(defasagens)
+
+
+def test_recua_quando_a_fonte_silencia():
+    estimador = EstimadorCadencia("SILENCIO", intervalo_base=120, minimo=30, maximo=1800, margem=20)
+    estimador.registrar(payload(1000 + ATRASO), 1000 + ATRASO)
+    estimador.registrar(payload(1600 + ATRASO), 1600 + ATRASO)
+
+    congelado = payload(1600 + ATRASO)
+    agora = 2400.0
+    esperas = []
+    for _ in range(8):
+        estimador.registrar(congelado, agora)
+        espera = estimador.proximo_intervalo(agora)
+        esperas.append(espera)
+        agora += espera
+
+    assert esperas == sorted(esperas)
+    assert esperas[0] == 30
+    assert esperas[-1] == 1800
+
+
+def test_sem_historico_usa_o_intervalo_base():
+    estimador = EstimadorCadencia("NOVA", intervalo_base=300)
+
+    assert estimador.proximo_intervalo(0.0) == 300
+    estimador.registrar(pd.DataFrame(), 0.0)
+    assert estimador.proximo_intervalo(10.0) == 300
+
+
+def test_janela_movel_nao_conta_cada_consulta_como_publicacao():
+    estimador = EstimadorCadencia("JANELA", intervalo_base=120)
+
+    agora = 1_000_000.0
+    for consulta in range(60):
+        df = payload(agora)
+        # A soma móvel muda o payload a cada consulta, mesmo sem leitura nova.
+        df.attrs["hash_payload"] = str(consulta)
+        estimador.registrar(df, agora)
+        agora += 120
+
+    assert estimador.periodo == PERIODO
+
+
+def test_sem_referencia_o_hash_indica_novidade_sem_inventar_publicacao():
+    estimador = EstimadorCadencia("SEM_REFERENCIA", intervalo_base=300)
+
+    def sem_referencia(assinatura):
+        df = pd.DataFrame([{"Município": "SERRA", "Prec_mm": 1.0}])
+        df.attrs["hash_payload"] = assinatura
+        return df
+
+    assert estimador.registrar(sem_referencia("a"), 0.0)
+    assert not estimador.registrar(sem_referencia("a"), 300.0)
+    assert estimador.registrar(sem_referencia("b"), 600.0)
+    assert estimador.periodo is None
+    assert estimador.proximo_intervalo(600.0) == 300
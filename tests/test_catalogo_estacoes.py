@@ -0,0 +1,79 @@
+import json
+
+from app.config.settings import SOURCE_ANA, SOURCE_INMET, SOURCE_SATDES
+from app.services import catalogo_estacoes
+from app.services.catalogo_estacoes import atualizar_se_vencida, carregar_catalogo
+from app.services.metricas import metricas
+
+
+def gravar_base(caminho, estacoes):
+    caminho.write_text(json.dumps({"data": estacoes}), encoding="utf-8")
+
+
+def estacao(nome, codigo, instituto, municipio, latitude):
+    return {
+        "name": nome,
+        "code": codigo,
+        "name_institute": instituto,
+        "name_county": municipio,
+        "latitude": latitude,
+        "longitude": -40.3,
+        "altitude": 10,
+    }
+
+
+def test_catalogo_indexa_por_fonte_e_codigo_e_completa_com_listas_fixas(tmp_path):
+    base = tmp_path / "stations.json"
+    gravar_base(
+        base,
+        [
+            estacao("57119000", "ANA_005_A", "ANA", "Santa Maria de Jetibá", -20.78),
+            estacao("A612", "INM_012_A", "INMET", "Vitória", -20.27),
+            estacao("EMA_SER_01", "CEP_001_A", "CEPDEC", "Serra", -20.12),
+        ],
+    )
+
+    catalogo = carregar_catalogo(base, tmp_path / "catalogo.json")
+
+    ana = catalogo.obter(SOURCE_ANA, 57119000)
+    assert (ana["latitude"], ana["municipio"], ana["codigo_satdes"]) == (-20.78, "SANTA MARIA DE JETIBÁ", "ANA_005_A")
+    assert catalogo.da_fonte(SOURCE_INMET)["A612"]["latitude"] == -20.27
+    # Estação só da lista fixa: município conhecido, sem coordenada.
+    assert catalogo.obter(SOURCE_ANA, "55323000")["municipio"] == "BOA ESPERANÇA"
+    assert catalogo.obter(SOURCE_ANA, "55323000")["latitude"] is None
+    assert catalogo.obter(SOURCE_SATDES, "CEP_001_A") is catalogo.por_nome["EMA_SER_01"]
+    assert catalogo.por_nome["EMA_SER_01"]["instituicao"] == "CEPDEC"
+
+
+def test_indice_em_disco_e_reaproveitado_ate_a_base_mudar(tmp_path):
+    base, indice = tmp_path / "stations.json", tmp_path / "catalogo.json"
+    gravar_base(base, [estacao("A612", "INM_012_A", "INMET", "Vitória", -20.27)])
+    metricas.limpar()
+
+    primeiro = carregar_catalogo(base, indice)
+    segundo = carregar_catalogo(base, indice)
+    assert metricas.contadores(catalogo_estacoes.FONTE_METRICAS)["catalogo_montado"] == 1
+    assert segundo.versao == primeiro.versao
+    assert segundo.registros == primeiro.registros
+
+    gravar_base(base, [estacao("A612", "INM_012_A", "INMET", "Vitória", -20.5)])
+    terceiro = carregar_catalogo(base, indice)
+    assert terceiro.versao != primeiro.versao
+    assert terceiro.obter(SOURCE_INMET, "A612")["latitude"] == -20.5
+
+
+def test_base_so_e_baixada_uma_vez_por_intervalo(tmp_path, monkeypatch):
+    base = tmp_path / "stations.json"
+    trava = tmp_path / "catalogo.lock"
+    downloads = []
+    monkeypatch.setattr(catalogo_estacoes, "atualizar_base_estacoes", lambda caminho: downloads.append(caminho))
+
+    # Base nova em disco: nada a baixar ainda.
+    gravar_base(base, [])
+    assert atualizar_se_vencida(3600, base, trava) > 3500
+    assert downloads == []
+
+    # Vencida: um processo baixa e grava o horário na trava; o seguinte não repete.
+    assert atualizar_se_vencida(0.5, tmp_path / "ausente.json", trava) == 0.5
+    assert atualizar_se_vencida(3600, tmp_path / "ausente.json", trava) > 3500
+    assert len(downloads) == 1
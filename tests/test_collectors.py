@@ -1,6 +1,29 @@
-from datetime import datetime, timezone
+import json
+from datetime import datetime, timedelta, timezone
 
-from app.dataCollector import InmetCollector, SatdesCollector
+import pandas as pd
+import pytest
+import requests
+
+from app import dataCollector
+from app.config.settings import SOURCE_ANA
+from app.dataCollector import (
+    TZ_BRT,
+    AnaCollector,
+    CemadenCollector,
+    DataCollector,
+    InmetCollector,
+    SatdesCollector,
+    hash_conteudo,
+)
+from app.services import catalogo_estacoes
+from app.services.metricas import metricas
+
+
+@pytest.fixture(autouse=True)
+def catalogo_temporario(tmp_path, monkeypatch):
+    """O catálogo montado nos testes vai para ``tmp_path``, não para ``data/estado``."""
+    monkeypatch.setattr(catalogo_estacoes, "CATALOGO_ESTACOES_FILE", tmp_path / "catalogo_estacoes.json")
 
 
 def test_inmet_extrai_chuva_de_payload_horario():
@@ -44,3 +67,210 @@ def test_satdes_filtra_inmet_e_ana_do_payload():
 
     assert len(resultado) == 1
     assert resultado.loc[0, "Instituição"] == "CEPDEC"
+
+
+def test_get_dataframe_reaproveita_resultado_para_payload_identico():
+    class ColetorFalso(DataCollector):
+        fonte = "TESTE_HASH"
+        processamentos = 0
+
+        def fetch(self):
+            conteudo = b'[{"cidade": "SERRA", "acc24hr": "4.0"}]'
+            self.hash_payload = hash_conteudo(conteudo)
+            return conteudo
+
+        def process(self, data):
+            ColetorFalso.processamentos += 1
+            return self.finalize(pd.DataFrame([{"Município": "SERRA", "Prec_mm": 4.0}]))
+
+    primeiro = ColetorFalso()
+    df_1 = primeiro.get_dataframe()
+    segundo = ColetorFalso()
+    df_2 = segundo.get_dataframe()
+
+    assert ColetorFalso.processamentos == 1
+    assert not primeiro.inalterado
+    assert segundo.inalterado
+    assert df_1.attrs["versao"] == df_2.attrs["versao"]
+
+    df_2["Prec_mm"] = 99.0
+    df_3 = ColetorFalso().get_dataframe()
+    assert df_3["Prec_mm"].tolist() == [4.0]
+
+
+def test_cemaden_usa_last_modified_como_referencia(monkeypatch):
+    class RespostaCemaden:
+        content = b'[{"cidade": "SERRA", "acc24hr": "4.0"}]'
+        headers = {"Last-Modified": "Mon, 19 Oct 2026 12:00:00 GMT"}
+
+        def json(self):
+            return json.loads(self.content)
+
+    monkeypatch.setattr(dataCollector, "requisitar", lambda url, **kwargs: RespostaCemaden())
+    df = CemadenCollector().get_dataframe()
+
+    referencia = datetime.fromisoformat(df["DataHoraReferencia"].iloc[0])
+    assert referencia == datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+    assert referencia.utcoffset() == timedelta(hours=-3)
+
+
+class RespostaAna:
+    def __init__(self, itens):
+        self.content = json.dumps({"items": itens}).encode()
+
+
+def _erro_http(status, mensagem):
+    resposta = requests.Response()
+    resposta.status_code = status
+    return requests.HTTPError(f"{status} {mensagem}", response=resposta)
+
+
+def _servidor_ana(chamadas, aceita_lote, omitir=(), so_primeiro=False, falha_lote=None):
+    medicao = (datetime.now(TZ_BRT) - timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S")
+
+    def requisitar_falso(url, **kwargs):
+        codigos = url.split("Código da Estação=")[1].split("&")[0].split(",")
+        chamadas.append(codigos)
+        if len(codigos) > 1 and falha_lote is not None:
+            raise falha_lote
+        if len(codigos) > 1 and not aceita_lote:
+            raise _erro_http(400, "Código da Estação inválido")
+        if len(codigos) > 1:
+            codigos = codigos[:1] if so_primeiro else [codigo for codigo in codigos if codigo not in omitir]
+        return RespostaAna(
+            [{"codigoestacao": codigo, "Data_Hora_Medicao": medicao, "Chuva_Adotada": "2.5"} for codigo in codigos]
+        )
+
+    return requisitar_falso
+
+
+def test_ana_agrupa_estacoes_em_lotes(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(dataCollector, "requisitar", _servidor_ana(chamadas, aceita_lote=True))
+    monkeypatch.setattr(dataCollector, "obter_token_ana", lambda *args: "token")
+    monkeypatch.setattr(AnaCollector, "_lote_recusado_ate", 0.0)
+    metricas.limpar()
+
+    coletor = AnaCollector("id", "senha", {f"5700000{indice}": "SERRA" for indice in range(5)})
+    coletor.estacoes_por_lote = 2
+    df = coletor.process(coletor.fetch())
+
+    assert sorted(len(codigos) for codigos in chamadas) == [1, 2, 2]
+    assert len(df) == 5 and set(df["Prec_mm"]) == {2.5}
+    assert metricas.contadores(SOURCE_ANA)["requisicoes_economizadas"] == 2
+
+
+def test_ana_volta_para_consulta_por_estacao_quando_lote_e_recusado(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(dataCollector, "requisitar", _servidor_ana(chamadas, aceita_lote=False))
+    monkeypatch.setattr(dataCollector, "obter_token_ana", lambda *args: "token")
+    monkeypatch.setattr(AnaCollector, "_lote_recusado_ate", 0.0)
+
+    coletor = AnaCollector("id", "senha", {f"5700000{indice}": "SERRA" for indice in range(4)})
+    coletor.estacoes_por_lote = 2
+    primeira = coletor.process(coletor.fetch())
+    chamadas.clear()
+    segunda = coletor.process(coletor.fetch())
+
+    assert len(primeira) == len(segunda) == 4
+    assert not AnaCollector.lote_disponivel()
+    assert all(len(codigos) == 1 for codigos in chamadas) and len(chamadas) == 4
+
+
+@pytest.mark.parametrize(
+    "falha", [_erro_http(503, "Service Unavailable"), requests.Timeout("timeout"), requests.ConnectionError("reset")]
+)
+def test_ana_mantem_lote_ligado_apos_falha_transitoria(monkeypatch, falha):
+    chamadas = []
+    monkeypatch.setattr(dataCollector, "requisitar", _servidor_ana(chamadas, aceita_lote=True, falha_lote=falha))
+    monkeypatch.setattr(dataCollector, "obter_token_ana", lambda *args: "token")
+    monkeypatch.setattr(AnaCollector, "_lote_recusado_ate", 0.0)
+
+    coletor = AnaCollector("id", "senha", {f"5700000{indice}": "SERRA" for indice in range(4)})
+    coletor.estacoes_por_lote = 2
+    df = coletor.process(coletor.fetch())
+
+    assert len(df) == 4
+    assert sorted(len(codigos) for codigos in chamadas) == [1, 1, 1, 1, 2, 2]
+    assert AnaCollector.lote_disponivel()
+
+
+def test_ana_consulta_por_estacao_os_codigos_que_o_lote_nao_trouxe(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(dataCollector, "requisitar", _servidor_ana(chamadas, aceita_lote=True, omitir={"57000002"}))
+    monkeypatch.setattr(dataCollector, "obter_token_ana", lambda *args: "token")
+    monkeypatch.setattr(AnaCollector, "_lote_recusado_ate", 0.0)
+
+    coletor = AnaCollector("id", "senha", {f"5700000{indice}": "SERRA" for indice in range(4)})
+    coletor.estacoes_por_lote = 4
+    df = coletor.process(coletor.fetch())
+
+    assert chamadas[1:] == [["57000002"]]
+    assert sorted(df["Estação"]) == [f"5700000{indice}" for indice in range(4)]
+    assert AnaCollector.lote_disponivel()
+
+
+def test_ana_desliga_lote_quando_a_api_so_responde_o_primeiro_codigo(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(dataCollector, "requisitar", _servidor_ana(chamadas, aceita_lote=True, so_primeiro=True))
+    monkeypatch.setattr(dataCollector, "obter_token_ana", lambda *args: "token")
+    monkeypatch.setattr(AnaCollector, "_lote_recusado_ate", 0.0)
+
+    coletor = AnaCollector("id", "senha", {f"5700000{indice}": "SERRA" for indice in range(3)})
+    coletor.estacoes_por_lote = 3
+    df = coletor.process(coletor.fetch())
+
+    assert len(df) == 3
+    assert not AnaCollector.lote_disponivel()
+
+
+def test_ana_renova_token_e_repete_consulta_apos_401(monkeypatch):
+    chamadas = []
+    servidor = _servidor_ana(chamadas, aceita_lote=True)
+
+    def requisitar_falso(url, headers=None, **kwargs):
+        if headers["Authorization"] == "Bearer vencido":
+            raise _erro_http(401, "Unauthorized")
+        return servidor(url)
+
+    renovacoes = []
+    monkeypatch.setattr(dataCollector, "requisitar", requisitar_falso)
+    monkeypatch.setattr(dataCollector, "obter_token_ana", lambda *args: "vencido")
+    monkeypatch.setattr(dataCollector, "renovar_token_ana", lambda *args: renovacoes.append(args[-1]) or "novo")
+    monkeypatch.setattr(AnaCollector, "_lote_recusado_ate", 0.0)
+
+    coletor = AnaCollector("id", "senha", {f"5700000{indice}": "SERRA" for indice in range(3)})
+    coletor.estacoes_por_lote = 3
+    df = coletor.process(coletor.fetch())
+
+    assert len(df) == 3
+    assert renovacoes == ["vencido"]
+    assert AnaCollector.lote_disponivel()
+
+
+def test_ana_consultas_seguintes_usam_o_token_renovado(monkeypatch):
+    chamadas = []
+    servidor = _servidor_ana(chamadas, aceita_lote=True)
+    recusas = []
+    atual = {"token": "vencido"}
+
+    def requisitar_falso(url, headers=None, **kwargs):
+        if headers["Authorization"] == "Bearer vencido":
+            recusas.append(url)
+            raise _erro_http(401, "Unauthorized")
+        return servidor(url)
+
+    def renovar_falso(identificador, senha, rejeitado):
+        atual["token"] = "novo"
+        return "novo"
+
+    monkeypatch.setattr(dataCollector, "requisitar", requisitar_falso)
+    monkeypatch.setattr(dataCollector, "obter_token_ana", lambda *args: atual["token"])
+    monkeypatch.setattr(dataCollector, "renovar_token_ana", renovar_falso)
+
+    coletor = AnaCollector("id", "senha", {f"5700000{indice}": "SERRA" for indice in range(4)}, max_workers=1)
+    coletor.estacoes_por_lote = 1
+    df = coletor.process(coletor.fetch())
+
+    assert len(df) == 4
+    assert len(recusas) == 1
@@ -0,0 +1,115 @@
+import subprocess
+import sys
+import threading
+from dataclasses import replace
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from app.services.estado import EstadoPublicado, publicar_estado
+from app.services.fonte_status import FonteStatus
+from app.services.normalizacao import garantir_colunas_estendidas
+
+pytest.importorskip("pyarrow")
+
+from app.services.estado_compartilhado import (  # noqa: E402
+    LeitorEstadoCompartilhado,
+    agendar_publicacao,
+    gravar_estado_compartilhado,
+    ler_contador,
+    parar_publicacao,
+)
+
+
+def estado_de_teste(prec_serra: float) -> EstadoPublicado:
+    fonte = garantir_colunas_estendidas(
+        pd.DataFrame(
+            [
+                {"Município": "SERRA", "Prec_mm": prec_serra, "Instituição": "CEMADEN", "Latitude": -20.1},
+                {"Município": "VITÓRIA", "Prec_mm": 4.0, "Instituição": "CEMADEN"},
+            ]
+        )
+    )
+    consolidado = fonte.copy()
+    consolidado.attrs["versao"] = f"v{prec_serra}"
+    return publicar_estado(
+        consolidado,
+        {"CEMADEN": fonte},
+        [FonteStatus.sucesso_coleta("CEMADEN", 2), FonteStatus.falha_coleta("ANA", "sem token")],
+    )
+
+
+def test_leitor_so_remapeia_quando_o_contador_muda(tmp_path):
+    caminho = tmp_path / "estado.bin"
+    leitor = LeitorEstadoCompartilhado(caminho)
+    assert leitor.obter() is None
+
+    estado = estado_de_teste(12.0)
+    assert gravar_estado_compartilhado(estado, caminho) == 1
+
+    lido = leitor.obter()
+    assert leitor.obter() is lido
+    assert lido.versao == "v12.0"
+    pd.testing.assert_frame_equal(lido.consolidado, estado.consolidado)
+    pd.testing.assert_frame_equal(lido.fontes["CEMADEN"], estado.fontes["CEMADEN"])
+    assert [(item.fonte, item.sucesso, item.mensagem) for item in lido.status] == [
+        ("CEMADEN", True, "Coleta realizada com sucesso."),
+        ("ANA", False, "sem token"),
+    ]
+
+    gravar_estado_compartilhado(estado_de_teste(30.0), caminho)
+    novo = leitor.obter()
+    assert ler_contador(caminho) == leitor.contador == 2
+    assert novo.consolidado["Prec_mm"].max() == 30.0
+    # Quem ainda segura o estado anterior continua lendo a versão antiga, intacta.
+    assert lido.consolidado["Prec_mm"].max() == 12.0
+
+
+def test_outro_processo_le_o_estado_e_nao_assume_a_coleta(tmp_path):
+    fcntl = pytest.importorskip("fcntl")
+    caminho = tmp_path / "estado.bin"
+    trava = tmp_path / "coletor.lock"
+    gravar_estado_compartilhado(estado_de_teste(12.0), caminho)
+
+    codigo = (
+        "import sys; from pathlib import Path; "
+        "from app.services.estado_compartilhado import LeitorEstadoCompartilhado, assumir_coleta; "
+        "estado = LeitorEstadoCompartilhado(Path(sys.argv[1])).obter(); "
+        "print(assumir_coleta(Path(sys.argv[2])), estado.versao, len(estado.consolidado))"
+    )
+    with open(trava, "w") as arquivo:
+        fcntl.flock(arquivo, fcntl.LOCK_EX)
+        saida = subprocess.run(
+            [sys.executable, "-c", codigo, str(caminho), str(trava)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+    assert saida.stdout.split() == ["False", "v12.0", "2"]
+
+
+def test_publicador_regrava_a_mesma_versao_com_gerado_em_novo(tmp_path):
+    caminho = tmp_path / "estado.bin"
+    estado = estado_de_teste(12.0)
+    rodadas = []
+    tres_rodadas = threading.Event()
+
+    def produzir():
+        rodadas.append(len(rodadas))
+        if len(rodadas) >= 3:
+            tres_rodadas.set()
+        return replace(estado, gerado_em=estado.gerado_em + timedelta(minutes=len(rodadas)))
+
+    thread = agendar_publicacao(produzir, intervalo=0.01, caminho=caminho)
+    try:
+        assert agendar_publicacao(produzir, intervalo=0.01, caminho=caminho) is thread
+        assert tres_rodadas.wait(5)
+    finally:
+        parar_publicacao()
+
+    lido = LeitorEstadoCompartilhado(caminho).obter()
+    assert ler_contador(caminho) == len(rodadas)
+    assert lido.versao == "v12.0"
+    assert lido.gerado_em == estado.gerado_em + timedelta(minutes=len(rodadas))
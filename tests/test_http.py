@@ -0,0 +1,145 @@
+import threading
+import time
+
+import requests
+
+from app.services import http
+from app.services.cache_http import CacheHttp
+from app.services.http import PoliticaRequisicao, requisitar
+from app.services.metricas import metricas
+
+
+class RespostaFalsa:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"status {self.status_code}")
+
+
+def test_requisitar_retenta_status_transitorio(monkeypatch):
+    respostas = iter([RespostaFalsa(503), RespostaFalsa(200)])
+    monkeypatch.setattr(http.requests, "get", lambda *args, **kwargs: next(respostas))
+    monkeypatch.setattr(http.time, "sleep", lambda _: None)
+    metricas.limpar()
+
+    response = requisitar("https://exemplo", fonte="TESTE", politica=PoliticaRequisicao(tentativas=3))
+
+    assert response.status_code == 200
+    assert metricas.contadores("TESTE")["retentativas"] == 1
+
+
+def test_requisitar_usa_timeouts_separados_e_desiste_apos_limite(monkeypatch):
+    chamadas = []
+
+    def get_falso(url, timeout, **kwargs):
+        chamadas.append(timeout)
+        raise requests.ConnectionError("sem rede")
+
+    monkeypatch.setattr(http.requests, "get", get_falso)
+    monkeypatch.setattr(http.time, "sleep", lambda _: None)
+    politica = PoliticaRequisicao(tentativas=2, timeout_conexao=1, timeout_leitura=7)
+
+    try:
+        requisitar("https://exemplo", fonte="TESTE", politica=politica)
+    except requests.ConnectionError:
+        pass
+    else:
+        raise AssertionError("deveria propagar o erro de conexão")
+
+    assert chamadas == [(1, 7), (1, 7)]
+
+
+def test_requisitar_revalida_cache_com_304(monkeypatch, tmp_path):
+    cache = CacheHttp(diretorio=tmp_path)
+    enviados = []
+
+    def get_falso(url, timeout, headers=None, **kwargs):
+        enviados.append(dict(headers or {}))
+        response = requests.Response()
+        response.url = url
+        if "If-None-Match" in (headers or {}):
+            response.status_code = 304
+            response._content = b""
+        else:
+            response.status_code = 200
+            response.headers["ETag"] = '"v1"'
+            response._content = b'{"ok": true}'
+        return response
+
+    monkeypatch.setattr(http.requests, "get", get_falso)
+
+    primeira = requisitar("https://exemplo/dados", fonte="TESTE", cache=cache)
+    segunda = requisitar("https://exemplo/dados", fonte="TESTE", cache=cache)
+
+    assert primeira.json() == {"ok": True}
+    assert segunda.status_code == 200
+    assert segunda.json() == {"ok": True}
+    assert enviados[1]["If-None-Match"] == '"v1"'
+    assert "gzip" in enviados[1]["Accept-Encoding"]
+
+
+def test_cache_http_remove_entradas_antigas_acima_do_limite(tmp_path):
+    cache = CacheHttp(diretorio=tmp_path, limite_bytes=10)
+
+    for indice in range(3):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["ETag"] = f'"{indice}"'
+        response._content = b"123456"
+        cache.salvar(f"https://exemplo/{indice}", response)
+
+    assert cache.tamanho_total() <= 10
+    assert cache.obter("https://exemplo/2") is not None
+
+
+def _chamadas_com_atraso(*roteiro):
+    """``requests.get`` falso: a n-ésima chamada dorme e devolve o status do roteiro."""
+    chamadas = iter(roteiro)
+    lock = threading.Lock()
+
+    def get_falso(url, timeout, **kwargs):
+        with lock:
+            atraso, status = next(chamadas)
+        time.sleep(atraso)
+        return RespostaFalsa(status)
+
+    return get_falso
+
+
+def _historico_rapido(url):
+    metricas.limpar()
+    for _ in range(20):
+        metricas.registrar_latencia(http.chave_latencia("TESTE", url), 0.02)
+
+
+def test_hedge_devolve_a_duplicada_quando_a_principal_demora(monkeypatch):
+    url = "https://exemplo/serie?estacao=1"
+    _historico_rapido(url)
+    monkeypatch.setattr(http.requests, "get", _chamadas_com_atraso((1.0, 200), (0.0, 200)))
+
+    inicio = time.perf_counter()
+    response = requisitar(url, fonte="TESTE", politica=PoliticaRequisicao(tentativas=1, hedge=True))
+
+    assert response.status_code == 200
+    assert time.perf_counter() - inicio < 0.8
+    assert metricas.contadores("TESTE")["hedge_venceu"] == 1
+
+
+def test_hedge_ignora_5xx_da_principal_enquanto_a_duplicada_esta_pendente(monkeypatch):
+    url = "https://exemplo/serie?estacao=2"
+    _historico_rapido(url)
+    monkeypatch.setattr(http.requests, "get", _chamadas_com_atraso((0.1, 503), (0.2, 200)))
+
+    response = requisitar(url, fonte="TESTE", politica=PoliticaRequisicao(tentativas=1, hedge=True))
+
+    assert response.status_code == 200
+    assert metricas.contadores("TESTE")["hedge_venceu"] == 1
+
+
+def test_latencia_e_separada_por_endpoint():
+    assert http.chave_latencia("ANA", "https://ana/serie?codigo=1") == http.chave_latencia(
+        "ANA", "https://ana/serie?codigo=2"
+    )
+    assert http.chave_latencia("ANA", "https://ana/serie") != http.chave_latencia("ANA", "https://ana/token")
@@ -2,3 +2,16 @@ def test_app_importa_sem_executar_streamlit():
     import app.main
 
     assert callable(app.main.run)
+
+
+def test_coletores_e_api_nao_importam_dependencias_de_interface():
+    import subprocess
+    import sys
+
+    codigo = (
+        "import sys, app.dataCollector, app.api; "
+        "print(sorted(m for m in ('streamlit', 'folium', 'PIL') if m in sys.modules))"
+    )
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+
+    assert saida.stdout.strip() == "[]"
@@ -0,0 +1,60 @@
+import pandas as pd
+
+from app.services.interpolacao import MUNICIPIOS, interpolar, matriz_pesos, pontos_observados
+
+
+def test_campo_reproduz_estacao_e_reaproveita_pesos():
+    df = pd.DataFrame(
+        {
+            "Município": ["VITÓRIA", "LINHARES", "ALEGRE"],
+            "Prec_mm": [40.0, 0.0, 5.0],
+            "Latitude": [None, -19.39, -20.76],
+            "Longitude": [None, -40.07, -41.54],
+        }
+    )
+    pontos = pontos_observados([df])
+    matriz_pesos.cache_clear()
+
+    campo = interpolar(pontos)
+    interpolar(pontos.assign(Prec_mm=pontos["Prec_mm"] + 1))
+
+    assert matriz_pesos.cache_info().misses == 1
+    estimativa = campo.por_municipio().set_index("Município")
+    assert campo.sedes[MUNICIPIOS.index("LINHARES")] < 0.5
+    assert len(estimativa) == len(MUNICIPIOS)
+    assert estimativa.loc["VITÓRIA", "Max_mm"] > 39
+    assert (estimativa["Media_mm"] <= estimativa["Max_mm"] + 1e-9).all()
+
+
+def test_estacoes_secas_da_rede_entram_com_zero():
+    rede = [
+        {"estacao": "A", "latitude": -20.30, "longitude": -40.30, "ativa": True},
+        {"estacao": "B", "latitude": -20.32, "longitude": -40.33, "ativa": True},
+        {"estacao": "C", "latitude": -19.39, "longitude": -40.07, "ativa": False},
+        {"estacao": "D", "latitude": None, "longitude": None, "ativa": True},
+    ]
+
+    def leituras(**chuva):
+        return pd.DataFrame(
+            {
+                "Estação": list(chuva),
+                "Município": ["VITÓRIA"] * len(chuva),
+                "Prec_mm": list(chuva.values()),
+                "Latitude": [-20.30 if nome == "A" else -20.32 for nome in chuva],
+                "Longitude": [-40.30 if nome == "A" else -40.33 for nome in chuva],
+            }
+        )
+
+    matriz_pesos.cache_clear()
+    chovendo = pontos_observados([leituras(A=30.0)], rede=rede)
+    assert sorted(chovendo["Prec_mm"]) == [0.0, 30.0]
+
+    so_chuva = interpolar(pontos_observados([leituras(A=30.0)]))
+    com_secas = interpolar(chovendo)
+    vitoria = MUNICIPIOS.index("VITÓRIA")
+    assert com_secas.sedes[vitoria] < so_chuva.sedes[vitoria]
+
+    # Chuva mudando de estação ou parando não muda o conjunto de coordenadas.
+    interpolar(pontos_observados([leituras(B=12.0)], rede=rede))
+    interpolar(pontos_observados([], rede=rede))
+    assert matriz_pesos.cache_info().misses == 2
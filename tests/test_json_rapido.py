@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from app.services import json_rapido
+from app.services.json_rapido import extrair_colunas
+
+
+PAYLOAD = {
+    "data": {
+        "prec": {
+            "grupo_a": [
+                {"name": "EMA_01", "code": "CEP_001_A", "instant": 1.5, "extra": {"name": "x"}},
+            ],
+            "grupo_b": [
+                {"name": "EMA_02", "code": "INC_002_A", "instant": None},
+            ],
+        }
+    }
+}
+
+
+def test_extrair_colunas_percorre_chaves_variaveis(monkeypatch):
+    monkeypatch.setattr(json_rapido, "ijson", None)
+
+    colunas = extrair_colunas(json.dumps(PAYLOAD).encode(), "data.prec.*.item", ["name", "instant"])
+
+    assert colunas == {"name": ["EMA_01", "EMA_02"], "instant": [1.5, None]}
+
+
+def test_extrair_colunas_em_fluxo_igual_ao_carregamento_completo():
+    pytest.importorskip("ijson")
+    if not json_rapido.streaming_disponivel():
+        pytest.skip("ijson sem backend em C")
+
+    conteudo = json.dumps(PAYLOAD).encode()
+    em_fluxo = extrair_colunas(conteudo, "data.prec.*.item", ["name", "code", "instant"])
+    completo = extrair_colunas(PAYLOAD, "data.prec.*.item", ["name", "code", "instant"])
+
+    assert em_fluxo == completo
@@ -0,0 +1,68 @@
+import json
+
+import pandas as pd
+
+from app.config.settings import MUNICIPIOS_GEOJSON_FILE
+from app.municipiosES import COORDENADAS_ESPIRITO_SANTO
+from app.services.municipios_geo import IndiceMunicipios, atribuir_municipios, geojson_com_valores
+
+
+def _quadrado(lon, lat, lado):
+    return [[lon, lat], [lon + lado, lat], [lon + lado, lat + lado], [lon, lat + lado], [lon, lat]]
+
+
+def _indice(tmp_path):
+    malha = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "properties": {"NM_MUN": "Vitória"},
+                "geometry": {"type": "Polygon", "coordinates": [_quadrado(-40.4, -20.4, 0.2), _quadrado(-40.35, -20.35, 0.05)]},
+            },
+            {
+                "properties": {"NM_MUN": "Serra"},
+                "geometry": {
+                    "type": "MultiPolygon",
+                    "coordinates": [[_quadrado(-40.2, -20.4, 0.2)], [_quadrado(-40.35, -20.35, 0.05)]],
+                },
+            },
+        ],
+    }
+    caminho = tmp_path / "municipios.geojson"
+    caminho.write_text(json.dumps(malha), encoding="utf-8")
+    return IndiceMunicipios.do_arquivo(caminho)
+
+
+def test_localiza_por_poligono_com_buraco_e_multipoligono(tmp_path):
+    indice = _indice(tmp_path)
+
+    assert indice.localizar(-20.3, -40.25) == "VITÓRIA"
+    assert indice.localizar(-20.32, -40.32) == "SERRA"
+    assert indice.localizar(-20.3, -40.1) == "SERRA"
+    assert indice.localizar(-19.0, -40.0) is None
+    assert IndiceMunicipios.do_arquivo(tmp_path / "ausente.geojson").tem_geometria is False
+
+
+def test_atribui_municipio_pela_coordenada_e_preserva_sem_coordenada(tmp_path):
+    indice = _indice(tmp_path)
+    df = pd.DataFrame(
+        {
+            "Município": ["VILA VELHA", "CARIACICA", "LINHARES"],
+            "Prec_mm": [1.0, 2.0, 3.0],
+            "Latitude": [-20.3, None, -19.4],
+            "Longitude": [-40.1, None, -40.07],
+        }
+    )
+
+    resultado = atribuir_municipios(df, indice)
+
+    assert resultado["Município"].tolist() == ["SERRA", "CARIACICA", "LINHARES"]
+    malha = geojson_com_valores({"SERRA": 12.5}, indice)
+    assert [f["properties"]["Prec_mm"] for f in malha["features"]] == [0.0, 12.5]
+
+
+def test_malha_do_repositorio_cobre_todos_os_municipios():
+    indice = IndiceMunicipios.do_arquivo(MUNICIPIOS_GEOJSON_FILE)
+
+    assert indice.municipios == sorted(COORDENADAS_ESPIRITO_SANTO)
+    assert indice.localizar(-20.3155, -40.3128) == "VITÓRIA"
@@ -0,0 +1,60 @@
+import pandas as pd
+
+from app.services.http import POLITICA_PADRAO
+from app.services.orquestrador import FonteConfig, Orquestrador
+
+
+class ColetorFalso:
+    def __init__(self, chamadas, fonte, falhar=False):
+        self.politica = POLITICA_PADRAO
+        self.chamadas = chamadas
+        self.fonte = fonte
+        self.falhar = falhar
+
+    def get_dataframe(self):
+        self.chamadas.append(self.fonte)
+        if self.falhar:
+            raise RuntimeError("fora do ar")
+        return pd.DataFrame([{"Município": "SERRA", "Prec_mm": 1.0, "Instituição": self.fonte}])
+
+
+def test_cada_fonte_respeita_sua_cadencia_e_credenciais():
+    chamadas = []
+    relogio = [0.0]
+    fontes = [
+        FonteConfig("LENTA", lambda config: ColetorFalso(chamadas, "LENTA"), intervalo_segundos=600, prioridade=2),
+        FonteConfig("RAPIDA", lambda config: ColetorFalso(chamadas, "RAPIDA"), intervalo_segundos=60, prioridade=1),
+        FonteConfig(
+            "PRIVADA",
+            lambda config, token: ColetorFalso(chamadas, "PRIVADA"),
+            credenciais={"token": "TOKEN_PRIVADA"},
+            mensagem_sem_credenciais="Sem token.",
+        ),
+    ]
+    orquestrador = Orquestrador(fontes, obter_credencial=lambda nome: None, relogio=lambda: relogio[0])
+
+    resultados = orquestrador.coletar()
+    relogio[0] = 61
+    orquestrador.coletar()
+
+    assert [resultado.fonte for resultado in resultados] == ["RAPIDA", "LENTA", "PRIVADA"]
+    assert sorted(chamadas) == ["LENTA", "RAPIDA", "RAPIDA"]
+    assert resultados[2].status.sucesso is False
+    assert resultados[2].status.mensagem == "Sem token."
+    assert [config.nome for config in orquestrador.pendentes(agora=601)] == ["RAPIDA", "LENTA"]
+
+
+def test_falha_e_retentada_antes_da_cadencia_normal():
+    chamadas = []
+    relogio = [0.0]
+    fontes = [
+        FonteConfig("INSTAVEL", lambda config: ColetorFalso(chamadas, "INSTAVEL", falhar=True), intervalo_segundos=600),
+    ]
+    orquestrador = Orquestrador(fontes, relogio=lambda: relogio[0])
+
+    (resultado,) = orquestrador.coletar()
+    relogio[0] = 31
+
+    assert resultado.status.sucesso is False
+    assert resultado.df.empty
+    assert [config.nome for config in orquestrador.pendentes()] == ["INSTAVEL"]
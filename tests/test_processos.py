@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from app.dataCollector import agregar_satdes
+from app.services import processos
+
+
+def payload_satdes() -> dict:
+    itens = [
+        {
+            "id_station": indice,
+            "name": f"EMA_{indice:03d}",
+            "code": f"CEP_{indice:03d}_A",
+            "date_utc": f"2026-06-27T12:{indice % 60:02d}:00Z",
+            "instant": str(indice % 7 + 0.5),
+        }
+        for indice in range(120)
+    ]
+    return {"data": {"prec": {"grupo": itens}}}
+
+
+def base_satdes() -> dict:
+    return {
+        f"EMA_{indice:03d}": {
+            "instituicao": "CEPDEC",
+            "municipio": "SERRA",
+            "latitude": -20.1 - indice / 1000,
+            "longitude": -40.3,
+            "altitude": 10.0,
+        }
+        for indice in range(120)
+    }
+
+
+def test_frame_volta_igual_por_arrow_ou_pickle():
+    df = pd.DataFrame(
+        {
+            "Município": ["SERRA", "VITÓRIA"],
+            "Prec_mm": [1.5, 2.0],
+            "Altitude": [12.0, "desconhecida"],
+        }
+    )
+
+    for frame in (df[["Município", "Prec_mm"]], df):
+        dados = processos.serializar_frame(frame)
+        pd.testing.assert_frame_equal(
+            processos.desserializar_frame(dados), frame, check_dtype=False
+        )
+
+    assert processos.serializar_frame(df).startswith(processos.FORMATO_PICKLE)
+
+
+def test_parse_em_processo_equivale_ao_parse_local(monkeypatch):
+    args = (
+        payload_satdes(),
+        datetime(2026, 6, 27, 11, 0, tzinfo=timezone.utc),
+        datetime(2026, 6, 27, 13, 0, tzinfo=timezone.utc),
+        base_satdes(),
+    )
+    local = processos.executar_parse("TESTE", agregar_satdes, *args)
+
+    monkeypatch.setattr(processos, "PARSE_PROCESSOS", 1)
+    try:
+        remoto = processos.executar_parse("TESTE", agregar_satdes, *args)
+        executor = processos.executor_processos()
+    finally:
+        processos._descartar_executor(processos.executor_processos())
+
+    assert executor is not None
+    assert len(local) == 120
+    pd.testing.assert_frame_equal(
+        remoto.reset_index(drop=True), local.reset_index(drop=True), check_dtype=False
+    )
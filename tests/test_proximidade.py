@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import proximidade
+from app.services.proximidade import IndiceEstacoes, estacoes_das_leituras, haversine_km, indice_de_estacoes
+
+
+@pytest.mark.parametrize("com_scipy", [False, True])
+def test_consultas_conferem_com_haversine(monkeypatch, com_scipy):
+    if com_scipy and proximidade.cKDTree is None:
+        pytest.skip("scipy não instalado")
+    if not com_scipy:
+        monkeypatch.setattr(proximidade, "cKDTree", None)
+
+    rng = np.random.default_rng(7)
+    estacoes = pd.DataFrame(
+        {"Latitude": rng.uniform(-21.3, -17.9, 500), "Longitude": rng.uniform(-41.9, -39.7, 500)}
+    )
+    estacoes["Estação"] = [f"E{posicao}" for posicao in range(len(estacoes))]
+    indice = IndiceEstacoes(estacoes)
+
+    for _ in range(20):
+        latitude, longitude = rng.uniform(-21, -18), rng.uniform(-41.5, -40)
+        distancias = haversine_km(latitude, longitude, estacoes["Latitude"], estacoes["Longitude"])
+
+        proximas = indice.proximas(latitude, longitude, k=6)
+        assert proximas["Estação"].tolist() == estacoes["Estação"].iloc[np.argsort(distancias)[:6]].tolist()
+
+        no_raio = indice.no_raio(latitude, longitude, raio_km=20)
+        assert sorted(no_raio["Estação"]) == sorted(estacoes["Estação"][distancias <= 20])
+
+
+def test_indice_reaproveita_arvore_quando_estacoes_nao_mudam(monkeypatch):
+    monkeypatch.setattr(proximidade, "_arvore_atual", None)
+    leituras = pd.DataFrame(
+        {
+            "Fonte": ["INMET", "CEMADEN"],
+            "Estação": ["VITORIA A612", None],
+            "Município": ["VITÓRIA", "SERRA"],
+            "Latitude": [-20.3155, None],
+            "Longitude": [-40.3172, None],
+            "Prec_mm": [18.0, 12.0],
+        }
+    )
+
+    primeiro = indice_de_estacoes(estacoes_das_leituras([leituras]))
+    segundo = indice_de_estacoes(estacoes_das_leituras([leituras.assign(Prec_mm=[20.0, 1.0])]))
+
+    assert segundo.arvore is primeiro.arvore
+    proximas = segundo.proximas(-20.32, -40.32, k=2)
+    assert proximas["Estação"].tolist()[0] == "VITORIA A612"
+    assert proximas["Prec_mm"].tolist()[0] == 20.0
+    assert bool(proximas["Aproximada"].iloc[1]) is True
+
+    no_raio = segundo.no_raio(-20.32, -40.32, raio_km=5)
+    assert no_raio["Distancia_km"].max() <= 5
+    assert len(no_raio) == 1
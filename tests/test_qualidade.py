@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from app.dataCollector import Joiner
+from app.services.normalizacao import garantir_colunas_estendidas
+from app.services.qualidade import FiltroQualidade
+
+
+TZ_BRT = ZoneInfo("America/Sao_Paulo")
+
+
+def _leituras(valores):
+    return pd.DataFrame(
+        {
+            "Município": ["VITÓRIA", "VITÓRIA", "SERRA", "CARIACICA", "VILA VELHA"],
+            "Prec_mm": valores,
+            "Instituição": "CEPDEC",
+            "Estação": ["A", "B", "C", "D", "E"],
+            "Latitude": [-20.30, -20.31, -20.20, -20.26, -20.34],
+            "Longitude": [-40.30, -40.32, -40.25, -40.42, -40.29],
+            "Fonte": "SATDES",
+        }
+    )
+
+
+def test_sinaliza_faixa_e_vizinhanca_e_joiner_ignora_reprovadas():
+    filtro = FiltroQualidade()
+    (df,) = filtro.aplicar([_leituras([300.0, 2.0, 1.0, 3.0, 600.0])], datetime(2026, 7, 1, 12, tzinfo=TZ_BRT))
+
+    assert df["QC_Espacial"].tolist() == [True, False, False, False, False]
+    assert df["QC_Faixa"].tolist() == [False, False, False, False, True]
+
+    consolidado = Joiner.join(df).set_index("Município")
+    assert consolidado.loc["VITÓRIA", "Prec_mm"] == 2.0
+    assert "VILA VELHA" not in consolidado.index
+
+
+def test_sinaliza_taxa_e_sensor_travado_pelo_historico():
+    filtro = FiltroQualidade()
+    inicio = datetime(2026, 7, 1, 12, tzinfo=TZ_BRT)
+    filtro.aplicar([_leituras([5.0, 1.0, 1.0, 0.0, 0.0])], inicio)
+    filtro.aplicar([_leituras([5.0, 1.0, 2.0, 0.0, 0.0])], inicio + timedelta(hours=26, minutes=30))
+
+    (df,) = filtro.aplicar([_leituras([5.0, 150.0, 3.0, 0.0, 0.0])], inicio + timedelta(hours=27))
+
+    assert df["QC_Travado"].tolist() == [True, False, False, False, False]
+    assert df["QC_Taxa"].tolist() == [False, True, False, False, False]
+    assert df["QC_OK"].tolist() == [False, False, True, True, True]
+
+
+def test_maximo_municipal_do_cemaden_fica_fora_das_verificacoes_temporais():
+    def cemaden(valor):
+        # Como sai do coletor: sem estação, tipado por ``garantir_colunas_estendidas``.
+        leitura = pd.DataFrame(
+            {
+                "Município": ["LINHARES"],
+                "Prec_mm": [valor],
+                "Instituição": "CEMADEN",
+                "Estação": [None],
+                "Latitude": [None],
+                "Longitude": [None],
+                "Fonte": "CEMADEN",
+            }
+        )
+        return garantir_colunas_estendidas(leitura)
+
+    filtro = FiltroQualidade()
+    inicio = datetime(2026, 7, 1, 12, tzinfo=TZ_BRT)
+    filtro.aplicar([cemaden(4.0)], inicio)
+    (repetido,) = filtro.aplicar([cemaden(4.0)], inicio + timedelta(hours=26, minutes=30))
+    assert repetido["QC_Travado"].tolist() == [False]
+
+    # Outra estação do município passa a ter o maior acumulado.
+    (df,) = filtro.aplicar([cemaden(200.0)], inicio + timedelta(hours=27))
+    assert df["QC_Taxa"].tolist() == [False]
+    assert df["QC_OK"].tolist() == [True]
+    assert not filtro._posicoes
+
+
+def test_estacoes_secas_da_rede_contam_como_vizinhas():
+    isolada = _leituras([300.0, 0.0, 0.0, 0.0, 0.0]).iloc[:1]
+    rede = [
+        {"estacao": estacao, "latitude": latitude, "longitude": longitude, "ativa": True}
+        for estacao, latitude, longitude in [
+            ("A", -20.30, -40.30),
+            ("B", -20.31, -40.32),
+            ("C", -20.20, -40.25),
+            ("D", -20.26, -40.42),
+        ]
+    ]
+    instante = datetime(2026, 7, 1, 12, tzinfo=TZ_BRT)
+
+    (sem_rede,) = FiltroQualidade().aplicar([isolada], instante)
+    (com_rede,) = FiltroQualidade().aplicar([isolada], instante, rede=rede)
+
+    assert sem_rede["QC_Espacial"].tolist() == [False]
+    assert com_rede["QC_Espacial"].tolist() == [True]
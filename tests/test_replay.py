@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app.services.json_rapido import serializar_json
+from app.services.replay import AnelQuadros
+from app.services.retencao import registrar_no_indice
+
+
+TZ_BRT = ZoneInfo("America/Sao_Paulo")
+
+
+def _gravar(diretorio, gerado_em, prec):
+    caminho = diretorio / f"acumulados_{gerado_em.strftime('%Y%m%d_%H%M%S')}.json"
+    registros = [{"Município": "SERRA", "Prec_mm": prec, "Instituição": "CEMADEN"}]
+    caminho.write_bytes(serializar_json({"gerado_em": gerado_em.isoformat(), "registros": registros}))
+    registrar_no_indice(caminho, gerado_em, 1, diretorio=diretorio)
+
+
+def test_anel_pre_carrega_intervalo_e_respeita_capacidade(tmp_path):
+    inicio = datetime(2026, 6, 27, 12, 0, tzinfo=TZ_BRT)
+    for minuto in range(5):
+        _gravar(tmp_path, inicio + timedelta(minutes=minuto * 2), float(minuto))
+
+    anel = AnelQuadros(capacidade=3, diretorio=tmp_path)
+    entradas = anel.instantes(inicio, inicio + timedelta(hours=1))
+    anel.pre_carregar(entradas)
+
+    assert len(entradas) == 3
+    assert len(anel) == 3
+    quadro = anel.quadro(entradas[-1])
+    assert quadro.df.loc[0, "Prec_mm"] == 3.0
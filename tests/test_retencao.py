@@ -0,0 +1,87 @@
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.services.json_rapido import carregar_json, serializar_json
+from app.services.retencao import (
+    RESOLUCAO_COMPLETA,
+    RESOLUCAO_HORARIA,
+    carregar_indice,
+    compactar_snapshots,
+    reconstruir_indice,
+    registrar_no_indice,
+)
+
+
+TZ_BRT = ZoneInfo("America/Sao_Paulo")
+
+
+def _gravar_snapshot(diretorio, gerado_em, registros):
+    caminho = diretorio / f"acumulados_{gerado_em.strftime('%Y%m%d_%H%M%S')}.json"
+    caminho.write_bytes(serializar_json({"gerado_em": gerado_em.isoformat(), "registros": registros}))
+    registrar_no_indice(caminho, gerado_em, len(registros), diretorio=diretorio)
+    return caminho
+
+
+def test_compactar_snapshots_agrega_por_hora_com_fonte_do_maximo(tmp_path):
+    agora = datetime(2026, 6, 27, 12, 0, tzinfo=TZ_BRT)
+    antigo = agora - timedelta(days=3)
+    _gravar_snapshot(
+        tmp_path,
+        antigo.replace(minute=10),
+        [{"Município": "SERRA", "Prec_mm": 5.0, "Instituição": "CEMADEN"}],
+    )
+    _gravar_snapshot(
+        tmp_path,
+        antigo.replace(minute=40),
+        [{"Município": "SERRA", "Prec_mm": 9.0, "Instituição": "SATDES"}],
+    )
+    recente = _gravar_snapshot(
+        tmp_path,
+        agora - timedelta(hours=1),
+        [{"Município": "SERRA", "Prec_mm": 1.0, "Instituição": "ANA"}],
+    )
+
+    resultado = compactar_snapshots(agora=agora, diretorio=tmp_path)
+
+    assert resultado["completas_compactadas"] == 2
+    entradas = carregar_indice(tmp_path)
+    assert [entrada["resolucao"] for entrada in entradas] == [RESOLUCAO_HORARIA, RESOLUCAO_COMPLETA]
+    agregado = carregar_json((tmp_path / entradas[0]["arquivo"]).read_bytes())
+    assert agregado["registros"][0]["Prec_mm"] == 9.0
+    assert agregado["registros"][0]["Instituição"] == "SATDES"
+    assert recente.exists()
+
+
+def test_carregar_indice_varre_sem_gravar_quando_ausente(tmp_path):
+    gerado_em = datetime(2026, 6, 27, 12, 0, tzinfo=TZ_BRT)
+    caminho = tmp_path / "acumulados_20260627_120000.json"
+    caminho.write_bytes(serializar_json({"gerado_em": gerado_em.isoformat(), "registros": []}))
+
+    entradas = carregar_indice(tmp_path)
+
+    assert entradas[0]["arquivo"] == caminho.name
+    assert not (tmp_path / "indice.json").exists()
+
+    assert reconstruir_indice(tmp_path) == entradas
+    assert (tmp_path / "indice.json").exists()
+
+
+def test_processos_concorrentes_nao_perdem_entradas_do_indice(tmp_path):
+    pytest.importorskip("fcntl")
+    codigo = (
+        "import sys; from datetime import datetime, timedelta; from pathlib import Path; "
+        "from app.services.retencao import registrar_no_indice; "
+        "base = datetime(2026, 6, 27, 12, 0); diretorio = Path(sys.argv[1]); "
+        "[registrar_no_indice(diretorio / f'acumulados_{sys.argv[2]}_{i}.json', "
+        "base + timedelta(minutes=i), 0, diretorio=diretorio) for i in range(25)]"
+    )
+    processos = [
+        subprocess.Popen([sys.executable, "-c", codigo, str(tmp_path), nome]) for nome in ("a", "b", "c")
+    ]
+    assert [processo.wait(timeout=60) for processo in processos] == [0, 0, 0]
+
+    assert len(carregar_indice(tmp_path)) == 75
@@ -0,0 +1,43 @@
+import threading
+import time
+
+from app.services.single_flight import SingleFlight
+
+
+def test_single_flight_compartilha_chamada_em_andamento():
+    voo = SingleFlight("TESTE")
+    chamadas = []
+    barreira = threading.Barrier(8)
+    resultados = []
+
+    def coleta():
+        chamadas.append(1)
+        time.sleep(0.2)
+        return "dados"
+
+    def sessao():
+        barreira.wait()
+        resultados.append(voo.executar("CEMADEN", coleta))
+
+    threads = [threading.Thread(target=sessao) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(chamadas) == 1
+    assert resultados == ["dados"] * 8
+
+
+def test_single_flight_libera_chave_apos_erro():
+    voo = SingleFlight("TESTE")
+
+    def falha():
+        raise RuntimeError("fonte fora do ar")
+
+    try:
+        voo.executar("ANA", falha)
+    except RuntimeError:
+        pass
+
+    assert voo.executar("ANA", lambda: "ok") == "ok"
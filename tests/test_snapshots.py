@@ -0,0 +1,52 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from app.services import snapshots
+from app.services.estado import carregar_estado_armazenado
+from app.services.normalizacao import garantir_colunas_estendidas
+
+
+def test_salvar_snapshot_json_grava_uma_vez_e_vincula_latest(monkeypatch, tmp_path):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", tmp_path)
+    df = pd.DataFrame([{"Município": "VITÓRIA", "Prec_mm": 12.5, "Instituição": "INMET"}])
+
+    caminho = snapshots.salvar_snapshot_json(df)
+
+    latest = tmp_path / "acumulados_latest.json"
+    payload = json.loads(latest.read_text(encoding="utf-8"))
+    assert payload["registros"][0]["Município"] == "VITÓRIA"
+    assert os.path.samefile(caminho, latest)
+    assert not list(tmp_path.glob(".tmp_*"))
+
+
+def test_agendar_snapshot_json_executa_em_segundo_plano(monkeypatch, tmp_path):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", tmp_path)
+    df = pd.DataFrame([{"Município": "SERRA", "Prec_mm": 3.0, "Instituição": "CEMADEN"}])
+
+    future = snapshots.agendar_snapshot_json(df)
+
+    assert future.result(timeout=5) is not None
+    assert (tmp_path / "acumulados_latest.json").exists()
+
+
+def test_estado_armazenado_le_arrow_mapeado_com_os_tipos_do_pipeline(monkeypatch, tmp_path):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", tmp_path)
+    df = garantir_colunas_estendidas(
+        pd.DataFrame([{"Município": "Vitória", "Prec_mm": "12,5", "Instituição": "inmet", "Latitude": None}])
+    )
+
+    snapshots.salvar_snapshot_json(df)
+    estado = carregar_estado_armazenado(tmp_path)
+
+    assert (tmp_path / "acumulados_latest.arrow").exists()
+    assert estado.versao.startswith("arquivo-")
+    pd.testing.assert_frame_equal(estado.consolidado, df)
+    assert estado.consolidado["Prec_mm"].dtype == "float64"
+    assert estado.consolidado["Município"].dtype == "str"
+    # Ausentes continuam ausentes (e não a string "nan") no pandas 2 e no 3.
+    assert df["Estação"].isna().all()
+    assert estado.consolidado["DataHoraReferencia"].isna().all()
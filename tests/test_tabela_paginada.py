@@ -0,0 +1,44 @@
+import pandas as pd
+
+from app.services.normalizacao import garantir_colunas_estendidas
+from app.services.tabela_paginada import TabelaAcumulados, total_paginas
+
+
+def tabela_de_teste() -> TabelaAcumulados:
+    return TabelaAcumulados(
+        garantir_colunas_estendidas(
+            pd.DataFrame(
+                [
+                    {"Município": "SERRA", "Estação": "SERRA CENTRO", "Prec_mm": 12.0, "Instituição": "CEMADEN"},
+                    {"Município": "VITÓRIA", "Estação": "JARDIM CAMBURI", "Prec_mm": 30.5, "Instituição": "ANA"},
+                    {"Município": "VILA VELHA", "Estação": "ITAPUÃ", "Prec_mm": 8.0, "Instituição": "CEMADEN"},
+                    {"Município": "VITÓRIA", "Estação": "CENTRO", "Prec_mm": 4.0, "Instituição": "SATDES"},
+                ]
+            )
+        )
+    )
+
+
+def test_filtra_por_fonte_e_busca_sem_acentos_mantendo_a_ordem_do_ranking():
+    tabela = tabela_de_teste()
+
+    assert tabela.linhas["Prec_mm"].tolist() == [30.5, 12.0, 8.0, 4.0]
+    assert tabela.linhas.loc[tabela.filtrar(None, "vitoria"), "Estação"].tolist() == ["JARDIM CAMBURI", "CENTRO"]
+    assert tabela.linhas.loc[tabela.filtrar(None, "itapua"), "Município"].tolist() == ["VILA VELHA"]
+    assert tabela.linhas.loc[tabela.filtrar(["CEMADEN", "SATDES"], "v"), "Município"].tolist() == [
+        "VILA VELHA",
+        "VITÓRIA",
+    ]
+    assert tabela.filtrar(None, "  Vitória ") is tabela.filtrar(None, "VITORIA")
+
+
+def test_pagina_numera_pelo_resultado_filtrado():
+    tabela = tabela_de_teste()
+    posicoes = tabela.filtrar(["CEMADEN", "ANA"], "")
+
+    segunda = tabela.pagina(posicoes, 2, 2)
+
+    assert total_paginas(len(posicoes), 2) == 2
+    assert segunda["Posição"].tolist() == [3]
+    assert segunda["Município"].tolist() == ["VILA VELHA"]
+    assert tabela.pagina(posicoes, 5, 2).empty
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from app.services.metricas import metricas
+from app.services.tokens import GerenciadorToken
+
+
+class Servidor:
+    def __init__(self):
+        self.emitidos = []
+        self._lock = threading.Lock()
+
+    def solicitar(self):
+        time.sleep(0.01)
+        with self._lock:
+            self.emitidos.append(f"token-{len(self.emitidos) + 1}")
+            return self.emitidos[-1]
+
+
+def gerenciador(tmp_path, servidor, ttl=900.0, antecedencia=120.0):
+    return GerenciadorToken(
+        "TESTE_TOKEN",
+        "credenciais",
+        servidor.solicitar,
+        tmp_path / "token.json",
+        tmp_path / "token.lock",
+        ttl=ttl,
+        antecedencia=antecedencia,
+    )
+
+
+def test_processos_compartilham_o_token_pelo_arquivo(tmp_path):
+    servidor = Servidor()
+    metricas.limpar()
+    primeiro, segundo = gerenciador(tmp_path, servidor), gerenciador(tmp_path, servidor)
+
+    assert primeiro.obter() == segundo.obter() == "token-1"
+    assert servidor.emitidos == ["token-1"]
+    assert metricas.contadores("TESTE_TOKEN")["token_compartilhado"] == 1
+    primeiro.cancelar()
+    segundo.cancelar()
+
+
+def test_token_rejeitado_gera_um_unico_pedido(tmp_path):
+    servidor = Servidor()
+    tokens = gerenciador(tmp_path, servidor)
+    rejeitado = tokens.obter()
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(tokens.renovar(rejeitado))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert resultados == ["token-2"] * 8
+    assert servidor.emitidos == ["token-1", "token-2"]
+    # O token novo substituiu o recusado no arquivo compartilhado.
+    assert gerenciador(tmp_path, servidor).obter() == "token-2"
+    tokens.cancelar()
+
+
+def test_renova_em_segundo_plano_antes_de_vencer(tmp_path):
+    servidor = Servidor()
+    tokens = gerenciador(tmp_path, servidor, ttl=1.0, antecedencia=0.5)
+
+    assert tokens.obter() == "token-1"
+    time.sleep(0.8)
+
+    assert servidor.emitidos == ["token-1", "token-2"]
+    assert tokens.obter() == "token-2"
+    assert len(servidor.emitidos) == 2
+    tokens.cancelar()